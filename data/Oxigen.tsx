@@ -1,4 +1,7 @@
 <?xml version="1.0" encoding="UTF-8"?>
 <tileset version="1.10" tiledversion="1.11.2" name="Oxigen" tilewidth="16" tileheight="32" tilecount="1" columns="1">
+ <properties>
+  <property name="kind" value="oxy"/>
+ </properties>
  <image source="../assets/textures/Oxigen.jpg" width="16" height="43"/>
 </tileset>
@@ -1,4 +1,7 @@
 <?xml version="1.0" encoding="UTF-8"?>
 <tileset version="1.10" tiledversion="1.11.2" name="Враг" tilewidth="32" tileheight="32" tilecount="1" columns="1">
+ <properties>
+  <property name="kind" value="enemy"/>
+ </properties>
  <image source="../assets/models/enemy1.png" width="32" height="32"/>
 </tileset>
@@ -1,4 +1,7 @@
 <?xml version="1.0" encoding="UTF-8"?>
 <tileset version="1.10" tiledversion="1.11.2" name="Двери" tilewidth="32" tileheight="32" tilecount="1" columns="1">
+ <properties>
+  <property name="kind" value="exit"/>
+ </properties>
  <image source="../assets/textures/door.jpg" width="32" height="32"/>
 </tileset>
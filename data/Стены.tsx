@@ -1,4 +1,7 @@
 <?xml version="1.0" encoding="UTF-8"?>
 <tileset version="1.10" tiledversion="1.11.2" name="Стены" tilewidth="32" tileheight="32" tilecount="4" columns="2">
+ <properties>
+  <property name="kind" value="wall"/>
+ </properties>
  <image source="../assets/textures/wall.jpg" width="64" height="64"/>
 </tileset>
@@ -0,0 +1,272 @@
+"""проверка уровней без игры: дойти ли до выхода и хватит ли кислорода
+
+по Level строится сетка мест игрока. он почти в две клетки высотой и в одну
+шириной, поэтому место - это клетка, где стоят его ноги, и клетка над ней, обе
+пустые; шаг - в соседнее место, так что обе клетки пусты всё время. дальше:
+- BFS от старта: достижим ли выход вообще и за сколько клеток;
+- поиск маршрута старт -> баллоны -> выход, при котором кислород не кончается
+  по дороге. расход - OXY_DRAIN_PER_SEC, скорость - PLAYER_SPEED за шаг STEP.
+
+кислорода хватает только на ограниченный путь, поэтому каждый поиск от точки
+маршрута - BFS не дальше этого радиуса. так и карта 1000x1000 проверяется
+быстро. враги не учитываются: это оценка самой карты.
+
+путь считается по 4 соседям и только по местам, где игрок помещается целиком,
+а в игре можно ходить и по диагонали и стоять не ровно по клеткам, так что
+оценка с запасом: "проходим" значит проходим точно.
+
+результаты лежат в data/cache/analysis.json по хэшу карты и числам баланса.
+
+python analyze.py                - все levelsNN.tmx и levels.csv
+python analyze.py карта.tmx ...  - только эти карты
+python analyze.py карта.tmx:3    - карта с кислородом, как на уровне 3; без
+                                   номера - как levelsNN.tmx или как уровень 1
+"""
+
+import heapq
+import json
+import pathlib
+import re
+import sys
+import time
+
+import numpy as np
+
+from levels import EXIT, OXY, load_csv_level, load_level
+from world import (
+    DATA, LEVEL_CACHE, MAX_OXY, OXY_DRAIN_PER_SEC, PLAYER_SPEED, STEP, start_oxy,
+)
+
+CACHE_FILE = LEVEL_CACHE / "analysis.json"
+# меняем, когда меняется то, что считает analyze()
+VERSION = 2
+
+
+def walkable(lv):
+    """True - место игрока: клетка пустая, и над ней тоже пусто (как sweep.fits)"""
+    free = np.frombuffer(bytes(lv.blocked), dtype=np.uint8).reshape(lv.rows, lv.cols) == 0
+    # за краем карты - стена
+    above = np.zeros_like(free)
+    above[:-1] = free[1:]
+    return (free & above).ravel()
+
+
+def spots(walk, cols, cells):
+    """места игрока, в которые попадают клетки cells: с ногами в клетке или под ней"""
+    cells = np.asarray(cells, dtype=np.int64).ravel()
+    out = np.concatenate((cells, cells - cols))
+    out = out[out >= 0]
+    return np.unique(out[walk[out]])
+
+
+def bfs_from(walk, cols, srcs, limit=None):
+    """шагов от ближайшей из клеток srcs до каждой клетки (-1 - не дошли)
+
+    BFS волной: за проход numpy расширяется весь фронт, так что проходов
+    столько, сколько шагов до дальней клетки, а не сколько клеток.
+    limit - дальше скольких шагов не идём.
+    """
+    n = walk.size
+    dist = np.full(n, -1, dtype=np.int32)
+    front = np.unique(np.asarray(srcs, dtype=np.int64))
+    dist[front] = 0
+    d = 0
+    while front.size and (limit is None or d < limit):
+        d += 1
+        c = front % cols
+        nb = np.concatenate((front[c > 0] - 1, front[c < cols - 1] + 1, front - cols, front + cols))
+        nb = nb[(nb >= 0) & (nb < n)]
+        nb = np.unique(nb[walk[nb] & (dist[nb] < 0)])
+        dist[nb] = d
+        front = nb
+    return dist
+
+
+def cell_of(lv, x, y):
+    return int(y // lv.tile_h) * lv.cols + int(x // lv.tile_w)
+
+
+def analyze(lv, oxy_start, drain=OXY_DRAIN_PER_SEC, speed=PLAYER_SPEED / STEP):
+    """отчёт по уровню: словарь, который можно сохранить в json"""
+    t0 = time.perf_counter()
+    cols = lv.cols
+    walk = walkable(lv)
+    # кислород на одну клетку пути
+    per_tile = drain * lv.tile_w / speed
+    exits = spots(walk, cols, [cell_of(lv, x, y) for x, y, _, _ in lv.items(EXIT)])
+    picks = [(spots(walk, cols, [cell_of(lv, x, y)]), fill) for x, y, _, fill in lv.items(OXY)]
+    out = {
+        "name": lv.name,
+        "size": f"{lv.cols}x{lv.rows}",
+        "oxy_start": oxy_start,
+        "exit": lv.has(EXIT),
+        "reachable": False,
+        "tiles": None,
+        "direct_oxy": None,
+        "finishable": False,
+        "route": None,
+        "margin": None,
+    }
+    if not lv.has(EXIT):
+        out["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return out
+
+    # путь до выхода без учёта кислорода; он же - подсказка поиску маршрута
+    to_exit = bfs_from(walk, cols, exits)
+    # из мест, где может стоять игрок на старте, - ближайшее к выходу
+    start = -1
+    tiles = -1
+    for s in spots(walk, cols, [cell_of(lv, *lv.start)]).tolist():
+        if to_exit[s] >= 0 and (tiles < 0 or to_exit[s] < tiles):
+            start = s
+            tiles = int(to_exit[s])
+    if tiles >= 0:
+        out["reachable"] = True
+        out["tiles"] = tiles
+        out["direct_oxy"] = round(tiles * per_tile, 1)
+
+    if out["reachable"]:
+        route = solve(walk, cols, start, exits, picks, oxy_start, per_tile, to_exit)
+        if route:
+            out["finishable"] = True
+            out["route"] = route[0]
+            out["margin"] = round(route[1], 1)
+    out["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out
+
+
+def solve(walk, cols, start, exits, picks, oxy_start, per_tile, to_exit):
+    """маршрут по баллонам до выхода: (номера баллонов, кислород у выхода) или None
+
+    метка - точка, запас кислорода и взятые баллоны (каждый берётся один раз).
+    первой раскрывается метка, которой до выхода не хватает меньше всего
+    клеток (to_exit минус клетки на запасе), как в A*. в точку не идём снова,
+    если уже были в ней с запасом не меньше: так находится не всякий
+    маршрут в хитрых картах, но найденный маршрут всегда настоящий.
+    start, exits и клетки у picks - места игрока (см. spots).
+    """
+    exits = np.array(exits)
+    pick_at = {}
+    for k, (cs, _) in enumerate(picks):
+        for c in cs.tolist():
+            pick_at.setdefault(c, []).append(k)
+    pick_cells = np.array(list(pick_at), dtype=np.int64)
+    best = {start: oxy_start}
+    # (нехватка клеток, номер метки, кислород, клетка, взятые баллоны, маршрут)
+    heap = [(to_exit[start] - oxy_start / per_tile, 0, oxy_start, start, frozenset(), ())]
+    n = 1
+    while heap:
+        _, _, oxy, cell, used, route = heapq.heappop(heap)
+        if oxy < best.get(cell, 0):
+            continue
+        # дальше этого кислород кончится
+        limit = int(oxy / per_tile)
+        dist = bfs_from(walk, cols, [cell], limit=limit)
+        d = dist[exits]
+        d = d[(d >= 0) & (d * per_tile < oxy)]
+        if d.size:
+            return list(route), oxy - int(d.min()) * per_tile
+        near = dist[pick_cells] if pick_cells.size else pick_cells
+        for c, d in zip(pick_cells[near >= 0].tolist(), near[near >= 0].tolist()):
+            if d * per_tile >= oxy:
+                continue
+            ks = pick_at[c]
+            fresh = [k for k in ks if k not in used]
+            if not fresh:
+                continue
+            left = min(MAX_OXY, oxy - d * per_tile + sum(picks[k][1] for k in fresh))
+            if left <= best.get(c, 0) or to_exit[c] < 0:
+                continue
+            best[c] = left
+            heapq.heappush(heap, (to_exit[c] - left / per_tile, n, left, c, used | set(fresh), route + tuple(fresh)))
+            n += 1
+    return None
+
+
+# кэш результатов
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": VERSION, "levels": {}}
+
+
+def save_cache(data):
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+    except OSError as e:
+        print(f"Не удалось сохранить кэш проверки: {e}")
+
+
+def check(lv, lvl, cache):
+    # результат из кэша, если карта и баланс те же
+    key = f"{lv.key}:{lv.name}:{OXY_DRAIN_PER_SEC}:{PLAYER_SPEED}:{start_oxy(lvl)}"
+    res = cache["levels"].get(key)
+    if res is None:
+        res = cache["levels"][key] = analyze(lv, start_oxy(lvl))
+        return dict(res, cached=False)
+    return dict(res, cached=True)
+
+
+def level_number(path):
+    # номер уровня для кислорода на старте: только у levelsNN.tmx, остальные - как первый
+    m = re.fullmatch(r"levels(\d\d)", path.stem)
+    return int(m.group(1)) if m else 1
+
+
+def parse_target(arg):
+    # "карта.tmx" или "карта.tmx:3" -> (путь, номер уровня)
+    name, sep, n = arg.rpartition(":")
+    if sep and n.isdigit():
+        return pathlib.Path(name), int(n)
+    path = pathlib.Path(arg)
+    return path, level_number(path)
+
+
+def targets(args):
+    # (Level, номер уровня) для всех карт из аргументов или из data/
+    if args:
+        for a in args:
+            path, lvl = parse_target(a)
+            yield load_level(path.resolve(), LEVEL_CACHE), lvl
+        return
+    for path in sorted(DATA.glob("levels[0-9][0-9].tmx")):
+        yield load_level(path, LEVEL_CACHE), level_number(path)
+    csv_path = DATA / "levels.csv"
+    if csv_path.exists():
+        n = 1
+        while True:
+            try:
+                lv = load_csv_level(csv_path, n)
+            except KeyError:
+                break
+            yield lv, n
+            n += 1
+
+
+def main():
+    cache = load_cache()
+    print(f"{'карта':>18} {'размер':>9} {'O2':>4} {'дойти':>10} {'клеток':>7} {'O2 напрямую':>12} "
+          f"{'проходим':>9} {'баллоны':>8} {'запас':>6} {'мс':>8}")
+    for lv, lvl in targets(sys.argv[1:]):
+        r = check(lv, lvl, cache)
+        ms = "кэш" if r["cached"] else f"{r['ms']:.1f}"
+        route = "-" if r["route"] is None else str(len(r["route"]))
+        reach = "да" if r["reachable"] else ("НЕТ" if r["exit"] else "нет выхода")
+        print(f"{r['name']:>18} {r['size']:>9} {r['oxy_start']:>4} {reach:>10} "
+              f"{r['tiles'] if r['tiles'] is not None else '-':>7} "
+              f"{r['direct_oxy'] if r['direct_oxy'] is not None else '-':>12} "
+              f"{'да' if r['finishable'] else 'НЕТ':>9} {route:>8} "
+              f"{r['margin'] if r['margin'] is not None else '-':>6} {ms:>8}")
+    save_cache(cache)
+
+
+if __name__ == "__main__":
+    main()
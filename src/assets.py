@@ -0,0 +1,77 @@
+"""звуки и текстуры игры: звуки грузятся в фоне, текстуры - в один атлас
+
+окно не ждёт звуков: SoundBank разбирает файлы в своём потоке, а пока звук
+не готов, get() отдаёт None и он просто не играет (как и звук, файла
+которого нет). текстуры моделей и всех тайлсетов из data/ складываются в
+общий атлас arcade один раз, при первом запуске уровня; дальше все уровни
+берут их оттуда и атлас не перестраивается посреди игры.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import arcade
+
+from levels import read_tsx
+from world import ASSETS, DATA
+
+# имя звука в событиях World -> файл в assets/audio
+SOUND_FILES = {
+    "pick": "pickup.wav",
+    "dead": "death.wav",
+    "music": "music.wav",
+    "start": "start.wav",
+}
+# эти звуки читаются с диска по ходу игры, а не лежат в памяти целиком
+STREAMED = {"music"}
+
+
+def load_sound(path, streaming=False):
+    try:
+        return arcade.load_sound(path, streaming)
+    except Exception as e:
+        print(f"Не удалось загрузить звук {path.name}: {e}")
+        return None
+
+
+class SoundBank:
+    """звуки по именам; грузятся в фоновом потоке с момента создания"""
+
+    def __init__(self, files=SOUND_FILES, folder=ASSETS / "audio", streamed=STREAMED):
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.jobs = {name: pool.submit(load_sound, folder / fn, name in streamed) for name, fn in files.items()}
+        # поток закроется сам, когда догрузит
+        pool.shutdown(wait=False)
+
+    def get(self, name):
+        """звук или None, если он ещё грузится или его нет"""
+        job = self.jobs.get(name)
+        if job is None or not job.done():
+            return None
+        return job.result()
+
+    def ready(self):
+        return all(job.done() for job in self.jobs.values())
+
+    def wait(self):
+        for job in self.jobs.values():
+            job.result()
+
+
+def tile_textures(folder=DATA):
+    """текстуры всех тайлов из .tsx в folder - те же объекты, что даёт SpritePool.tile"""
+    out = []
+    for tsx in sorted(folder.glob("*.tsx")):
+        info = read_tsx(tsx)
+        for local in range(info["count"]):
+            ix = (local % info["columns"]) * info["tw"]
+            iy = (local // info["columns"]) * info["th"]
+            out.append(arcade.load_texture(str(info["image"]), x=ix, y=iy, width=info["tw"], height=info["th"]))
+    return out
+
+
+def pack_atlas(ctx, textures):
+    """кладёт textures в общий атлас окна; SpriteList по умолчанию берут его же"""
+    atlas = ctx.default_atlas
+    for tex in textures:
+        atlas.add(tex)
+    return atlas
@@ -0,0 +1,113 @@
+from collections import OrderedDict
+
+import arcade
+from PIL import Image, ImageDraw
+
+from levels import EXIT, FLIP_D, FLIP_H, FLIP_V, WALL
+
+# карты больше этого (px по любой стороне) не пекутся, а рисуются кусками
+# (chunks.py): картинка 4096x4096 RGBA - уже 64 МБ
+BAKE_MAX = 4096
+
+# сколько МБ картинок запечённых слоёв держать
+BAKED_MB = 64
+# столько последних слоёв не выбрасываются даже сверх BAKED_MB: текущий уровень
+# и следующий, который собирается заранее
+BAKED_PINNED = 2
+
+# уже запечённые слои по имени: повторный запуск уровня не склеивает картинку
+# заново и не заводит новый SpriteList. давно не нужные выбрасываются: картинка
+# во всю карту весит десятки МБ, а сгенерированных карт (World.play) бывает много
+_baked = OrderedDict()
+# вырезанные из тайлсетов картинки тайлов
+_tiles = {}
+
+
+def layer_name(lv):
+    # своё имя для каждой версии карты - по нему текстура кэшируется здесь и в атласе arcade
+    return f"static-{lv.name}-{lv.key[:8]}"
+
+
+def is_baked(name):
+    return name in _baked
+
+
+def can_bake(lv):
+    return max(lv.cols * lv.tile_w, lv.rows * lv.tile_h) <= BAKE_MAX
+
+
+def tile_image(fn, ix, iy, w, h, flip):
+    key = (fn, ix, iy, w, h, flip)
+    img = _tiles.get(key)
+    if img is None:
+        # так же режет и отражает картинку тайлсета и arcade.load_texture
+        with Image.open(fn) as src:
+            img = src.convert("RGBA").crop((ix, iy, ix + w, iy + h))
+        if flip & FLIP_D:
+            img = img.transpose(Image.Transpose.TRANSPOSE)
+        if flip & FLIP_H:
+            img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        if flip & FLIP_V:
+            img = img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        _tiles[key] = img
+    return img
+
+
+def level_image(lv, wall_color):
+    """стены и выход уровня одной картинкой размером с карту
+
+    только PIL и данные Level, без arcade и спрайтов - можно звать из фонового
+    потока, пока идёт предыдущий уровень.
+    """
+    width = lv.cols * lv.tile_w
+    height = lv.rows * lv.tile_h
+    img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    if not lv.has(WALL):
+        # уровень из csv: стены - просто прямоугольники
+        draw = ImageDraw.Draw(img)
+        for c, r, w, h in lv.rects:
+            x0 = c * lv.tile_w
+            y0 = height - (r + h) * lv.tile_h
+            draw.rectangle((x0, y0, x0 + w * lv.tile_w - 1, y0 + h * lv.tile_h - 1), fill=tuple(wall_color))
+    for kind in (WALL, EXIT):
+        for x, y, tex, _ in lv.items(kind):
+            part = tile_image(*tex)
+            # у PIL y идёт сверху вниз, у arcade - снизу вверх
+            img.alpha_composite(part, (round(x - part.width / 2), round(height - y - part.height / 2)))
+    return img
+
+
+def bake_layer(name, width, height, make_image):
+    """SpriteList с одним спрайтом на всю карту: рисуется одним квадом вместо сотен тайлов
+
+    make_image зовётся, только если такой слой ещё не пекли. слой только рисуется,
+    поэтому все запуски уровня берут один и тот же SpriteList.
+    """
+    out = _baked.get(name)
+    if out is not None:
+        _baked.move_to_end(name)
+        return out
+
+    layer = arcade.Sprite()
+    layer.texture = arcade.Texture(name, make_image(), hit_box_algorithm=None)
+    layer.center_x = width / 2
+    layer.center_y = height / 2
+    out = _baked[name] = arcade.SpriteList()
+    out.append(layer)
+    while len(_baked) > BAKED_PINNED and baked_bytes() > BAKED_MB * 2 ** 20:
+        drop_layer(_baked.popitem(last=False)[1])
+    return out
+
+
+def baked_bytes():
+    # картинки запечённых слоёв в памяти, RGBA
+    return sum(s.texture.width * s.texture.height * 4 for sl in _baked.values() for s in sl)
+
+
+def drop_layer(sl):
+    # текстура слоя уходит и из атласа, иначе он держит её картинку; атлас у
+    # SpriteList появляется при первом рисовании
+    atlas = getattr(sl, "_atlas", None)
+    for s in sl:
+        if atlas and atlas.has_texture(s.texture):
+            atlas.remove(s.texture)
@@ -0,0 +1,84 @@
+"""замер analyze.py на больших картах, собранных прямо в памяти
+
+стены - случайные блоки 2x2, выход в дальнем углу, баллоны раскиданы так,
+что без них до выхода не дойти: так работает и BFS, и поиск маршрута.
+"""
+
+import random
+import time
+
+from analyze import analyze, bfs_from, walkable
+from levels import EXIT, OXY, Level
+
+SIZES = (100, 300, 1000)
+DENSITY = 0.2
+# баллон на столько клеток карты
+PICK_EVERY = 600
+
+
+def make_level(n, seed=1):
+    rnd = random.Random(seed)
+    lv = Level(n, n, 32, 32)
+    lv.name = f"случайная {n}x{n}"
+    lv.textures = [("", 0, 0, 32, 32, 0)]
+    blocked = lv.blocked
+    for r in range(n):
+        for c in (0, 1, n - 2, n - 1):
+            blocked[r * n + c] = 1
+    for c in range(n):
+        for r in (0, 1, n - 2, n - 1):
+            blocked[r * n + c] = 1
+    for r in range(2, n - 3, 2):
+        for c in range(2, n - 3, 2):
+            if rnd.random() < DENSITY and (r, c) != (2, 2):
+                for dr in (0, 1):
+                    for dc in (0, 1):
+                        blocked[(r + dr) * n + c + dc] = 1
+    lv.start = (80, 80)
+    free = [i for i in range(n * n) if not blocked[i]]
+    for i in rnd.sample(free, max(1, n * n // PICK_EVERY)):
+        lv.add(OXY, (i % n) * 32 + 16, (i // n) * 32 + 16, 0, 25.0)
+    # выход в свободной клетке у дальнего угла
+    i = max((i for i in free if i % n < n - 2), key=lambda i: i // n + i % n)
+    lv.add(EXIT, (i % n) * 32 + 16, (i // n) * 32 + 16, 0)
+    return lv
+
+
+def gap_level(rows_a, rows_b):
+    # карта 2x3: в столбце 0 пусты строки rows_a, в столбце 1 - rows_b
+    lv = Level(2, 3, 32, 32)
+    for r in range(3):
+        lv.blocked[r * 2] = r not in rows_a
+        lv.blocked[r * 2 + 1] = r not in rows_b
+    return lv
+
+
+def check_gap():
+    # щель в одну клетку (общая только строка 1) игрок в две клетки не пройдёт
+    lv = gap_level((1, 2), (0, 1))
+    dist = bfs_from(walkable(lv), lv.cols, [1 * 2 + 0])
+    assert dist[0 * 2 + 1] < 0, "analyze: игрок прошёл щель в одну клетку"
+    # а проход в две клетки высотой - пройдёт
+    lv = gap_level((1, 2), (1, 2))
+    dist = bfs_from(walkable(lv), lv.cols, [1 * 2 + 0])
+    assert dist[1 * 2 + 1] == 1, "analyze: игрок не прошёл проход в две клетки"
+
+
+def main():
+    check_gap()
+    print(f"{'карта':>10} {'баллонов':>9} {'сетка, мс':>10} {'всё, мс':>9} {'клеток':>7} {'проходим':>9} {'баллоны':>8}")
+    for n in SIZES:
+        lv = make_level(n)
+        t0 = time.perf_counter()
+        walkable(lv)
+        t_walk = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        r = analyze(lv, 100)
+        t = (time.perf_counter() - t0) * 1000
+        route = "-" if r["route"] is None else len(r["route"])
+        print(f"{r['size']:>10} {n * n // PICK_EVERY:>9} {t_walk:>10.1f} {t:>9.1f} {r['tiles'] or '-':>7} "
+              f"{'да' if r['finishable'] else 'нет':>9} {route:>8}")
+
+
+if __name__ == "__main__":
+    main()
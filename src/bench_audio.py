@@ -0,0 +1,62 @@
+"""замер звуков: новый плеер на каждый звук (как было) против голосов Mixer
+
+играем PLAYS звуков подбора подряд, по три за "кадр", как при сборе
+нескольких баллонов разом. считаем среднее и худшее время вызова и сколько
+плееров pyglet живо в конце. без звуковой карты pyglet берёт тихий драйвер,
+так что видна цена самих плееров, а не звука.
+"""
+
+import gc
+import time
+
+# arcade настраивает pyglet (без скрытого окна), поэтому он раньше pyglet.media
+import arcade  # noqa: F401
+import pyglet
+import pyglet.media as media
+
+from assets import SoundBank
+from mixer import Mixer
+
+PLAYS = 3000
+PER_FRAME = 3
+
+
+def live_players():
+    gc.collect()
+    return sum(1 for o in gc.get_objects() if isinstance(o, media.Player))
+
+
+def run(play):
+    times = []
+    for i in range(PLAYS):
+        t0 = time.perf_counter()
+        play()
+        times.append(time.perf_counter() - t0)
+        if i % PER_FRAME == PER_FRAME - 1:
+            # кадр: pyglet разбирает свои события (конец звуков и т.п.)
+            pyglet.clock.tick()
+    return sum(times) / len(times) * 1000, max(times) * 1000
+
+
+def main():
+    sounds = SoundBank()
+    sounds.wait()
+    snd = sounds.get("pick")
+    base = live_players()
+
+    mean, worst = run(lambda: snd.play(volume=0.35))
+    old = live_players() - base
+    print(f"{'':>10} {'вызов, мс':>10} {'худший, мс':>11} {'плееров':>8}")
+    print(f"{'play()':>10} {mean:>10.4f} {worst:>11.3f} {old:>8}")
+
+    for p in list(media.Source._players):
+        snd.stop(p)
+    base = live_players()
+    mixer = Mixer(sounds)
+    mixer.warm()
+    mean, worst = run(lambda: mixer.play("pick", 0.35))
+    print(f"{'Mixer':>10} {mean:>10.4f} {worst:>11.3f} {live_players() - base:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""замер FoeBatch против обычного update_foes: скорость и расхождение позиций"""
+
+import time
+
+import arcade
+
+from bench_flow import load_level, make_world
+from foe_batch import FoeBatch
+from world import World
+
+DT = 1 / 60
+
+
+def run(n, frames):
+    m, walls, blocked = load_level()
+    a = make_world(m, walls, blocked, n, True)
+    b = make_world(m, walls, blocked, n, True)
+    b.foe_batch = FoeBatch(b.foes, b.flow, b.enemy_tex)
+
+    t_loop = 0.0
+    t_batch = 0.0
+    for _ in range(frames):
+        # кадры анимации меняют хитбоксы - пусть меняют их и тут
+        World.update_animation(a, DT)
+        World.update_animation(b, DT)
+        t0 = time.perf_counter()
+        World.update_foes(a, DT)
+        t1 = time.perf_counter()
+        World.update_foes(b, DT)
+        t2 = time.perf_counter()
+        t_loop += t1 - t0
+        t_batch += t2 - t1
+
+    err = max(
+        max(abs(fa.center_x - fb.center_x), abs(fa.center_y - fb.center_y))
+        for fa, fb in zip(a.foes, b.foes)
+    )
+    # касание игрока должно совпасть с обычной проверкой arcade
+    same_hit = b.foe_batch.touching(b.p) == bool(arcade.check_for_collision_with_list(a.p, a.foes, 3))
+    return t_loop / frames * 1000, t_batch / frames * 1000, err, same_hit
+
+
+def main():
+    print(f"{'врагов':>7} {'цикл, мс':>10} {'numpy, мс':>10} {'расхождение, px':>16} {'касание':>8}")
+    for n in (500, 2000, 5000):
+        loop_ms, batch_ms, err, same_hit = run(n, 20 if n > 500 else 120)
+        print(f"{n:>7} {loop_ms:>10.2f} {batch_ms:>10.2f} {err:>16.3f} {'да' if same_hit else 'НЕТ':>8}")
+
+
+if __name__ == "__main__":
+    main()
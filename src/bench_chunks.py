@@ -0,0 +1,112 @@
+"""замер кусков (chunks.py) на большой карте: уровень 1, повторённый KxK раз
+
+без окна считается, сколько спрайтов уходит в кадр целиком и кусками и
+сколько стоит выбрать куски. с окном (нужен OpenGL) - ещё и время рисования
+стен, кислорода, выходов и врагов, как в on_draw.
+"""
+
+import time
+
+import arcade
+
+from levels import Level
+from world import LevelSprites, World, level_data
+
+REPEATS = (1, 5, 20)
+SCREEN = (960, 640)
+FRAMES = 200
+
+
+def tile_level(lv, k):
+    # карта из k x k копий lv
+    out = Level(lv.cols * k, lv.rows * k, lv.tile_w, lv.tile_h)
+    out.name = f"{lv.name} x{k}"
+    out.key = f"{lv.key}-x{k}"
+    out.start = lv.start
+    out.textures = list(lv.textures)
+    w = lv.cols * lv.tile_w
+    h = lv.rows * lv.tile_h
+    for i in range(k):
+        for j in range(k):
+            for n in range(len(lv.kind)):
+                out.add(lv.kind[n], lv.x[n] + i * w, lv.y[n] + j * h, lv.tex[n], lv.param[n])
+            for r in range(lv.rows):
+                row = lv.blocked[r * lv.cols:(r + 1) * lv.cols]
+                at = (j * lv.rows + r) * out.cols + i * lv.cols
+                out.blocked[at:at + lv.cols] = row
+    # прямоугольники стен у копий те же, только сдвинуты
+    out.rects = [(c + i * lv.cols, r + j * lv.rows, cw, ch)
+                 for i in range(k) for j in range(k) for c, r, cw, ch in lv.rects]
+    return out
+
+
+def build(w, lv):
+    ls = LevelSprites(lv)
+    for _ in w.build_level(ls):
+        pass
+    return ls
+
+
+def views(lv):
+    # камера проходит карту по диагонали
+    width = lv.cols * lv.tile_w - SCREEN[0]
+    height = lv.rows * lv.tile_h - SCREEN[1]
+    for i in range(FRAMES):
+        yield width * i / FRAMES, height * i / FRAMES, SCREEN[0], SCREEN[1]
+
+
+def cull_cost(ls, lv):
+    lists = ("walls", "exits", "oxy_pick", "foes")
+    total = sum(len(getattr(ls, name)) for name in lists)
+    drawn = 0
+    t0 = time.perf_counter()
+    for view in views(lv):
+        for name in lists:
+            for lst in getattr(ls.chunks, name).visible(*view):
+                drawn += len(lst)
+    t = (time.perf_counter() - t0) / FRAMES * 1000
+    return total, drawn / FRAMES, t
+
+
+def draw_ms(ctx, ls, lv, chunked):
+    lists = ("walls", "exits", "oxy_pick", "foes")
+    frames = list(views(lv))
+    t0 = time.perf_counter()
+    for view in frames:
+        ctx.projection_2d = (view[0], view[0] + view[2], view[1], view[1] + view[3])
+        for name in lists:
+            if chunked:
+                getattr(ls.chunks, name).draw(*view)
+            else:
+                getattr(ls, name).draw()
+        ctx.finish()
+    return (time.perf_counter() - t0) / FRAMES * 1000
+
+
+def main():
+    w = World(preload=False, verbose=False)
+    base = level_data("tmx", 1)
+    levels = []
+    print(f"{'карта':>10} {'спрайтов':>9} {'в кадре':>8} {'выбор кусков, мс':>17}")
+    for k in REPEATS:
+        lv = tile_level(base, k)
+        ls = build(w, lv)
+        levels.append((lv, ls))
+        total, drawn, t = cull_cost(ls, lv)
+        print(f"{lv.cols:>5}x{lv.rows:<4} {total:>9} {drawn:>8.0f} {t:>17.3f}")
+
+    try:
+        win = arcade.Window(*SCREEN, "bench_chunks", visible=False)
+    except Exception as e:
+        print(f"окна нет ({e.__class__.__name__}), время рисования не меряем")
+        return
+    print(f"{'карта':>10} {'всё, мс':>9} {'куски, мс':>10}")
+    for lv, ls in levels:
+        draw_ms(win.ctx, ls, lv, True)
+        print(f"{lv.cols:>5}x{lv.rows:<4} {draw_ms(win.ctx, ls, lv, False):>9.3f} "
+              f"{draw_ms(win.ctx, ls, lv, True):>10.3f}")
+    win.close()
+
+
+if __name__ == "__main__":
+    main()
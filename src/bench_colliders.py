@@ -0,0 +1,78 @@
+"""замер склейки стен: сколько прямоугольников выходит и во что обходятся проверки"""
+
+import random
+import time
+
+import arcade
+
+from colliders import merge_cells, rect_sprites
+from world import ASSETS, DATA, HASH_CELL
+
+FOES = 200
+FRAMES = 10
+
+
+def wall_cells(walls, cols, rows, tile):
+    """сетка занятых стенами клеток из спрайтов тайлов: bytearray cols * rows, строки снизу вверх
+
+    так reset() строил сетку до Level.blocked; тут - для сверки со старым путём.
+    """
+    blocked = bytearray(cols * rows)
+    for w in walls:
+        c0 = max(0, int(w.left // tile))
+        c1 = min(cols - 1, int((w.right - 1) // tile))
+        r0 = max(0, int(w.bottom // tile))
+        r1 = min(rows - 1, int((w.top - 1) // tile))
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                blocked[r * cols + c] = 1
+    return blocked
+
+
+def checks(foes, walls):
+    # сколько пар враг-стена доходит до точной проверки и сколько это стоит
+    pairs = 0
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        for f in foes:
+            pairs += len(walls.spatial_hash.get_objects_for_box(f))
+            arcade.check_for_collision_with_list(f, walls)
+    return pairs / FRAMES, (time.perf_counter() - t0) / FRAMES * 1000
+
+
+def main():
+    tex = arcade.load_texture(ASSETS / "models" / "enemy1.png")
+    print(f"врагов: {FOES}, пары и мс на кадр")
+    print(f"{'карта':<14} {'тайлов':>6} {'прям.':>6} {'склейка, мс':>12} {'пар тайлы':>10} {'пар прям.':>10} {'мс тайлы':>9} {'мс прям.':>9}")
+    for lvl in range(1, 6):
+        m = arcade.load_tilemap(DATA / f"levels{lvl:02d}.tmx")
+        tiles = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+        for layer in m.sprite_lists.values():
+            for it in layer:
+                nm = it.texture.name.lower()
+                if "wall" in nm or "стен" in nm:
+                    tiles.append(it)
+
+        t0 = time.perf_counter()
+        blocked = wall_cells(tiles, m.width, m.height, m.tile_width)
+        rects = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+        rect_sprites(merge_cells(blocked, m.width, m.height), m.tile_width, rects)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        rnd = random.Random(lvl)
+        foes = []
+        for _ in range(FOES):
+            f = arcade.Sprite()
+            f.texture = tex
+            f.center_x = rnd.uniform(0, m.width * m.tile_width)
+            f.center_y = rnd.uniform(0, m.height * m.tile_width)
+            foes.append(f)
+
+        pt, mt = checks(foes, tiles)
+        pr, mr = checks(foes, rects)
+        print(f"{m.tiled_map.map_file.name:<14} {len(tiles):>6} {len(rects):>6} {build_ms:>12.2f} "
+              f"{pt:>10.0f} {pr:>10.0f} {mt:>9.2f} {mr:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
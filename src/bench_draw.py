@@ -0,0 +1,35 @@
+"""замер on_draw: стены тайлами против запечённого слоя (нужно окно с OpenGL)"""
+
+import time
+
+from main import Game
+
+FRAMES = 300
+
+
+def frame_ms(g, bake):
+    g.bake = bake
+    for _ in range(30):
+        g.on_draw()
+    g.ctx.finish()
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        g.on_draw()
+        # ждём видеокарту, иначе меряем только постановку команд в очередь
+        g.ctx.finish()
+    return (time.perf_counter() - t0) / FRAMES * 1000
+
+
+def main():
+    g = Game()
+    print(f"{'уровень':>8} {'тайлы, мс':>10} {'слой, мс':>10}")
+    for lvl in range(1, g.world.lvl_max + 1):
+        g.world.start(lvl)
+        g.flush_events()
+        g.stop_music()
+        print(f"{lvl:>8} {frame_ms(g, False):>10.3f} {frame_ms(g, True):>10.3f}")
+    g.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""замер поля путей: цена кадра при сотнях врагов и сколько врагов доходит до игрока"""
+
+import random
+import time
+
+import arcade
+
+from bench_colliders import wall_cells
+from colliders import merge_cells, rect_sprites
+from flow import FlowField
+from lod import FoeLod
+from world import DATA, ENEMY_SPEED, HASH_CELL, World
+
+MAP = DATA / "levels03.tmx"
+START = (80, 80)
+
+
+def load_level():
+    # стены как после reset(): тайлы склеены в прямоугольники, плюс сетка клеток
+    m = arcade.load_tilemap(MAP)
+    tiles = []
+    for layer in m.sprite_lists.values():
+        for it in layer:
+            nm = it.texture.name.lower()
+            if "wall" in nm or "стен" in nm:
+                tiles.append(it)
+    blocked = wall_cells(tiles, m.width, m.height, m.tile_width)
+    walls = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+    rect_sprites(merge_cells(blocked, m.width, m.height), m.tile_width, walls)
+    return m, walls, blocked
+
+
+def make_world(m, walls, blocked, n, use_flow):
+    # настоящий World без окна, только уровень у него свой: n врагов в случайных клетках
+    w = World(preload=False, verbose=False)
+    tex = w.enemy_tex[0]
+    flow = FlowField(m.width, m.height, m.tile_width, blocked)
+    free = [i for i, b in enumerate(flow.blocked) if not b]
+    rnd = random.Random(n)
+    foes = arcade.SpriteList()
+    for i in rnd.choices(free, k=n):
+        f = arcade.Sprite()
+        f.texture = tex
+        f.center_x = (i % m.width) * m.tile_width + m.tile_width / 2
+        f.center_y = (i // m.width) * m.tile_width + m.tile_width / 2
+        f.properties["speed"] = ENEMY_SPEED
+        foes.append(f)
+    p = arcade.Sprite()
+    p.texture = w.player_tex[0]
+    p.center_x, p.center_y = START
+    w.p = p
+    w.foes = foes
+    w.phys_walls = walls
+    w.flow = flow if use_flow else None
+    w.foe_batch = None
+    w.lod = FoeLod(foes)
+    return w
+
+
+def caught(w):
+    return sum(1 for f in w.foes if abs(f.center_x - w.p.center_x) < 64 and abs(f.center_y - w.p.center_y) < 64)
+
+
+def main():
+    m, walls, blocked = load_level()
+
+    # пересчёт поля не зависит от числа врагов
+    flow = FlowField(m.width, m.height, m.tile_width, blocked)
+    t0 = time.perf_counter()
+    for i in range(200):
+        flow.goal = -1
+        flow.update(*START)
+    print(f"пересчёт поля {m.width}x{m.height}: {(time.perf_counter() - t0) / 200 * 1000:.3f} мс")
+
+    print(f"{'врагов':>7} {'прямо, мс':>10} {'поле, мс':>10}")
+    for n in (500, 1000, 2000):
+        row = []
+        for use_flow in (False, True):
+            w = make_world(m, walls, blocked, n, use_flow)
+            t0 = time.perf_counter()
+            for _ in range(20):
+                w.update_foes(1 / 60)
+            row.append((time.perf_counter() - t0) / 20 * 1000)
+        print(f"{n:>7} {row[0]:>10.2f} {row[1]:>10.2f}")
+
+    # качество погони: сколько врагов дошло до игрока за 15 секунд
+    for use_flow in (False, True):
+        w = make_world(m, walls, blocked, 100, use_flow)
+        for _ in range(15 * 30):
+            w.update_foes(1 / 30)
+        name = "поле" if use_flow else "прямо"
+        print(f"{name}: дошли {caught(w)} из {len(w.foes)}")
+
+
+if __name__ == "__main__":
+    main()
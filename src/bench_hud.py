@@ -0,0 +1,57 @@
+"""замер HUD: draw_text каждый кадр против Hud из hud.py (нужно окно с OpenGL)"""
+
+import time
+
+import arcade
+
+from hud import BAR_H, BAR_W, BAR_X
+from main import Game
+from world import LOW_OXY_THRESHOLD, MAX_OXY
+
+FRAMES = 600
+DT = 1 / 60
+
+
+def old_hud(g):
+    # как draw_hud раньше
+    w = g.world
+    r = max(0.0, min(1.0, w.oxy / MAX_OXY))
+    y0 = g.height - 40
+    arcade.draw_rectangle_filled(BAR_X + BAR_W / 2, y0, BAR_W, BAR_H, arcade.color.DAVY_GREY)
+    arcade.draw_rectangle_filled(BAR_X + (BAR_W * r) / 2, y0, BAR_W * r, BAR_H, arcade.color.AIR_FORCE_BLUE)
+    arcade.draw_text(f"O2: {w.oxy:0.0f}%", BAR_X, y0 + 16, arcade.color.WHITE_SMOKE, 14)
+    arcade.draw_text(f"Уровень: {w.lvl}", BAR_X, y0 - 32, arcade.color.LIGHT_GRAY, 14)
+    arcade.draw_text(f"Время: {w.t_alive:0.1f}s", BAR_X, y0 - 52, arcade.color.LIGHT_GRAY, 14)
+    if w.oxy <= LOW_OXY_THRESHOLD:
+        arcade.draw_text("Мало кислорода!", BAR_X, y0 - 72, arcade.color.APRICOT, 14)
+
+
+def frame_ms(g, draw):
+    # кислород и время меняются как в игре, стоим на месте
+    w = g.world
+    w.start(1)
+    g.flush_events()
+    g.stop_music()
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        w.oxy -= 6 * DT
+        w.t_alive += DT
+        g.clear()
+        g.cam_ui.use()
+        draw(g)
+        g.ctx.finish()
+    return (time.perf_counter() - t0) / FRAMES * 1000
+
+
+def main():
+    g = Game()
+    # пустой кадр: только очистка экрана, её вычитаем
+    t_base = frame_ms(g, lambda g: None)
+    t_old = frame_ms(g, old_hud) - t_base
+    t_new = frame_ms(g, lambda g: g.hud.draw(g.world)) - t_base
+    print(f"HUD за кадр: draw_text {t_old:.3f} мс, Hud {t_new:.3f} мс")
+    g.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""замер загрузки уровней: arcade.load_tilemap против Level из кэша"""
+
+import pathlib
+import shutil
+import tempfile
+import time
+
+import arcade
+
+import levels
+from bench_colliders import wall_cells
+from colliders import merge_cells, rect_sprites
+from world import DATA, HASH_CELL, LevelSprites, World
+
+REPEAT = 5
+
+
+def old_reset(path):
+    # как reset() раньше: разбор TMX через arcade, классификация по имени
+    # текстуры и склейка стен из тайлов
+    m = arcade.load_tilemap(path)
+    out = []
+    walls = []
+    for layer in m.sprite_lists.values():
+        for it in layer:
+            kind = levels.kind_of(it.texture.name)
+            if kind:
+                out.append((kind, it.center_x, it.center_y))
+            if kind == levels.WALL:
+                walls.append(it)
+    blocked = wall_cells(walls, m.width, m.height, m.tile_width)
+    phys = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+    rect_sprites(merge_cells(blocked, m.width, m.height), m.tile_width, phys)
+    return out
+
+
+def new_reset(path, cache_dir, w):
+    # как reset() теперь: Level + спрайты из него
+    lv = levels.load_level(path, cache_dir)
+    fill(lv, w)
+    return lv
+
+
+def fill(lv, w):
+    # спрайты собирает настоящий World, только в свой новый набор
+    ls = LevelSprites(lv)
+    for _ in w.build_level(ls):
+        pass
+    return ls
+
+
+def ms(fn, repeat=REPEAT):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    w = World(preload=False, verbose=False)
+    cache_dir = pathlib.Path(tempfile.mkdtemp())
+    print(f"{'карта':<14} {'tmx, мс':>8} {'разбор, мс':>11} {'с диска, мс':>12} {'из памяти, мс':>14}")
+    try:
+        for lvl in range(1, 6):
+            path = DATA / f"levels{lvl:02d}.tmx"
+
+            # сверка: те же объекты на тех же местах
+            want = sorted(old_reset(path))
+            lv = levels.compile_tmx(path)
+            got = sorted((lv.kind[i], lv.x[i], lv.y[i]) for i in range(len(lv.kind)))
+            assert got == want, f"{path.name}: Level не совпадает с load_tilemap"
+
+            t_old = ms(lambda: old_reset(path))
+
+            def cold():
+                levels._load.cache_clear()
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                new_reset(path, cache_dir, w)
+
+            def disk():
+                levels._load.cache_clear()
+                new_reset(path, cache_dir, w)
+
+            t_cold = ms(cold)
+            t_disk = ms(disk)
+            t_mem = ms(lambda: new_reset(path, cache_dir, w))
+            print(f"{path.name:<14} {t_old:>8.2f} {t_cold:>11.2f} {t_disk:>12.2f} {t_mem:>14.2f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # уровни из levels.csv: файл разбирается один раз на все пять
+    csv_path = DATA / "levels.csv"
+    t_parse = ms(lambda: levels.compile_csv(csv_path))
+    print(f"levels.csv: разбор всех уровней {t_parse:.2f} мс")
+    for lvl in range(1, 6):
+        lv = levels.load_csv_level(csv_path, lvl)
+        g = fill(lv, w)
+        t = ms(lambda: fill(levels.load_csv_level(csv_path, lvl), w))
+        speeds = sorted(f.properties["speed"] for f in g.foes)
+        print(f"  уровень {lvl}: {t:.2f} мс, стен {len(g.phys_walls)}, врагов {len(g.foes)} (скорости {speeds}), "
+              f"кислорода {len(g.oxy_pick)}, выходов {len(g.exits)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""замер уровней детализации врагов (lod.py) на больших картах
+
+уровень 4, повторённый KxK раз: враги и их шаг, анимация. "все" - как будто
+каждый враг рядом с игроком (LOD_NEAR бесконечный), "lod" - как в игре.
+"""
+
+import math
+import time
+
+import arcade
+
+import lod
+from bench_chunks import build, tile_level
+from world import World, level_data
+
+REPEATS = (1, 5, 20)
+STEPS = 240
+
+
+def step_ms(w, lv):
+    ls = build(w, lv)
+    w.take_level(ls)
+    w.p = arcade.Sprite()
+    w.p.texture = w.player_tex[0]
+    w.p.center_x, w.p.center_y = lv.start
+    w.anim_timer = 0.0
+    w.anim_fr = 0
+    t0 = time.perf_counter()
+    for _ in range(STEPS):
+        w.tick += 1
+        w.update_foes(1 / 60)
+        w.update_animation(1 / 60)
+    return (time.perf_counter() - t0) / STEPS * 1000, int(w.lod.awake.sum())
+
+
+def main():
+    w = World(preload=False, verbose=False)
+    base = level_data("tmx", 4)
+    near = lod.LOD_NEAR
+    print(f"{'карта':>10} {'врагов':>7} {'рядом':>6} {'все, мс':>8} {'lod, мс':>8}")
+    for k in REPEATS:
+        lv = tile_level(base, k)
+        lod.LOD_NEAR = math.inf
+        full, _ = step_ms(w, lv)
+        lod.LOD_NEAR = near
+        t, awake = step_ms(w, lv)
+        print(f"{lv.cols:>5}x{lv.rows:<4} {len(w.foes):>7} {awake:>6} {full:>8.3f} {t:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""замер вспышек: Emitter на каждое касание против общего пула частиц
+
+игрок стоит во враге, и вспышка создаётся каждый кадр - как в handle_collisions.
+рисование не меряем (нужно окно), только обновление и сколько спрайтов и
+текстур создаётся за кадр.
+"""
+
+import random
+import time
+
+import arcade
+
+from particles import ParticlePool
+from world import HIT_COLOR
+
+FRAMES = 600
+DT = 1 / 60
+
+
+def old_fx(emitters, pos, col):
+    # как Game.spawn_fx раньше
+    tex = arcade.make_soft_circle_texture(6, col, 96, 255)
+
+    def particle_factory(_emitter):
+        return arcade.LifetimeParticle(
+            filename_or_texture=tex,
+            change_xy=(random.uniform(-1.5, 1.5), random.uniform(-1.5, 1.5)),
+            lifetime=random.uniform(0.2, 0.5),
+            scale=1.0,
+            alpha=220,
+        )
+
+    emitters.append(arcade.Emitter(
+        center_xy=pos,
+        emit_controller=arcade.EmitterIntervalWithTime(0.02, 0.15),
+        particle_factory=particle_factory,
+    ))
+
+
+def old_frame(emitters):
+    old_fx(emitters, (100, 100), HIT_COLOR)
+    for em in list(emitters):
+        em.update()
+        if em.can_reap():
+            emitters.remove(em)
+
+
+def counted(cls, box):
+    # считаем созданные объекты класса (и наследников, Particle - тоже Sprite)
+    init = cls.__init__
+
+    def wrapped(self, *args, **kwargs):
+        box[0] += 1
+        init(self, *args, **kwargs)
+
+    cls.__init__ = wrapped
+    return init
+
+
+def measure(frame):
+    # первая секунда - разогрев
+    for _ in range(60):
+        frame()
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        frame()
+    t = time.perf_counter() - t0
+
+    sprites = [0]
+    textures = [0]
+    s_init = counted(arcade.Sprite, sprites)
+    t_init = counted(arcade.Texture, textures)
+    try:
+        for _ in range(FRAMES):
+            frame()
+    finally:
+        arcade.Sprite.__init__ = s_init
+        arcade.Texture.__init__ = t_init
+    return t / FRAMES * 1000, sprites[0] / FRAMES, textures[0] / FRAMES
+
+
+def main():
+    emitters = []
+    t_old, s_old, x_old = measure(lambda: old_frame(emitters))
+
+    pool = ParticlePool(colors=(HIT_COLOR,))
+
+    def new_frame():
+        pool.burst((100, 100), HIT_COLOR)
+        pool.update(DT)
+
+    t_new, s_new, x_new = measure(new_frame)
+    print(f"{'':>8} {'кадр, мс':>9} {'спрайтов/кадр':>14} {'текстур/кадр':>13}")
+    print(f"{'Emitter':>8} {t_old:>9.3f} {s_old:>14.2f} {x_old:>13.2f}")
+    print(f"{'пул':>8} {t_new:>9.3f} {s_new:>14.2f} {x_new:>13.2f}")
+    print(f"живых частиц в пуле: {pool.alive()} из {pool.capacity}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""замер перехода на следующий уровень: загрузка в reset() против фоновой подготовки
+
+без окна: World сам грузит и собирает уровни.
+"""
+
+import time
+
+import bake
+import levels
+from world import LEVEL_SOURCE, PRELOAD_BUDGET, LevelSprites, World, level_data
+
+FRAME = 1 / 60
+
+
+def forget():
+    # как первый заход на уровень после запуска игры
+    levels._load.cache_clear()
+    levels._load_csv.cache_clear()
+    bake._baked.clear()
+    bake._tiles.clear()
+
+
+def sync_switch(g, n):
+    t0 = time.perf_counter()
+    ls = LevelSprites(level_data(LEVEL_SOURCE, n))
+    for _ in g.build_level(ls):
+        pass
+    return (time.perf_counter() - t0) * 1000
+
+
+def preload_switch(g, n):
+    # уровень n-1 только начался: запускаем подготовку и "играем" кадры
+    g.start_preload((LEVEL_SOURCE, n))
+    worst = 0.0
+    for _ in range(120):
+        t0 = time.perf_counter()
+        g.pump_preload()
+        worst = max(worst, time.perf_counter() - t0)
+        time.sleep(FRAME)
+    # игрок коснулся выхода
+    t0 = time.perf_counter()
+    ls = g.take_preload((LEVEL_SOURCE, n))
+    assert ls is not None and ls.static_layer is not None
+    return (time.perf_counter() - t0) * 1000, worst * 1000
+
+
+def main():
+    g = World(verbose=False)
+    print(f"бюджет на кадр: {PRELOAD_BUDGET * 1000:.1f} мс")
+    print(f"{'уровень':>8} {'reset, мс':>10} {'переход, мс':>12} {'худший кадр, мс':>16}")
+    for n in range(2, 6):
+        forget()
+        t_sync = sync_switch(g, n)
+        forget()
+        t_take, worst = preload_switch(g, n)
+        print(f"{n:>8} {t_sync:>10.2f} {t_take:>12.3f} {worst:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
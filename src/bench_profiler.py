@@ -0,0 +1,58 @@
+"""цена профайлера: World без окна с NullProfiler, с FrameProfiler и с trace
+
+игрок стоит на старте, как в bench_world.py; после замера печатаем
+перцентили этапов шага, которые набрал профайлер.
+"""
+
+import os
+import tempfile
+import time
+
+from profiler import PERCENTILES, FrameProfiler, NullProfiler
+from world import STATE_PLAY, World
+
+LEVEL = 1
+STEPS = 3000
+
+
+def run(w, prof):
+    w.prof = prof
+    w.start(LEVEL)
+    end_frame = getattr(prof, "end_frame", None)
+    n = 0
+    t0 = time.perf_counter()
+    while n < STEPS:
+        w.step()
+        if end_frame:
+            end_frame()
+        n += 1
+        if w.state != STATE_PLAY:
+            w.start(LEVEL)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    w = World(preload=False, verbose=False)
+    # первый запуск греет кэш уровня
+    run(w, NullProfiler())
+    t_null = run(w, NullProfiler())
+    prof = FrameProfiler()
+    t_prof = run(w, prof)
+    fd, path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    traced = FrameProfiler(trace=path)
+    t_trace = run(w, traced)
+    traced.close()
+    size = os.path.getsize(path)
+    os.remove(path)
+
+    print(f"шаг без профайлера {t_null:.1f} мкс, с профайлером {t_prof:.1f} мкс, "
+          f"с trace {t_trace:.1f} мкс ({size / STEPS:.0f} байт на кадр)")
+    print(f"{'этап':>12} " + " ".join(f"{'p' + str(q) + ', мс':>10}" for q in PERCENTILES))
+    for name, ms in prof.percentiles().items():
+        if any(ms):
+            print(f"{name:>12} " + " ".join(f"{t:>10.4f}" for t in ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""1000 перезапусков подряд: не растут ли память, число SpriteList и спрайтов
+
+как SPACE после "Кислород закончился": кислород кончился, уровень заново. два
+прогона: retry - всё время первый уровень, levels - уровни 1..5 по кругу.
+между перезапусками несколько шагов бота, чтобы враги ушли со старта, а
+баллоны подбирались. печатается время reset(), память (tracemalloc) и
+сколько живых SpriteList и спрайтов после первой сотни, на середине и в
+конце. утечка растёт с каждым перезапуском; разовый скачок памяти бывает и
+без неё (интерпретатор растит свои таблицы). с окном ещё считаются буферы,
+созданные на видеокарте после первой сотни.
+"""
+
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+
+import arcade
+
+from sweep import GreedyBot
+from world import STATE_OVER, STATE_PLAY, STEP, World
+
+RESTARTS = 1000
+STEPS = 10
+# после стольких перезапусков всё уже должно было вырасти до своего размера
+WARM = 100
+
+
+def live(cls):
+    return sum(1 for o in gc.get_objects() if isinstance(o, cls))
+
+
+def draw_level(w):
+    # на окне: первое рисование заводит буферы SpriteList на видеокарте
+    for lst in (w.walls, w.exits, w.oxy_pick, w.foes):
+        lst.draw()
+    w.p.draw()
+
+
+def soak(name, levels, ctx=None):
+    w = World(verbose=False)
+    bot = GreedyBot(random.Random(1))
+    times = []
+    marks = {}
+    for i in range(RESTARTS):
+        w.state = STATE_OVER
+        t0 = time.perf_counter()
+        w.start(levels[i % len(levels)])
+        times.append(time.perf_counter() - t0)
+        for _ in range(STEPS):
+            if w.state != STATE_PLAY:
+                break
+            bot(w)
+            w.step(STEP)
+        if ctx:
+            draw_level(w)
+        if i + 1 in (WARM, RESTARTS // 2, RESTARTS):
+            gc.collect()
+            marks[i + 1] = (
+                tracemalloc.get_traced_memory()[0],
+                live(arcade.SpriteList),
+                live(arcade.Sprite),
+                ctx.stats.buffer[0] if ctx else 0,
+            )
+    ms = [t * 1000 for t in times[WARM:]]
+    print(f"{name}: reset {statistics.mean(ms):.2f} мс в среднем, худший {max(ms):.2f} мс, "
+          f"спрайтов создано пулами: {w.ls.pool.made + w.spare.pool.made}")
+    buf0 = marks[WARM][3]
+    for n, (mem, lists, sprites, buf) in marks.items():
+        line = f"  после {n:>5}: память {mem / 1024:>6.0f} КБ, SpriteList {lists:>4}, спрайтов {sprites:>6}"
+        if ctx:
+            line += f", новых буферов {buf - buf0}"
+        print(line)
+    w.loader.shutdown()
+
+
+def main():
+    tracemalloc.start()
+    ctx = None
+    try:
+        win = arcade.Window(320, 240, visible=False)
+        ctx = win.ctx
+    except Exception as e:
+        print(f"окна нет ({e.__class__.__name__}): без счёта буферов видеокарты")
+    soak("retry", (1,), ctx)
+    soak("levels", (1, 2, 3, 4, 5), ctx)
+
+
+if __name__ == "__main__":
+    main()
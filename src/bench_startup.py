@@ -0,0 +1,74 @@
+"""замер запуска: от старта процесса до первого кадра меню
+
+игра запускается отдельным процессом, время считается от момента перед его
+запуском. метки:
+- import - main.py и всё, что он тянет (arcade, pyglet, numpy);
+- window - Game() создан: окно, World, надписи, звуки поставлены в очередь;
+- first_frame - первый on_draw дорисован;
+- sounds - все звуки догрузились в фоне (меню их не ждёт).
+без дисплея вместо окна создаются World и SoundBank, метка - init.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 5
+
+
+def child(t0):
+    marks = {}
+    import main
+
+    marks["import"] = time.time() - t0
+    try:
+        g = main.Game()
+    except Exception:
+        # без окна: всё, что Game() делает до первого кадра, кроме OpenGL
+        from assets import SoundBank
+        from world import World
+
+        World()
+        sounds = SoundBank()
+        marks["init"] = time.time() - t0
+        sounds.wait()
+        marks["sounds"] = time.time() - t0
+        print(json.dumps(marks))
+        return
+    marks["window"] = time.time() - t0
+    g.dispatch_events()
+    g.on_draw()
+    g.flip()
+    g.ctx.finish()
+    marks["first_frame"] = time.time() - t0
+    g.sounds.wait()
+    marks["sounds"] = time.time() - t0
+    print(json.dumps(marks))
+    g.close()
+
+
+def measure(runs=RUNS):
+    """{метка: медиана, мс} по runs запускам"""
+    got = {}
+    for _ in range(runs):
+        t0 = time.time()
+        out = subprocess.run([sys.executable, __file__, "--child", repr(t0)],
+                             capture_output=True, text=True, check=True).stdout
+        marks = json.loads(out.strip().splitlines()[-1])
+        for k, v in marks.items():
+            got.setdefault(k, []).append(v * 1000)
+    return {k: round(statistics.median(v), 1) for k, v in got.items()}
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--child":
+        child(float(sys.argv[2]))
+        return
+    for k, v in measure().items():
+        print(f"{k:>12} {v:>8.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""все замеры игры одним запуском: итог в JSON и сравнение с прошлым итогом
+
+разделы:
+- startup - от запуска процесса до первого кадра меню (bench_startup.py)
+- load    - reset() каждого levelsNN.tmx: первый запуск и повторный
+- update  - World.step по этапам профайлера, бот играет уровень (p50 и p95)
+- collide - враги и столкновения на сгенерированных картах растущего размера
+- draw    - on_draw и on_update окна по этапам; только если есть OpenGL
+
+всё, кроме draw, идёт без дисплея. все числа в metrics - мс, меньше - лучше;
+в info - размеры карт, с ними не сравниваем.
+
+python bench_suite.py [итог.json] [--only load,update] [--baseline прошлый.json] [--tolerance 0.25]
+
+с --baseline печатает, что стало медленнее больше чем на tolerance (и хотя бы
+на NOISE_MS), и выходит с кодом 1, если такое есть.
+"""
+
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+import bake
+import bench_startup
+import levels
+from levelgen import stress_level
+from profiler import DRAW_STAGES, UPDATE_STAGES, FrameProfiler, NullProfiler
+from sweep import GreedyBot
+from world import DATA, STATE_PLAY, STEP, World
+
+OUT = "bench.json"
+# меняем, когда меняются имена или смысл чисел
+VERSION = 1
+
+LOAD_RUNS = 5
+UPDATE_STEPS = 600
+DRAW_FRAMES = 300
+# карты для collide: (столбцов, строк, врагов)
+COLLIDE_MAPS = ((60, 40, 40), (150, 100, 250), (300, 200, 1000))
+COLLIDE_STEPS = 240
+
+# на одном и том же ядре числа гуляют на 10-20% от запуска к запуску
+TOLERANCE = 0.25
+# разница меньше этого - шум, а не регрессия
+NOISE_MS = 0.05
+
+# этапы World.step; остальные этапы on_update считает окно
+WORLD_STAGES = ("player", "physics", "foes", "collisions", "preload", "animation")
+
+
+def levels_in_data():
+    return [int(p.stem[6:]) for p in sorted(DATA.glob("levels[0-9][0-9].tmx"))]
+
+
+def forget():
+    # как первый заход на уровень после запуска игры
+    levels._load.cache_clear()
+    levels._load_csv.cache_clear()
+    bake._baked.clear()
+    bake._tiles.clear()
+
+
+def ms(t):
+    return round(t * 1000, 4)
+
+
+def bench_startup_times(out, info):
+    for name, t in bench_startup.measure().items():
+        out[f"startup.{name}"] = t
+
+
+def bench_load(out, info):
+    w = World(preload=False, verbose=False)
+    for lvl in levels_in_data():
+        cold = []
+        warm = []
+        for _ in range(LOAD_RUNS):
+            forget()
+            t0 = time.perf_counter()
+            w.start(lvl)
+            cold.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            w.start(lvl)
+            warm.append(time.perf_counter() - t0)
+        out[f"load.{lvl:02d}.cold"] = ms(np.median(cold))
+        out[f"load.{lvl:02d}.warm"] = ms(np.median(warm))
+
+
+def profile_steps(w, steps, start, bot=None):
+    """профайлер после steps шагов World; start() запускает уровень заново"""
+    prof = FrameProfiler(UPDATE_STAGES + ("frame",), frames=steps)
+    w.prof = prof
+    start()
+    for _ in range(steps):
+        if w.state != STATE_PLAY:
+            start()
+        if bot:
+            bot(w)
+        prof.begin()
+        w.step(STEP)
+        prof.end_frame()
+    w.prof = NullProfiler()
+    return prof
+
+
+def put_stages(out, prefix, prof, stages):
+    pct = prof.percentiles((50, 95))
+    for name in stages:
+        p50, p95 = pct[name]
+        out[f"{prefix}.{name}.p50"] = round(p50, 4)
+        out[f"{prefix}.{name}.p95"] = round(p95, 4)
+
+
+def bench_update(out, info):
+    w = World(preload=False, verbose=False)
+    for lvl in levels_in_data():
+        w.lvl_max = lvl
+        bot = GreedyBot(random.Random(lvl))
+        prof = profile_steps(w, UPDATE_STEPS, lambda: w.start(lvl), bot)
+        put_stages(out, f"update.{lvl:02d}", prof, WORLD_STAGES)
+
+
+def bench_collide(out, info):
+    w = World(preload=False, verbose=False)
+    for cols, rows, foes in COLLIDE_MAPS:
+        lv = stress_level(cols, rows, enemies=foes)
+        prof = profile_steps(w, COLLIDE_STEPS, lambda: w.play(lv))
+        name = f"collide.{cols}x{rows}"
+        put_stages(out, name, prof, ("foes", "collisions"))
+        info[name] = {"walls": len(lv.rects), "enemies": len(w.foes)}
+
+
+def bench_draw(out, info):
+    try:
+        from main import Game
+
+        g = Game()
+    except Exception as e:
+        print(f"draw: окна нет ({e.__class__.__name__}), пропускаю")
+        return
+    g.stop_music()
+    for lvl in levels_in_data():
+        g.world.lvl_max = lvl
+        g.world.start(lvl)
+        g.flush_events()
+        g.stop_music()
+        g.prof = prof = FrameProfiler(frames=DRAW_FRAMES)
+        g.world.prof = prof
+        for _ in range(DRAW_FRAMES):
+            g.on_update(STEP)
+            # on_draw сам закрывает кадр профайлера
+            g.on_draw()
+            # ждём видеокарту, иначе меряем только постановку команд в очередь
+            g.ctx.finish()
+        put_stages(out, f"draw.{lvl:02d}", prof, DRAW_STAGES + ("events", "particles", "frame"))
+    g.close()
+
+
+SECTIONS = {"startup": bench_startup_times, "load": bench_load, "update": bench_update, "collide": bench_collide, "draw": bench_draw}
+
+
+def run(only=None):
+    metrics = {}
+    info = {}
+    for name, fn in SECTIONS.items():
+        if only and name not in only:
+            continue
+        t0 = time.perf_counter()
+        fn(metrics, info)
+        print(f"{name}: {time.perf_counter() - t0:.1f} с")
+    return {
+        "version": VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "system": platform.platform(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "metrics": metrics,
+        "info": info,
+    }
+
+
+def compare(cur, base, tolerance=TOLERANCE):
+    """[(имя, было, стало)] по числам, которые выросли больше допуска"""
+    if base.get("version") != cur["version"]:
+        print(f"версия прошлого итога {base.get('version')}, а не {cur['version']}: сравниваю что совпадает")
+    worse = []
+    for name, value in cur["metrics"].items():
+        old = base["metrics"].get(name)
+        if old is None:
+            continue
+        if value > old * (1 + tolerance) and value - old > NOISE_MS:
+            worse.append((name, old, value))
+    return worse
+
+
+def main():
+    args = sys.argv[1:]
+    opts = {}
+    for flag in ("--only", "--baseline", "--tolerance"):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    out = args[0] if args else OUT
+    only = opts["--only"].split(",") if "--only" in opts else None
+
+    res = run(only)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(res, f, indent=1)
+    print(f"{len(res['metrics'])} чисел в {out}")
+
+    if "--baseline" in opts:
+        with open(opts["--baseline"], encoding="utf-8") as f:
+            base = json.load(f)
+        worse = compare(res, base, float(opts.get("--tolerance", TOLERANCE)))
+        if not worse:
+            print(f"медленнее, чем в {opts['--baseline']}, не стало")
+            return
+        print(f"медленнее, чем в {opts['--baseline']}:")
+        for name, old, value in worse:
+            print(f"  {name:<32} {old:>10.3f} -> {value:>10.3f} мс (+{value - old:.3f})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
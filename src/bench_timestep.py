@@ -0,0 +1,115 @@
+"""игра при разной частоте кадров: dt кадра прямо в World (как было) и FixedStep
+
+кадры без окна: 30, 60 и 144 Гц с разбросом 10%, и 60 Гц, где раз в секунду
+кадр тянется HITCH с. бот играет первый уровень SECONDS секунд по часам.
+по каждому прогону печатается:
+- шагов - сколько раз шагнул World;
+- игрок px/с - путь игрока за секунду игры, пока он идёт;
+- враг px/шаг - самый большой сдвиг врага за один шаг (больше толщины
+  стены - может проскочить её);
+- как в 60 Гц - совпадает ли игра шаг в шаг с эталоном: World с шагом STEP,
+  тот же бот и столько же шагов.
+у FixedStep ещё выброшенное время: сколько не догнали из-за MAX_CATCHUP.
+"""
+
+import math
+import random
+
+from replay import snapshot
+from sweep import GreedyBot
+from timestep import FixedStep, Interp
+from world import STATE_PLAY, STEP, World
+
+SECONDS = 20
+RATES = (30, 60, 144)
+JITTER = 0.1
+HITCH = 0.25
+
+
+def frames(rate, hitch=False, seed=1):
+    rng = random.Random(seed)
+    t = 0.0
+    out = []
+    while t < SECONDS:
+        dt = 1 / rate * (1 + rng.uniform(-JITTER, JITTER))
+        if hitch and int(t + dt) > int(t):
+            dt += HITCH
+        out.append(dt)
+        t += dt
+    return out
+
+
+class Probe:
+    """бот плюс замеры за шагом World"""
+
+    def __init__(self, w):
+        self.w = w
+        self.bot = GreedyBot(random.Random(7))
+        self.walk = 0.0
+        self.walk_t = 0.0
+        self.foe_jump = 0.0
+        self.steps = 0
+        w.start(1)
+
+    def step(self, dt):
+        w = self.w
+        if w.state != STATE_PLAY:
+            w.start(1)
+        self.bot(w)
+        x0, y0 = w.p.position
+        foes = [f.position for f in w.foes]
+        w.step(dt)
+        self.steps += 1
+        if w.p.change_x or w.p.change_y:
+            self.walk += math.hypot(w.p.center_x - x0, w.p.center_y - y0)
+            self.walk_t += dt
+        if len(foes) == len(w.foes):
+            for (fx, fy), f in zip(foes, w.foes):
+                self.foe_jump = max(self.foe_jump, math.hypot(f.center_x - fx, f.center_y - fy))
+
+
+def reference(steps):
+    p = Probe(World(preload=False, verbose=False))
+    for _ in range(steps):
+        p.step(STEP)
+    return snapshot(p.w)
+
+
+def run_raw(dts):
+    p = Probe(World(preload=False, verbose=False))
+    for dt in dts:
+        p.step(dt)
+    return p, None
+
+
+def run_fixed(dts):
+    # как GameBase.on_update и on_draw: шаги по FixedStep, рисование между ними
+    p = Probe(World(preload=False, verbose=False))
+    clock = FixedStep()
+    interp = Interp()
+    for dt in dts:
+        n = clock.advance(dt)
+        for i in range(n):
+            if i == n - 1:
+                interp.save(p.w)
+            p.step(STEP)
+        interp.apply(p.w, clock.alpha())
+        interp.restore()
+    return p, clock
+
+
+def main():
+    cases = [(f"{rate} Гц", frames(rate)) for rate in RATES]
+    cases.append((f"60 Гц + {HITCH * 1000:.0f} мс", frames(60, hitch=True)))
+    print(f"{'кадры':>16} {'цикл':>6} {'шагов':>6} {'игрок px/с':>11} {'враг px/шаг':>12} {'как в 60 Гц':>12} {'выброшено, с':>13}")
+    for name, dts in cases:
+        for loop, run in (("dt", run_raw), ("fixed", run_fixed)):
+            p, clock = run(dts)
+            same = "да" if snapshot(p.w) == reference(p.steps) else "нет"
+            speed = p.walk / p.walk_t if p.walk_t else 0.0
+            dropped = f"{clock.dropped:.2f}" if clock else "-"
+            print(f"{name:>16} {loop:>6} {p.steps:>6} {speed:>11.0f} {p.foe_jump:>12.1f} {same:>12} {dropped:>13}")
+
+
+if __name__ == "__main__":
+    main()
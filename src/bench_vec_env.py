@@ -0,0 +1,57 @@
+"""замер VecEnv: шагов игр в секунду на одном ядре против World без окна"""
+
+import time
+
+import numpy as np
+
+from vec_env import ACTIONS, VecEnv, next_table
+from world import STATE_PLAY, World, level_data
+
+LEVEL = 3
+SECONDS = 2.0
+
+
+def env_rate(n):
+    env = VecEnv(n, lvl=LEVEL)
+    rng = np.random.default_rng(0)
+    steps = 0
+    dones = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < SECONDS:
+        _, _, done = env.step(rng.integers(len(ACTIONS), size=n))
+        steps += 1
+        dones += int(done.sum())
+    t = time.perf_counter() - t0
+    return steps * n / t, t / steps * 1000, dones
+
+
+def world_rate():
+    w = World(preload=False, verbose=False)
+    w.lvl_max = LEVEL
+    w.start(LEVEL)
+    steps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < SECONDS:
+        w.step()
+        steps += 1
+        if w.state != STATE_PLAY:
+            w.start(LEVEL)
+    return steps / (time.perf_counter() - t0)
+
+
+def main():
+    lv = level_data("tmx", LEVEL)
+    table = next_table(lv)
+    t0 = time.perf_counter()
+    table.row(table.flow.cell(*lv.start))
+    print(f"строка таблицы путей уровня {LEVEL}: {(time.perf_counter() - t0) * 1000:.1f} мс "
+          f"(одна на клетку игрока, держится до {table.max_rows} строк)")
+    print(f"World: {world_rate():.0f} шагов/с")
+    print(f"{'игр':>6} {'шагов игр/с':>12} {'вызов, мс':>10} {'эпизодов':>9}")
+    for n in (1, 64, 1024, 4096):
+        rate, ms, dones = env_rate(n)
+        print(f"{n:>6} {rate:>12.0f} {ms:>10.3f} {dones:>9}")
+
+
+if __name__ == "__main__":
+    main()
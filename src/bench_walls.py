@@ -0,0 +1,63 @@
+"""замер: сколько стоят проверки врагов со стенами при разном числе тайлов"""
+
+import random
+import time
+
+import arcade
+
+from world import HASH_CELL
+
+TILE = 32
+FOES = 50
+FRAMES = 20
+
+
+def make_walls(n, use_hash):
+    # стены как на картах: тайлы 32x32 по сетке, примерно половина клеток занята
+    walls = arcade.SpriteList(use_spatial_hash=use_hash, spatial_hash_cell_size=HASH_CELL)
+    side = int((n * 2) ** 0.5) + 1
+    rnd = random.Random(n)
+    cells = [(c, r) for c in range(side) for r in range(side)]
+    for c, r in rnd.sample(cells, n):
+        w = arcade.SpriteSolidColor(TILE, TILE, arcade.color.GRAY)
+        w.center_x = c * TILE + TILE / 2
+        w.center_y = r * TILE + TILE / 2
+        walls.append(w)
+    return walls, side * TILE
+
+
+def make_foes(size):
+    rnd = random.Random(1)
+    foes = []
+    for _ in range(FOES):
+        f = arcade.SpriteSolidColor(TILE, TILE, arcade.color.RED)
+        f.center_x = rnd.uniform(0, size)
+        f.center_y = rnd.uniform(0, size)
+        foes.append(f)
+    return foes
+
+
+def frame_cost(walls, foes):
+    # как в update_foes: две проверки на врага за кадр
+    # method=3 - честный перебор на процессоре, без окна и GPU
+    method = 1 if walls.spatial_hash else 3
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        for foe in foes:
+            arcade.check_for_collision_with_list(foe, walls, method)
+            arcade.check_for_collision_with_list(foe, walls, method)
+    return (time.perf_counter() - t0) / FRAMES * 1000
+
+
+def main():
+    print(f"врагов: {FOES}, мс на кадр")
+    print(f"{'стен':>6} {'перебор':>9} {'сетка':>9}")
+    for n in (250, 1000, 4000, 16000):
+        walls_list, size = make_walls(n, False)
+        walls_hash, _ = make_walls(n, True)
+        foes = make_foes(size)
+        print(f"{n:>6} {frame_cost(walls_list, foes):>9.3f} {frame_cost(walls_hash, foes):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
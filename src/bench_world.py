@@ -0,0 +1,32 @@
+"""замер World без окна: сколько игровых секунд считается за секунду
+
+игрок стоит на старте, пока не кончится кислород - так видно цену шага
+на каждом уровне без ввода и без отрисовки.
+"""
+
+import time
+
+from world import STATE_OVER, STEP, World
+
+RUNS = 20
+
+
+def main():
+    w = World(preload=False, verbose=False)
+    print(f"{'уровень':>8} {'шагов':>7} {'игра, с':>8} {'шаг, мс':>8} {'быстрее, раз':>13}")
+    for lvl in range(1, w.lvl_max + 1):
+        # первый запуск греет кэш уровня, его не считаем
+        w.start(lvl)
+        steps = 0
+        t0 = time.perf_counter()
+        for _ in range(RUNS):
+            w.start(lvl)
+            steps += w.run(600)
+            assert w.state == STATE_OVER
+        t = time.perf_counter() - t0
+        sim = steps * STEP
+        print(f"{lvl:>8} {steps // RUNS:>7} {sim / RUNS:>8.1f} {t / steps * 1000:>8.3f} {sim / t:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
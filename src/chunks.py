@@ -0,0 +1,139 @@
+"""спрайты уровня кусками: рисуется только то, что рядом с камерой
+
+карта режется на квадраты CHUNK_TILES x CHUNK_TILES тайлов, у каждого квадрата
+свой SpriteList. спрайт попадает в квадрат, где его центр; спрайты больше
+квадрата (длинные стены из csv) лежат отдельно и рисуются всегда. на экран
+идут квадраты, которые задевает окно камеры с запасом CULL_MARGIN, так что
+цена кадра зависит от размера экрана, а не карты.
+
+спрайт может лежать в нескольких SpriteList сразу, поэтому списки World
+(для столкновений) остаются как были, а куски только для рисования.
+remove_from_sprite_lists() убирает спрайт и из куска. при смене уровня
+куски не выбрасываются, а пустеют (empty()) и заполняются снова.
+"""
+
+import arcade
+import numpy as np
+
+from pool import empty
+
+# сторона куска в тайлах
+CHUNK_TILES = 16
+# сколько px за краем экрана ещё рисуем
+CULL_MARGIN = 64
+
+
+class ChunkedList:
+    """SpriteList, разложенный по квадратам size x size px"""
+
+    def __init__(self, size):
+        self.size = size
+        # (столбец, строка) -> SpriteList
+        self.lists = {}
+        # спрайты больше куска
+        self.big = arcade.SpriteList()
+        # в каком куске лежит спрайт - для move()
+        self.where = {}
+        # столбцы и строки кусков по порядку спрайтов - для move_xy()
+        self.cols = None
+        self.rows = None
+
+    def key(self, x, y):
+        return int(x // self.size), int(y // self.size)
+
+    def add(self, s):
+        if s.width > self.size or s.height > self.size:
+            self.big.append(s)
+            return
+        k = self.where[s] = self.key(s.center_x, s.center_y)
+        lst = self.lists.get(k)
+        if lst is None:
+            lst = self.lists[k] = arcade.SpriteList()
+        lst.append(s)
+
+    def extend(self, sprites):
+        for s in sprites:
+            self.add(s)
+
+    def move(self, sprites):
+        # перекладывает спрайты, которые ушли в другой кусок (враги)
+        lists = self.lists
+        where = self.where
+        size = self.size
+        for s in sprites:
+            k = (int(s.center_x // size), int(s.center_y // size))
+            old = where.get(s)
+            if k == old or old is None:
+                continue
+            lists[old].remove(s)
+            where[s] = k
+            lst = lists.get(k)
+            if lst is None:
+                lst = lists[k] = arcade.SpriteList()
+            lst.append(s)
+
+    def move_xy(self, sprites, x, y):
+        """как move(), но куски считаются numpy по массивам позиций x, y
+
+        x, y - позиции sprites по порядку (FoeLod или FoeBatch). питоновская
+        работа - только у тех, кто перешёл в другой кусок, а не у всех врагов.
+        """
+        cols = (x // self.size).astype(np.int64)
+        rows = (y // self.size).astype(np.int64)
+        if self.cols is None or len(self.cols) != len(cols):
+            # первый кадр уровня: куски всех спрайтов
+            self.move(sprites)
+            self.cols = cols
+            self.rows = rows
+            return
+        idx = np.flatnonzero((cols != self.cols) | (rows != self.rows))
+        if len(idx):
+            self.move([sprites[i] for i in idx.tolist()])
+            self.cols[idx] = cols[idx]
+            self.rows[idx] = rows[idx]
+
+    def visible(self, left, bottom, width, height, margin=CULL_MARGIN):
+        """куски, которые задевает прямоугольник с запасом margin"""
+        # спрайт торчит из своего куска не больше чем на полкуска
+        pad = self.size / 2 + margin
+        c0, r0 = self.key(left - pad, bottom - pad)
+        c1, r1 = self.key(left + width + pad, bottom + height + pad)
+        lists = self.lists
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                lst = lists.get((c, r))
+                if lst:
+                    yield lst
+
+    def draw(self, left, bottom, width, height, margin=CULL_MARGIN):
+        if self.big:
+            self.big.draw()
+        for lst in self.visible(left, bottom, width, height, margin):
+            lst.draw()
+
+    def empty(self):
+        # спрайты уходят, а SpriteList кусков остаются для следующего уровня
+        for lst in self.lists.values():
+            empty(lst)
+        empty(self.big)
+        self.where.clear()
+        self.cols = None
+        self.rows = None
+
+    def __len__(self):
+        return sum(len(lst) for lst in self.lists.values()) + len(self.big)
+
+
+class LevelChunks:
+    """куски для всех видимых списков уровня"""
+
+    def __init__(self, lv, tiles=CHUNK_TILES):
+        size = self.size = tiles * lv.tile_w
+        self.walls = ChunkedList(size)
+        self.exits = ChunkedList(size)
+        self.oxy_pick = ChunkedList(size)
+        self.foes = ChunkedList(size)
+
+    def empty(self):
+        for ch in (self.walls, self.exits, self.oxy_pick, self.foes):
+            ch.empty()
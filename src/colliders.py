@@ -0,0 +1,50 @@
+import arcade
+
+# цвет тут не важен: прямоугольники стен только для физики и не рисуются
+COLLIDER_COLOR = arcade.color.BLACK
+
+
+def merge_cells(blocked, cols, rows):
+    """жадно склеивает занятые клетки в прямоугольники (c, r, w, h)
+
+    идём по строкам снизу вверх, тянем прямоугольник вправо, пока клетки заняты,
+    а потом вверх, пока вся его ширина занята. каждая клетка попадает ровно в один
+    прямоугольник.
+    """
+    used = bytearray(cols * rows)
+    rects = []
+    for r in range(rows):
+        for c in range(cols):
+            i = r * cols + c
+            if not blocked[i] or used[i]:
+                continue
+            w = 1
+            while c + w < cols and blocked[i + w] and not used[i + w]:
+                w += 1
+            h = 1
+            while r + h < rows:
+                j = (r + h) * cols + c
+                if not all(blocked[j + k] and not used[j + k] for k in range(w)):
+                    break
+                h += 1
+            for rr in range(r, r + h):
+                for k in range(w):
+                    used[rr * cols + c + k] = 1
+            rects.append((c, r, w, h))
+    return rects
+
+
+def rect_sprites(rects, tile, sprite_list, color=COLLIDER_COLOR, pool=None):
+    # по спрайту на прямоугольник; для физики они не рисуются, поэтому цвет любой.
+    # с pool (см. pool.py) спрайты берутся из него, а не создаются заново
+    for c, r, w, h in rects:
+        x = (c + w / 2) * tile
+        y = (r + h / 2) * tile
+        if pool is not None:
+            s = pool.solid(w * tile, h * tile, color, x, y)
+        else:
+            s = arcade.SpriteSolidColor(w * tile, h * tile, color)
+            s.center_x = x
+            s.center_y = y
+        sprite_list.append(s)
+    return sprite_list
@@ -0,0 +1,71 @@
+from collections import deque
+
+# соседи клетки: влево, вправо, вниз, вверх
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class FlowField:
+    """общее для всех врагов поле путей к игроку
+
+    один BFS по сетке тайлов от клетки игрока, пересчитывается только когда
+    игрок переходит в другую клетку. враг просто берёт из поля следующую клетку.
+    """
+
+    def __init__(self, cols, rows, tile, blocked):
+        self.cols = cols
+        self.rows = rows
+        self.tile = tile
+        # 1 - клетка занята стеной (Level.blocked)
+        self.blocked = blocked
+
+        # куда идти из клетки (индекс соседней клетки), -1 если пути нет
+        self.next = [-1] * (cols * rows)
+        self.goal = -1
+
+    def cell(self, x, y):
+        c = int(x // self.tile)
+        r = int(y // self.tile)
+        if 0 <= c < self.cols and 0 <= r < self.rows:
+            return r * self.cols + c
+        return -1
+
+    def update(self, x, y):
+        # пересчёт только при смене клетки игрока
+        goal = self.cell(x, y)
+        if goal == self.goal:
+            return False
+        self.goal = goal
+
+        cols = self.cols
+        rows = self.rows
+        blocked = self.blocked
+        nxt = [-1] * (cols * rows)
+        if goal >= 0:
+            nxt[goal] = goal
+            q = deque([goal])
+            while q:
+                i = q.popleft()
+                c = i % cols
+                r = i // cols
+                for dc, dr in NEIGHBOURS:
+                    nc = c + dc
+                    nr = r + dr
+                    if 0 <= nc < cols and 0 <= nr < rows:
+                        j = nr * cols + nc
+                        if nxt[j] == -1 and not blocked[j]:
+                            nxt[j] = i
+                            q.append(j)
+        self.next = nxt
+        return True
+
+    def target(self, x, y, gx, gy):
+        # точка, к которой враг должен идти сейчас
+        i = self.cell(x, y)
+        if i < 0 or i == self.goal:
+            return gx, gy
+        j = self.next[i]
+        if j < 0:
+            # пути нет (враг застрял в стене или отрезан) - идём напрямую
+            return gx, gy
+        t = self.tile
+        return (j % self.cols) * t + t / 2, (j // self.cols) * t + t / 2
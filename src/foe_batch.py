@@ -0,0 +1,175 @@
+import numpy as np
+
+# как snap() в world: ближе этого к цели - встаём точно в неё
+SNAP = 0.01
+
+
+def hit_shape(sprite):
+    # точки хитбокса относительно центра и нормали его рёбер
+    return shape_of([(x - sprite.center_x, y - sprite.center_y) for x, y in sprite.get_adjusted_hit_box()])
+
+
+def shape_of(points):
+    pts = np.array(points, dtype=np.float64)
+    edges = np.roll(pts, -1, axis=0) - pts
+    normals = np.stack([edges[:, 1], -edges[:, 0]], axis=1)
+    return pts, normals
+
+
+def overlap(ax, ay, a, bx, by, b):
+    """пересечение многоугольников a и b со сдвигами (ax, ay) и (bx, by)
+
+    та же теорема о разделяющей оси, что в arcade.are_polygons_intersecting,
+    только сразу для массива позиций. касание краем - не пересечение.
+    """
+    hit = True
+    for normals in (a[1], b[1]):
+        for nx, ny in normals:
+            pa = a[0] @ (nx, ny)
+            pb = b[0] @ (nx, ny)
+            sa = ax * nx + ay * ny
+            sb = bx * nx + by * ny
+            hit = hit & ~((sa + pa.max() <= sb + pb.min()) | (sb + pb.max() <= sa + pa.min()))
+    return hit
+
+
+class FoeBatch:
+    """все враги уровня в массивах numpy
+
+    делает то же, что World.update_foes, только сразу для всех: цель из поля
+    путей, шаг, раздельные проверки стен по x и y и касание игрока. стены берутся
+    из сетки FlowField.blocked, поэтому проверка стоит O(1) на врага.
+    textures - кадры анимации врагов; хитбокс у каждого врага от его кадра
+    (frame), кадр меняет set_frame вместе с текстурой спрайта.
+    """
+
+    def __init__(self, foes, flow, textures):
+        self.sprites = list(foes)
+        self.flow = flow
+
+        self.x = np.array([f.center_x for f in self.sprites], dtype=np.float64)
+        self.y = np.array([f.center_y for f in self.sprites], dtype=np.float64)
+        self.speed = np.array([f.properties["speed"] for f in self.sprites], dtype=np.float64)
+
+        # хитбокс на каждый кадр; номер кадра по текстуре спрайта (reset ставит первый)
+        self.shapes = [shape_of(t.hit_box_points) for t in textures]
+        index = {id(t): k for k, t in enumerate(textures)}
+        self.frame = np.array([index[id(f.texture)] for f in self.sprites], dtype=np.int64)
+        # общий прямоугольник всех кадров: по нему только выбираются клетки
+        pts = np.concatenate([shape[0] for shape in self.shapes])
+        self.hx0, self.hy0 = pts.min(axis=0)
+        self.hx1, self.hy1 = pts.max(axis=0)
+
+        # сетка стен с рамкой в одну пустую клетку: за картой стен нет
+        t = flow.tile
+        grid = np.frombuffer(bytes(flow.blocked), dtype=np.uint8).reshape(flow.rows, flow.cols)
+        self.blocked = np.pad(grid, 1).astype(bool)
+        self.tile = t
+        h = t / 2
+        square = np.array([(-h, -h), (h, -h), (h, h), (-h, h)])
+        self.cell_shape = (square, np.array([(0.0, -1.0), (1.0, 0.0), (0.0, 1.0), (-1.0, 0.0)]))
+
+        # центры клеток, куда ведёт поле; обновляются при пересчёте поля
+        self.goal = None
+        self.next_x = None
+        self.next_y = None
+
+    def sync_flow(self):
+        if self.goal == self.flow.goal:
+            return
+        self.goal = self.flow.goal
+        nxt = np.asarray(self.flow.next)
+        t = self.tile
+        self.next_ok = nxt >= 0
+        self.next_x = (nxt % self.flow.cols) * t + t / 2
+        self.next_y = (nxt // self.flow.cols) * t + t / 2
+
+    def targets(self, x, y, px, py):
+        flow = self.flow
+        c = np.floor(x / self.tile).astype(np.int64)
+        r = np.floor(y / self.tile).astype(np.int64)
+        inside = (c >= 0) & (c < flow.cols) & (r >= 0) & (r < flow.rows)
+        i = np.where(inside, r * flow.cols + c, 0)
+        use = inside & (i != flow.goal) & self.next_ok[i]
+        tx = np.where(use, self.next_x[i], px)
+        ty = np.where(use, self.next_y[i], py)
+        return tx, ty
+
+    def set_frame(self, idx, k):
+        self.frame[idx] = k
+
+    def overlap_frames(self, x, y, frame, bx, by, b):
+        # overlap с хитбоксом кадра каждого врага: по разу на кадр
+        hit = np.zeros(len(x), dtype=bool)
+        for k, shape in enumerate(self.shapes):
+            m = frame == k
+            if m.any():
+                bxm = bx[m] if np.ndim(bx) else bx
+                bym = by[m] if np.ndim(by) else by
+                hit[m] = overlap(x[m], y[m], shape, bxm, bym, b)
+        return hit
+
+    def hits_wall(self, x, y, frame):
+        # клетки, которые задевает прямоугольник хитбокса (касание краем не в счёт),
+        # а по ним уже точная проверка формы, как у arcade
+        t = self.tile
+        rows, cols = self.blocked.shape
+        c0 = np.clip(np.floor((x + self.hx0) / t).astype(np.int64) + 1, 0, cols - 1)
+        c1 = np.clip(np.ceil((x + self.hx1) / t).astype(np.int64), 0, cols - 1)
+        r0 = np.clip(np.floor((y + self.hy0) / t).astype(np.int64) + 1, 0, rows - 1)
+        r1 = np.clip(np.ceil((y + self.hy1) / t).astype(np.int64), 0, rows - 1)
+        hit = np.zeros(len(x), dtype=bool)
+        for c, r in ((c0, r0), (c1, r0), (c0, r1), (c1, r1)):
+            wall = self.blocked[r, c]
+            if not wall.any():
+                continue
+            # центр клетки в координатах карты (в сетке есть рамка в одну клетку)
+            cx = (c - 0.5) * t
+            cy = (r - 0.5) * t
+            hit[wall] |= self.overlap_frames(x[wall], y[wall], frame[wall], cx[wall], cy[wall], self.cell_shape)
+        return hit
+
+    def update(self, px, py, dt, idx=None):
+        """шаг врагов с номерами idx (все, если None); dt - число или массив на каждого"""
+        self.sync_flow()
+        if idx is None:
+            idx = np.arange(len(self.sprites))
+        x = self.x[idx]
+        y = self.y[idx]
+        frame = self.frame[idx]
+        tx, ty = self.targets(x, y, px, py)
+
+        dx = tx - x
+        dy = ty - y
+        dist = np.hypot(dx, dy)
+        moving = dist > 0
+        step = self.speed[idx] * dt
+        k = np.where(dist > step, step / np.where(moving, dist, 1), 1.0)
+        sx = dx * k
+        sy = dy * k
+
+        nx = x + sx
+        nx = np.where(np.abs(tx - nx) < SNAP, tx, nx)
+        hit_x = moving & self.hits_wall(nx, y, frame)
+        x = np.where(moving & ~hit_x, nx, x)
+        # по x упёрлись - весь шаг в скольжение по y
+        sy = np.where(hit_x, np.clip(dy, -step, step), sy)
+
+        ny = y + sy
+        ny = np.where(np.abs(ty - ny) < SNAP, ty, ny)
+        hit_y = moving & self.hits_wall(x, ny, frame)
+        y = np.where(moving & ~hit_y, ny, y)
+
+        # спрайты трогаем только у тех, кто сдвинулся
+        moved = (x != self.x[idx]) | (y != self.y[idx])
+        self.x[idx] = x
+        self.y[idx] = y
+        self.write_back(idx[moved])
+
+    def write_back(self, idx):
+        sprites = self.sprites
+        for i, x, y in zip(idx.tolist(), self.x[idx].tolist(), self.y[idx].tolist()):
+            sprites[i].position = (x, y)
+
+    def touching(self, p):
+        return bool(np.any(self.overlap_frames(self.x, self.y, self.frame, p.center_x, p.center_y, hit_shape(p))))
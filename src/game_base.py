@@ -1,311 +1,255 @@
-import math
-import pathlib
+import random
+import time
+
 import arcade
 
+from assets import SoundBank, pack_atlas, tile_textures
+from hud import Hud, ProfilerOverlay
+from mixer import Mixer
+from particles import ParticlePool
+from profiler import FrameProfiler
+from replay import Player, Recorder
+from timestep import FixedStep, Interp, foe_xy
+from world import HIT_COLOR, PICK_COLOR, STATE_CLEAR, STATE_MENU, STATE_OVER, STATE_PLAY, STEP, World
+
 SCREEN_W = 960
 SCREEN_H = 640
 TITLE = "I Can't Breathe"
 
-# пути к файлам игры
-DATA = pathlib.Path(__file__).resolve().parent.parent / "data"
-ASSETS = pathlib.Path(__file__).resolve().parent.parent / "assets"
-
-# основные числа для баланса
-PLAYER_SPEED = 5
-ENEMY_SPEED = 120
-OXY_DRAIN_PER_SEC = 6
-OXY_HIT_LOSS = 18
-LOW_OXY_THRESHOLD = 25
-MAX_OXY = 100
-
-# состояния экрана
-STATE_MENU = "menu"
-STATE_PLAY = "play"
-STATE_OVER = "over"
-STATE_CLEAR = "clear"
+# стены и выход рисуются одной заранее склеенной картинкой (F2 - переключить)
+BAKE_STATIC = True
+# куда писать время этапов каждого кадра (jsonl); None - не писать
+PROFILE_TRACE = None
+# куда записать игру для повтора (см. replay.py); None - не записывать
+RECORD_REPLAY = None
+# как часто окно зовёт on_update; World всё равно шагает на STEP (см. timestep.py),
+# так что на слабом железе можно реже - игра от этого не меняется
+UPDATE_RATE = 1 / 60
+# какую долю пути до игрока камера проходит за время STEP
+CAM_FOLLOW = 0.25
 
 
 class GameBase(arcade.Window):
-    """здесь базовая логика, анимация и эффекты добавляются в main.py"""
+    """окно: рисует World, передаёт ему кнопки и играет его события
+
+    сама логика игры в world.py, анимация и эффекты добавляются в main.py
+    """
 
     def __init__(self) -> None:
-        super().__init__(SCREEN_W, SCREEN_H, TITLE, update_rate=1 / 60)
+        super().__init__(SCREEN_W, SCREEN_H, TITLE, update_rate=UPDATE_RATE)
         arcade.set_background_color(arcade.color.BLACK_OLIVE)
 
-        # текущее состояние игры
-        self.state = STATE_MENU
-        self.lvl = 1
-        self.lvl_max = 5
-        self.oxy = MAX_OXY
-        self.t_alive = 0.0
-        self.anim_timer = 0.0
-
-        # игрок и физика
-        self.p = None
-        self.phys = None
-
-        self.walls = arcade.SpriteList()
-        self.phys_walls = arcade.SpriteList()
-        self.foes = arcade.SpriteList()
-        self.oxy_pick = arcade.SpriteList()
-        self.exits = arcade.SpriteList()
-        self.emitters: list[arcade.Emitter] = []
-
-        self.dead_played = False
-        self.music_player = None
-
-        # какие кнопки зажаты
-        self.mv_l = False
-        self.mv_r = False
-        self.mv_u = False
-        self.mv_d = False
+        self.world = World()
+        # спрайты следующего уровня собираются раз за кадр, а не за шаг World:
+        # догоняющий кадр и так медленный (см. pump_preload ниже)
+        self.world.pump_each_step = False
+        # частицы всех вспышек, текстуры обоих цветов готовы заранее
+        self.particles = ParticlePool(colors=(HIT_COLOR, PICK_COLOR))
+
+        # неподвижная часть уровня одной текстурой
+        self.bake = BAKE_STATIC
+
+        # музыку просили включить - заиграет, как только догрузится
+        self.want_music = False
+        # текстуры кладутся в атлас при первом запуске уровня
+        self.atlas_packed = False
+
+        # World шагает на STEP при любом dt кадра, а рисуется между шагами
+        self.clock = FixedStep()
+        self.interp = Interp()
+        # когда был последний on_update и последний on_draw
+        self.t_update = time.perf_counter()
+        self.t_draw = self.t_update
 
         # камеры
         self.cam = arcade.Camera(self.width, self.height)
         self.cam_ui = arcade.Camera(self.width, self.height)
 
-        # текстуры персонажей
-        self.player_tex = [
-            arcade.load_texture(ASSETS / "models" / "player1.png"),
-            arcade.load_texture(ASSETS / "models" / "player2.png"),
-        ]
-        self.enemy_tex = [
-            arcade.load_texture(ASSETS / "models" / "enemy1.png"),
-            arcade.load_texture(ASSETS / "models" / "enemy2.png"),
-        ]
-
-        # звуки
-        self.s_pick = arcade.load_sound(ASSETS / "audio" / "pickup.wav")
-        self.s_dead = arcade.load_sound(ASSETS / "audio" / "death.wav")
-        self.s_music = arcade.load_sound(ASSETS / "audio" / "music.wav")
-        self.s_start = arcade.load_sound(ASSETS / "audio" / "start.wav")
-
-
-    def play_sound(self, snd, vol=0.6, loop=False):
-        if snd:
-            try:
-                return snd.play(volume=vol, loop=loop)
-            except Exception:
-                return None
-        return None
+        # надписи создаются один раз, см. hud.py
+        self.hud = Hud(self.ctx, TITLE, self.width, self.height)
+
+        # время этапов кадра, таблица по F3
+        self.prof = FrameProfiler(trace=PROFILE_TRACE)
+        self.world.prof = self.prof
+        self.prof_overlay = ProfilerOverlay(self.ctx, self.prof, self.width, self.height)
+
+        # запись игры и её повтор
+        self.recorder = None
+        self.replay = None
+        self.replay_speed = 1
+        if RECORD_REPLAY:
+            self.recorder = Recorder()
+            self.world.rec = self.recorder
+            self.particles.rng = random.Random(self.recorder.seed)
+
+        # звуки грузятся в фоне, меню появляется сразу; играют через голоса микшера
+        self.sounds = SoundBank()
+        self.mixer = Mixer(self.sounds)
+
+    def play_sound(self, name, vol=0.6):
+        return self.mixer.play(name, vol)
 
     def start_music(self):
-        if self.s_music and not self.music_player:
-            self.music_player = self.play_sound(self.s_music, vol=0.25, loop=True)
+        self.want_music = True
+        self.mixer.start_music()
 
     def stop_music(self):
-        try:
-            if self.music_player and hasattr(self.music_player, "pause"):
-                self.music_player.pause()
-            if self.music_player and hasattr(self.music_player, "delete"):
-                self.music_player.delete()
-        finally:
-            self.music_player = None
-
-    # запуск уровня
-
-    def reset(self):
-        self.oxy = max(40, MAX_OXY - (self.lvl - 1) * 10)
-        self.t_alive = 0.0
-        self.anim_timer = 0.0
-
-        self.walls = arcade.SpriteList()
-        self.phys_walls = arcade.SpriteList()
-        self.foes = arcade.SpriteList()
-        self.oxy_pick = arcade.SpriteList()
-        self.exits = arcade.SpriteList()
-        self.emitters = []
-
-        self.p = None
-        self.phys = None
-        self.dead_played = False
-        self.stop_music()
-
-        map_name = f"levels{self.lvl:02d}.tmx"
-        print(f"Загружаю карту: {map_name}")
-
-        try:
-            m = arcade.load_tilemap(DATA / map_name)
-        except Exception as e:
-            print(f"Ошибка карты: {e}")
-            self.state = STATE_CLEAR
-            return
-
-        start_x = 80
-        start_y = 80
-
-        for layer in m.sprite_lists.values():
-            for it in layer:
-                if it.texture is None:
-                    continue
-                nm = it.texture.name.lower()
-
-                if "wall" in nm or "стен" in nm:
-                    self.walls.append(it)
-                    self.phys_walls.append(it)
-                elif "door" in nm or "двер" in nm:
-                    self.exits.append(it)
-                elif "oxygen" in nm or "кисл" in nm or "oxigen" in nm:
-                    amt = float(it.properties.get("fill", 25))
-                    it.properties["fill"] = amt
-                    self.oxy_pick.append(it)
-                elif "enemy" in nm:
-                    it.texture = self.enemy_tex[0]
-                    self.foes.append(it)
-
-        self.p = arcade.Sprite()
-        self.p.texture = self.player_tex[0]
-        self.p.center_x = start_x
-        self.p.center_y = start_y
-
-        self.phys = arcade.PhysicsEngineSimple(self.p, self.phys_walls)
-        self.snap_camera_to_player()
-
-        self.play_sound(self.s_start, 0.5)
-        self.start_music()
-
-        self.state = STATE_PLAY
-
-    def advance_level(self):
-        self.lvl += 1
-        if self.lvl > self.lvl_max:
-            self.state = STATE_CLEAR
-            return
-        self.reset()
+        self.want_music = False
+        self.mixer.stop_music()
+
+    # события мира
+
+    def flush_events(self):
+        for ev in self.world.events:
+            kind = ev[0]
+            if kind == "level":
+                if not self.atlas_packed:
+                    w = self.world
+                    pack_atlas(self.ctx, w.player_tex + w.enemy_tex + tile_textures())
+                    self.atlas_packed = True
+                self.particles.clear()
+                self.clock.reset()
+                self.interp.clear()
+                self.snap_camera_to_player()
+            elif kind == "sound":
+                self.play_sound(ev[1], ev[2])
+            elif kind == "music":
+                if ev[1]:
+                    self.start_music()
+                else:
+                    self.stop_music()
+            elif kind == "fx":
+                self.spawn_fx(ev[1], ev[2])
+        self.world.events.clear()
 
     # рисуем на экране
 
     def on_draw(self):
+        prof = self.prof
+        prof.begin()
         self.clear()
+        w = self.world
+        prof.lap("clear")
+
+        now = time.perf_counter()
+        frame_dt = now - self.t_draw
+        self.t_draw = now
+        level = w.state in (STATE_PLAY, STATE_OVER, STATE_CLEAR) and w.chunks
+        if level:
+            # враги по кускам - по настоящим позициям, до сдвига между шагами;
+            # куски считаются по массивам позиций, перекладываются только перешедшие
+            x, y = foe_xy(w)
+            if x is None:
+                w.chunks.foes.move(w.foes)
+            else:
+                w.chunks.foes.move_xy(w.foes, x, y)
+            if not self.replay:
+                self.interp.apply(w, self.clock.alpha(now - self.t_update))
+        self.update_camera(frame_dt)
+        prof.lap("camera")
 
         self.cam.use()
-        if self.state in (STATE_PLAY, STATE_OVER, STATE_CLEAR):
-            self.walls.draw()
-            self.oxy_pick.draw()
-            self.foes.draw()
-            self.exits.draw()
-            if self.p:
-                self.p.draw()
-            for em in list(self.emitters):
-                em.draw()
+        if level:
+            # только куски уровня, которые видит камера (см. chunks.py)
+            ch = w.chunks
+            view = (self.cam.position[0], self.cam.position[1], self.width, self.height)
+            if self.bake and w.static_layer:
+                w.static_layer.draw()
+            else:
+                ch.walls.draw(*view)
+                ch.exits.draw(*view)
+            prof.lap("static")
+            ch.oxy_pick.draw(*view)
+            prof.lap("items")
+            ch.foes.draw(*view)
+            prof.lap("enemies")
+            if w.p:
+                w.p.draw()
+            prof.lap("hero")
+            self.particles.draw()
+            prof.lap("fx")
+            self.interp.restore()
 
         self.cam_ui.use()
-        if self.state == STATE_MENU:
-            arcade.draw_text(TITLE, 80, self.height * 0.6, arcade.color.WHITE, 36)
-            arcade.draw_text("WASD: ходьба", 120, self.height * 0.5, arcade.color.LIGHT_GRAY, 16)
-            arcade.draw_text("SPACE: старт", 120, self.height * 0.45, arcade.color.LIGHT_GRAY, 16)
-        elif self.state == STATE_PLAY:
-            self.draw_hud()
-        elif self.state == STATE_OVER:
-            arcade.draw_text("Кислород закончился", 120, self.height * 0.55, arcade.color.APRICOT, 28)
-            arcade.draw_text("SPACE: попытка снова", 120, self.height * 0.48, arcade.color.LIGHT_GRAY, 16)
-            self.draw_stats()
-        elif self.state == STATE_CLEAR:
-            arcade.draw_text("Все уровни пройдены", 120, self.height * 0.55, arcade.color.ELECTRIC_GREEN, 28)
-            arcade.draw_text("SPACE: сыграть ещё", 120, self.height * 0.48, arcade.color.LIGHT_GRAY, 16)
-            self.draw_stats()
-
-    def draw_hud(self):
-        r = max(0.0, min(1.0, self.oxy / MAX_OXY))
-        bw = 220
-        bh = 20
-        x0 = 20
-        y0 = self.height - 40
-        arcade.draw_rectangle_filled(x0 + bw / 2, y0, bw, bh, arcade.color.DAVY_GREY)
-        arcade.draw_rectangle_filled(x0 + (bw * r) / 2, y0, bw * r, bh, arcade.color.AIR_FORCE_BLUE)
-        arcade.draw_text(f"O2: {self.oxy:0.0f}%", x0, y0 + 16, arcade.color.WHITE_SMOKE, 14)
-        arcade.draw_text(f"Уровень: {self.lvl}", x0, y0 - 32, arcade.color.LIGHT_GRAY, 14)
-        arcade.draw_text(f"Время: {self.t_alive:0.1f}s", x0, y0 - 52, arcade.color.LIGHT_GRAY, 14)
-        if self.oxy <= LOW_OXY_THRESHOLD:
-            arcade.draw_text("Мало кислорода!", x0, y0 - 72, arcade.color.APRICOT, 14)
-
-    def draw_stats(self):
-        arcade.draw_text(f"Прошло времени: {self.t_alive:0.1f}s", 120, self.height * 0.38, arcade.color.LIGHT_GRAY, 16)
-        arcade.draw_text(f"Последний уровень: {self.lvl}", 120, self.height * 0.32, arcade.color.LIGHT_GRAY, 16)
+        self.hud.draw(w)
+        prof.lap("ui")
+        self.prof_overlay.draw()
+        prof.lap("overlay")
+        prof.end_frame()
+
+    def on_close(self):
+        # дописать trace и запись на диск
+        self.prof.close()
+        if self.recorder:
+            self.recorder.save(RECORD_REPLAY, self.world)
+        super().on_close()
 
     # обновление игры
 
     def on_update(self, dt):
-        if self.state != STATE_PLAY or not self.p or not self.phys:
+        w = self.world
+        if not self.mixer.warmed:
+            self.mixer.warm()
+        if self.want_music and not self.mixer.music_player:
+            self.start_music()
+        if self.replay:
+            self.update_replay()
+            self.pump_preload()
             return
-
-        self.t_alive += dt
-        self.oxy -= OXY_DRAIN_PER_SEC * dt
-
-        self.update_player_vel()
-        self.phys.update()
-        self.update_foes(dt)
-        self.handle_collisions()
-        self.update_emitters()
-        self.update_camera()
-
-        # анимация и эффекты описаны в main.py
-        self.update_animation(dt)
-
-        if self.oxy <= 0:
-            if not self.dead_played:
-                self.play_sound(self.s_dead, 0.6)
-                self.stop_music()
-                self.dead_played = True
-            self.state = STATE_OVER
-
-    def update_player_vel(self):
-        if not self.p:
+        if w.state != STATE_PLAY or not w.p or not w.phys:
             return
-        vx = 0
-        vy = 0
-        if self.mv_l:
-            vx -= PLAYER_SPEED
-        if self.mv_r:
-            vx += PLAYER_SPEED
-        if self.mv_u:
-            vy += PLAYER_SPEED
-        if self.mv_d:
-            vy -= PLAYER_SPEED
-        if vx and vy:
-            s = 1 / math.sqrt(2)
-            vx *= s
-            vy *= s
-        self.p.change_x = vx
-        self.p.change_y = vy
-
-    def update_foes(self, dt):
-        if not self.p:
+        # сколько бы ни длился кадр, World шагает на STEP (см. timestep.py)
+        n = self.clock.advance(dt)
+        self.t_update = time.perf_counter()
+        for i in range(n):
+            if i == n - 1:
+                self.interp.save(w)
+            self.step_world(STEP)
+            if w.state != STATE_PLAY:
+                break
+        self.pump_preload()
+
+    def pump_preload(self):
+        # PRELOAD_BUDGET на кадр, сколько бы шагов он ни сделал
+        w = self.world
+        if w.state != STATE_PLAY:
             return
-        for foe in self.foes:
-            x0 = foe.center_x
-            y0 = foe.center_y
-
-            dx = self.p.center_x - foe.center_x
-            dy = self.p.center_y - foe.center_y
-            dist = math.hypot(dx, dy)
-            if dist:
-                step = ENEMY_SPEED * dt
-                foe.center_x += (dx / dist) * step
-                if arcade.check_for_collision_with_list(foe, self.phys_walls):
-                    foe.center_x = x0
-                foe.center_y += (dy / dist) * step
-                if arcade.check_for_collision_with_list(foe, self.phys_walls):
-                    foe.center_y = y0
-
-    def handle_collisions(self):
-        if not self.p:
-            return
-
-        hit = arcade.check_for_collision_with_list(self.p, self.foes)
-        if hit:
-            self.oxy -= OXY_HIT_LOSS
-            self.spawn_fx(self.p.position, arcade.color.BARN_RED)
-
-        for b in arcade.check_for_collision_with_list(self.p, self.oxy_pick):
-            fill = b.properties.get("fill", 25)
-            self.oxy = min(MAX_OXY, self.oxy + fill)
-            b.remove_from_sprite_lists()
-            self.spawn_fx(b.position, arcade.color.SPRING_GREEN)
-            self.play_sound(self.s_pick, 0.35)
-
-        if arcade.check_for_collision_with_list(self.p, self.exits):
-            self.advance_level()
+        self.prof.begin()
+        w.pump_preload()
+        self.prof.lap("preload")
+
+    def step_world(self, dt):
+        # вся логика - в World.step, окну остаются звук и частицы
+        w = self.world
+        prof = self.prof
+        w.step(dt)
+        prof.begin()
+        self.flush_events()
+        prof.lap("events")
+        self.update_particles(dt)
+        prof.lap("particles")
+
+        # кадры персонажей меняет World, тут - только то, что видно в окне
+        self.update_animation(dt)
+        prof.lap("animation")
+
+    # повтор записи
+
+    def start_replay(self, rec, speed=1):
+        """показывает запись из replay.load(); speed - шагов World за кадр"""
+        self.replay = Player(rec)
+        self.replay_speed = speed
+        self.world.level_source = rec["source"]
+        self.particles.rng = random.Random(rec["seed"])
+
+    def update_replay(self):
+        w = self.world
+        for _ in range(self.replay_speed):
+            self.replay.apply(w)
+            self.flush_events()
+            if self.replay.done(w):
+                return
+            self.step_world(STEP)
 
     # эти методы специально пустые, чтобы переопределить их в main.py
 
@@ -319,59 +263,74 @@ class GameBase(arcade.Window):
 
     # частицы и камера
 
-    def update_emitters(self):
-        for em in list(self.emitters):
-            em.update()
-            if em.can_reap():
-                self.emitters.remove(em)
+    def update_particles(self, dt):
+        self.particles.update(dt)
 
-    def update_camera(self):
-        if not self.p:
+    def update_camera(self, dt):
+        # раз в кадр, за игроком там, где он нарисован; доля пути зависит от
+        # времени кадра, так что камера едет одинаково при любой частоте
+        p = self.world.p
+        if not p:
             return
-        target = (self.p.center_x - self.width / 2, self.p.center_y - self.height / 2)
-        self.cam.move_to(target, 0.25)
+        target = (p.center_x - self.width / 2, p.center_y - self.height / 2)
+        self.cam.move_to(target, 1 - (1 - CAM_FOLLOW) ** (dt / STEP))
 
     def snap_camera_to_player(self):
-        if not self.p:
+        p = self.world.p
+        if not p:
             return
-        target = (self.p.center_x - self.width / 2, self.p.center_y - self.height / 2)
+        target = (p.center_x - self.width / 2, p.center_y - self.height / 2)
         self.cam.move_to(target, 1.0)
+        # сразу, иначе следующий update_camera() поедет к игроку плавно
+        self.cam.update()
 
     # нажатия клавиш
 
     def on_key_press(self, sym, mod):
-        if self.state == STATE_MENU and sym == arcade.key.SPACE:
-            self.lvl = 1
-            self.lvl_max = 5
-            self.reset()
+        w = self.world
+        if sym == arcade.key.F2:
+            self.bake = not self.bake
+            return
+        if sym == arcade.key.F3:
+            self.prof_overlay.visible = not self.prof_overlay.visible
+            return
+        if self.replay:
+            # во время повтора кнопками управляет запись
+            return
+
+        if w.state == STATE_MENU and sym == arcade.key.SPACE:
+            w.lvl_max = 5
+            w.start(1)
+            self.flush_events()
             return
 
-        if self.state in (STATE_OVER, STATE_CLEAR) and sym == arcade.key.SPACE:
-            self.lvl = 1
-            self.reset()
+        if w.state in (STATE_OVER, STATE_CLEAR) and sym == arcade.key.SPACE:
+            w.start(1)
+            self.flush_events()
             return
 
-        if self.state != STATE_PLAY:
+        if w.state != STATE_PLAY:
             return
 
         if sym in (arcade.key.A, arcade.key.LEFT):
-            self.mv_l = True
+            w.mv_l = True
         if sym in (arcade.key.D, arcade.key.RIGHT):
-            self.mv_r = True
+            w.mv_r = True
         if sym in (arcade.key.W, arcade.key.UP):
-            self.mv_u = True
+            w.mv_u = True
         if sym in (arcade.key.S, arcade.key.DOWN):
-            self.mv_d = True
+            w.mv_d = True
 
     def on_key_release(self, sym, mod):
-        if self.state != STATE_PLAY:
+        w = self.world
+        if w.state != STATE_PLAY or self.replay:
             return
 
         if sym in (arcade.key.A, arcade.key.LEFT):
-            self.mv_l = False
+            w.mv_l = False
         if sym in (arcade.key.D, arcade.key.RIGHT):
-            self.mv_r = False
+            w.mv_r = False
         if sym in (arcade.key.W, arcade.key.UP):
-            self.mv_u = False
+            w.mv_u = False
         if sym in (arcade.key.S, arcade.key.DOWN):
-            self.mv_d = False
+            w.mv_d = False
@@ -0,0 +1,165 @@
+"""надписи меню и HUD, созданные один раз
+
+arcade.draw_text каждый вызов заново собирает текст, а значения на экране
+меняются несколько раз в секунду. здесь надписи создаются вместе с окном,
+текст меняется только когда меняется округлённое число, а полоска кислорода -
+два спрайта (фон и заливка), у заливки при смене процента меняется только
+ширина.
+
+надписи одного экрана лежат в одном pyglet Batch и рисуются за один раз -
+arcade.Text рисует каждую отдельно и каждый раз переключает состояние GL.
+"""
+
+import time
+
+import arcade
+import pyglet
+
+from profiler import PERCENTILES
+from world import LOW_OXY_THRESHOLD, MAX_OXY, STATE_CLEAR, STATE_MENU, STATE_OVER, STATE_PLAY
+
+# как у arcade.draw_text по умолчанию
+FONT = ("calibri", "arial")
+# для таблиц, чтобы столбцы стояли ровно
+MONO = ("consolas", "courier new", "monospace")
+
+# полоска кислорода
+BAR_W = 220
+BAR_H = 20
+BAR_X = 20
+
+
+def label(batch, text, x, y, color, size, font=FONT):
+    return pyglet.text.Label(text, x=x, y=y, font_name=font, font_size=size,
+                             color=arcade.get_four_byte_color(color), batch=batch)
+
+
+class Hud:
+    def __init__(self, ctx, title, width, height):
+        self.ctx = ctx
+        gray = arcade.color.LIGHT_GRAY
+
+        self.menu = pyglet.graphics.Batch()
+        label(self.menu, title, 80, height * 0.6, arcade.color.WHITE, 36)
+        label(self.menu, "WASD: ходьба", 120, height * 0.5, gray, 16)
+        label(self.menu, "SPACE: старт", 120, height * 0.45, gray, 16)
+
+        # экраны конца игры: заголовок, подсказка и итоги
+        self.over = pyglet.graphics.Batch()
+        label(self.over, "Кислород закончился", 120, height * 0.55, arcade.color.APRICOT, 28)
+        label(self.over, "SPACE: попытка снова", 120, height * 0.48, gray, 16)
+        self.clear = pyglet.graphics.Batch()
+        label(self.clear, "Все уровни пройдены", 120, height * 0.55, arcade.color.ELECTRIC_GREEN, 28)
+        label(self.clear, "SPACE: сыграть ещё", 120, height * 0.48, gray, 16)
+        self.stats = {}
+        for batch in (self.over, self.clear):
+            self.stats[batch] = (
+                label(batch, "", 120, height * 0.38, gray, 16),
+                label(batch, "", 120, height * 0.32, gray, 16),
+            )
+
+        self.play = pyglet.graphics.Batch()
+        y0 = height - 40
+        self.oxy_text = label(self.play, "", BAR_X, y0 + 16, arcade.color.WHITE_SMOKE, 14)
+        self.lvl_text = label(self.play, "", BAR_X, y0 - 32, gray, 14)
+        self.time_text = label(self.play, "", BAR_X, y0 - 52, gray, 14)
+        self.low_text = label(self.play, "Мало кислорода!", BAR_X, y0 - 72, arcade.color.APRICOT, 14)
+        self.bar = arcade.SpriteList()
+        back = arcade.SpriteSolidColor(BAR_W, BAR_H, arcade.color.DAVY_GREY)
+        back.center_x = BAR_X + BAR_W / 2
+        back.center_y = y0
+        self.bar_fill = arcade.SpriteSolidColor(BAR_W, BAR_H, arcade.color.AIR_FORCE_BLUE)
+        self.bar_fill.center_y = y0
+        self.bar.extend((back, self.bar_fill))
+
+        # что сейчас написано: меняем текст, только если число другое
+        self.shown = {}
+
+    def changed(self, key, value):
+        if self.shown.get(key) == value:
+            return False
+        self.shown[key] = value
+        return True
+
+    def draw(self, w):
+        if w.state == STATE_MENU:
+            batch = self.menu
+        elif w.state == STATE_PLAY:
+            self.update_play(w)
+            self.bar.draw()
+            batch = self.play
+        elif w.state == STATE_OVER:
+            batch = self.over
+            self.update_stats(w, batch)
+        elif w.state == STATE_CLEAR:
+            batch = self.clear
+            self.update_stats(w, batch)
+        else:
+            return
+        with self.ctx.pyglet_rendering():
+            batch.draw()
+
+    def update_play(self, w):
+        oxy = round(w.oxy)
+        if self.changed("oxy", oxy):
+            self.oxy_text.text = f"O2: {w.oxy:0.0f}%"
+            self.set_bar(max(0.0, min(1.0, oxy / MAX_OXY)))
+        if self.changed("lvl", w.lvl):
+            self.lvl_text.text = f"Уровень: {w.lvl}"
+        t = round(w.t_alive, 1)
+        if self.changed("time", t):
+            self.time_text.text = f"Время: {w.t_alive:0.1f}s"
+        low = w.oxy <= LOW_OXY_THRESHOLD
+        if self.changed("low", low):
+            self.low_text.visible = low
+
+    def set_bar(self, r):
+        # спрайты те же, буферы SpriteList тоже - меняется ширина заливки
+        fill = self.bar_fill
+        fill.visible = r > 0
+        if r > 0:
+            fill.width = BAR_W * r
+            fill.center_x = BAR_X + BAR_W * r / 2
+
+    def update_stats(self, w, batch):
+        t = round(w.t_alive, 1)
+        if self.changed(("stats_time", batch), t):
+            self.stats[batch][0].text = f"Прошло времени: {w.t_alive:0.1f}s"
+        if self.changed(("stats_lvl", batch), w.lvl):
+            self.stats[batch][1].text = f"Последний уровень: {w.lvl}"
+
+
+# оверлей профайлера: как часто обновлять цифры, секунды, и высота строки
+OVERLAY_EVERY = 0.25
+OVERLAY_LINE = 16
+
+
+class ProfilerOverlay:
+    """таблица перцентилей FrameProfiler в правом верхнем углу (F3)"""
+
+    def __init__(self, ctx, prof, width, height):
+        self.ctx = ctx
+        self.prof = prof
+        self.visible = False
+        self.batch = pyglet.graphics.Batch()
+        x = width - 330
+        y = height - 24
+        qs = " ".join(f"p{q:<5}" for q in PERCENTILES)
+        label(self.batch, f"{'этап, мс':<12} {qs}", x, y, arcade.color.WHITE_SMOKE, 11, MONO)
+        self.rows = []
+        for i, name in enumerate(prof.stages):
+            self.rows.append(label(self.batch, name, x, y - (i + 1) * OVERLAY_LINE,
+                                   arcade.color.LIGHT_GRAY, 11, MONO))
+        self.t_next = 0.0
+
+    def draw(self):
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if now >= self.t_next:
+            # перцентили по всему буферу - не каждый кадр
+            self.t_next = now + OVERLAY_EVERY
+            for row, (name, ms) in zip(self.rows, self.prof.percentiles().items()):
+                row.text = f"{name:<12} " + " ".join(f"{t:<6.2f}" for t in ms)
+        with self.ctx.pyglet_rendering():
+            self.batch.draw()
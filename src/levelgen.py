@@ -0,0 +1,254 @@
+"""генератор больших уровней для замеров: лабиринт, враги, баллоны, выход
+
+карта собирается из блоков 2x2 тайла, как стены в data/: игрок почти в две
+клетки высотой, поэтому коридоры тоже в два тайла. блоки с нечётными
+номерами - комнаты лабиринта, между ними - стены. лабиринт строится обходом
+в глубину от старта, потом часть стен между комнатами убирается:
+density=1 - настоящий лабиринт, 0 - пустой зал с рамкой. выход - в самой
+дальней от старта комнате, так что он всегда достижим.
+
+пишет TMX с теми же тайлсетами, что карты в data/ (стены, дверь, баллон,
+враг), или строки уровня в формате levels.csv. одинаковый seed - одинаковая
+карта.
+
+python levelgen.py ../data/levels06.tmx cols=600 rows=400 enemies=200 pickups=300
+python levelgen.py big.csv level=1 density=0.5 seed=7
+"""
+
+import csv
+import os
+import pathlib
+import random
+import sys
+from collections import deque
+
+from colliders import merge_cells
+from levels import CSV_TILE
+
+DATA = pathlib.Path(__file__).resolve().parent.parent / "data"
+
+# тайлсеты из data/ и их firstgid (баллон подключён один раз, не дважды, как в levels01.tmx)
+TILESETS = (("Стены.tsx", 1), ("Двери.tsx", 5), ("Oxigen.tsx", 6), ("Враг.tsx", 7))
+# стена - картинка 2x2 тайла: левый верхний, правый верхний, левый нижний, правый нижний
+WALL_GIDS = (1, 2, 3, 4)
+DOOR_GID = 5
+OXY_GID = 6
+FOE_GID = 7
+
+TILE = 32
+# врагов не ставим ближе стольких комнат к старту
+SAFE_ROOMS = 4
+
+
+class GenLevel:
+    """карта в клетках; строки снизу вверх, как Level.blocked"""
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.wall = bytearray(cols * rows)
+        # (столбец, строка) -> gid предмета
+        self.items = {}
+
+    def block(self, bc, br, value=1):
+        # блок 2x2 с номером (bc, br)
+        for r in (2 * br, 2 * br + 1):
+            for c in (2 * bc, 2 * bc + 1):
+                self.wall[r * self.cols + c] = value
+
+
+def generate(cols=60, rows=40, density=0.8, enemies=None, pickups=None, seed=1):
+    """GenLevel cols x rows (округляются вверх до чётных, не меньше 10x10)
+
+    enemies и pickups по умолчанию - по одному на 12 и на 20 комнат.
+    """
+    rnd = random.Random(seed)
+    cols = max(10, cols + cols % 2)
+    rows = max(10, rows + rows % 2)
+    g = GenLevel(cols, rows)
+    bcols = cols // 2
+    brows = rows // 2
+    # комнаты - блоки с нечётными номерами от левого нижнего угла; что не
+    # влезло целой комнатой справа и сверху - тоже стена
+    rc = (bcols - 1) // 2
+    rr = (brows - 1) // 2
+    for br in range(brows):
+        for bc in range(bcols):
+            if bc % 2 == 0 or br % 2 == 0 or bc // 2 >= rc or br // 2 >= rr:
+                g.block(bc, br)
+
+    def room_block(room):
+        x, y = room
+        return 2 * x + 1, 2 * y + 1
+
+    # старт - левая нижняя комната, START попадает в неё
+    start = (0, 0)
+    seen = {start}
+    stack = [start]
+    while stack:
+        x, y = stack[-1]
+        nb = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+              if 0 <= x + dx < rc and 0 <= y + dy < rr and (x + dx, y + dy) not in seen]
+        if not nb:
+            stack.pop()
+            continue
+        nxt = rnd.choice(nb)
+        bx, by = room_block(stack[-1])
+        nx, ny = room_block(nxt)
+        g.block((bx + nx) // 2, (by + ny) // 2, 0)
+        seen.add(nxt)
+        stack.append(nxt)
+
+    # лишние стены между комнатами убираем
+    for by in range(1, 2 * rr):
+        for bx in range(1, 2 * rc):
+            if (bx + by) % 2 == 1 and rnd.random() >= density:
+                g.block(bx, by, 0)
+    # столбы, к которым не осталось стен, тоже
+    for by in range(2, 2 * rr - 1, 2):
+        for bx in range(2, 2 * rc - 1, 2):
+            if not any(g.wall[(2 * (by + dy)) * cols + 2 * (bx + dx)]
+                       for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))):
+                g.block(bx, by, 0)
+
+    # комнаты по удалённости от старта
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        bx, by = room_block((x, y))
+        for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nxt = (x + dx, y + dy)
+            if nxt in dist or not (0 <= nxt[0] < rc and 0 <= nxt[1] < rr):
+                continue
+            if g.wall[(2 * (by + dy)) * cols + 2 * (bx + dx)]:
+                continue
+            dist[nxt] = dist[(x, y)] + 1
+            queue.append(nxt)
+    rooms = sorted(dist, key=dist.get)
+    exit_room = rooms[-1]
+
+    n_rooms = len(rooms)
+    if enemies is None:
+        enemies = n_rooms // 12
+    if pickups is None:
+        pickups = n_rooms // 20
+
+    def put(room, gid, dc, dr):
+        bx, by = room_block(room)
+        g.items[(2 * bx + dc, 2 * by + dr)] = gid
+
+    # дверь в правом верхнем тайле комнаты, как в картах data/
+    put(exit_room, DOOR_GID, 1, 1)
+    # баллон - в левом нижнем тайле, по одному на комнату
+    free = rooms[1:-1]
+    for room in rnd.sample(free, min(pickups, len(free))):
+        put(room, OXY_GID, 0, 0)
+    # враги - в остальных трёх тайлах: сначала по одному на комнату, потом по второму...
+    far = [r for r in rooms if dist[r] >= SAFE_ROOMS and r != exit_room]
+    rnd.shuffle(far)
+    slots = ((1, 0), (0, 1), (1, 1))
+    for i in range(min(enemies, len(far) * len(slots))):
+        put(far[i % len(far)], FOE_GID, *slots[i // len(far)])
+    return g
+
+
+def write_tmx(g, path):
+    path = pathlib.Path(path)
+    # тайлсеты из data/, путь - относительно карты
+    rel = pathlib.Path(os.path.relpath(DATA, path.resolve().parent))
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<map version="1.10" tiledversion="1.11.2" orientation="orthogonal" renderorder="right-down" '
+        f'width="{g.cols}" height="{g.rows}" tilewidth="{TILE}" tileheight="{TILE}" infinite="0" '
+        f'nextlayerid="2" nextobjectid="1">',
+    ]
+    for name, first in TILESETS:
+        lines.append(f' <tileset firstgid="{first}" source="{(rel / name).as_posix()}"/>')
+    lines.append(f' <layer id="1" name="Слой тайлов 1" width="{g.cols}" height="{g.rows}">')
+    lines.append('  <data encoding="csv">')
+    out = []
+    # в TMX строки сверху вниз
+    for r in reversed(range(g.rows)):
+        row = []
+        for c in range(g.cols):
+            if g.wall[r * g.cols + c]:
+                row.append(WALL_GIDS[(1 - r % 2) * 2 + c % 2])
+            else:
+                row.append(g.items.get((c, r), 0))
+        out.append(",".join(map(str, row)))
+    lines.append(",\n".join(out))
+    lines += ["</data>", " </layer>", "</map>", ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+# вид строки csv по gid предмета
+CSV_ITEMS = {DOOR_GID: "exit", OXY_GID: "oxy", FOE_GID: "enemy"}
+
+
+def csv_rows(g, level):
+    # строки levels.csv, в пикселях
+    t = CSV_TILE
+    # старт - в центре левой нижней комнаты (как 96,96 в levels.csv)
+    rows = [[level, "start", 3 * t, 3 * t, 0, 0, 0]]
+    for c, r, w, h in merge_cells(g.wall, g.cols, g.rows):
+        rows.append([level, "wall", (c + w / 2) * t, (r + h / 2) * t, w * t, h * t, 0])
+    for (c, r), gid in sorted(g.items.items()):
+        param = 25 if gid == OXY_GID else 0
+        rows.append([level, CSV_ITEMS[gid], c * t + t / 2, r * t + t / 2, 0, 0, param])
+    return rows
+
+
+def write_csv(g, path, level=1):
+    """уровень level в csv: остальные уровни файла остаются как были"""
+    path = pathlib.Path(path)
+    keep = []
+    if path.exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            keep = [row for row in csv.reader(f)][1:]
+        keep = [row for row in keep if row and row[0] != str(level)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["level", "kind", "x", "y", "w", "h", "param"])
+        w.writerows(keep)
+        w.writerows(csv_rows(g, level))
+
+
+def stress_level(cols, rows, seed=1, **opts):
+    """Level сгенерированной карты через обычную загрузку TMX (и её кэш)"""
+    from levels import load_level
+    from world import LEVEL_CACHE
+
+    args = dict(cols=cols, rows=rows, seed=seed, **opts)
+    name = "gen-" + "-".join(f"{k}{v}" for k, v in sorted(args.items()))
+    path = LEVEL_CACHE / "gen" / f"{name}.tmx"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_tmx(generate(**args), path)
+    return load_level(path, LEVEL_CACHE / "gen")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("нужен файл: python levelgen.py карта.tmx|уровни.csv [cols=60 rows=40 density=0.8 "
+              "enemies=N pickups=N seed=1 level=1]")
+        return
+    out = pathlib.Path(sys.argv[1])
+    opts = {}
+    for arg in sys.argv[2:]:
+        k, _, v = arg.partition("=")
+        opts[k] = float(v) if k == "density" else int(v)
+    level = opts.pop("level", 1)
+    g = generate(**opts)
+    if out.suffix == ".csv":
+        write_csv(g, out, level)
+    else:
+        write_tmx(g, out)
+    walls = sum(g.wall)
+    kinds = [CSV_ITEMS[gid] for gid in g.items.values()]
+    print(f"{out}: {g.cols}x{g.rows}, стен {walls} клеток, врагов {kinds.count('enemy')}, "
+          f"баллонов {kinds.count('oxy')}, выход {'есть' if 'exit' in kinds else 'нет'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""уровни без спрайтов: разбор TMX и levels.csv, кэш на диске и в памяти
+
+Level - это всё, что нужно reset() для запуска уровня, в компактном виде.
+карта разбирается один раз, дальше берётся из файла в data/cache, а при
+повторном запуске того же уровня - прямо из памяти.
+"""
+
+import csv
+import functools
+import hashlib
+import math
+import os
+import pathlib
+import pickle
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+
+import numpy as np
+
+from colliders import merge_cells
+
+# виды клеток
+WALL = 1
+EXIT = 2
+OXY = 3
+FOE = 4
+
+# старт игрока, пока в картах нет своей точки
+START = (80, 80)
+
+# меняем, когда меняется формат Level - старые файлы кэша тогда не подойдут
+FORMAT = 6
+
+# размер клетки для уровней из levels.csv
+CSV_TILE = 32
+
+# виды строк levels.csv; те же слова - в свойстве kind у тайлсета или тайла в .tsx
+CSV_KINDS = {"wall": WALL, "exit": EXIT, "oxy": OXY, "enemy": FOE}
+
+# флаги отражения в старших битах gid
+GID_MASK = 0x1FFFFFFF
+# они же после сдвига на 29 - в текстурах Level: по горизонтали, по вертикали, по диагонали
+FLIP_H = 4
+FLIP_V = 2
+FLIP_D = 1
+
+
+class Level:
+    def __init__(self, cols, rows, tile_w, tile_h):
+        self.cols = cols
+        self.rows = rows
+        self.tile_w = tile_w
+        self.tile_h = tile_h
+        self.start = START
+        self.name = ""
+        self.key = ""
+
+        # картинки тайлов: (файл, x, y, ширина, высота, отражение FLIP_*); у Level
+        # из compile_tmx файл указан от папки карты, load_level делает его полным
+        self.textures = []
+
+        # по элементу на объект уровня
+        self.kind = array("B")
+        self.x = array("f")
+        self.y = array("f")
+        self.tex = array("H")
+        # fill для кислорода, скорость для врага (0 - обычная)
+        self.param = array("f")
+
+        # стены для физики и путей
+        self.blocked = bytearray(cols * rows)
+        self.rects = []
+
+    def add(self, kind, x, y, tex, param=0.0):
+        self.kind.append(kind)
+        self.x.append(x)
+        self.y.append(y)
+        self.tex.append(tex)
+        self.param.append(param)
+
+    def items(self, kind):
+        for i, k in enumerate(self.kind):
+            if k == kind:
+                yield self.x[i], self.y[i], self.textures[self.tex[i]], self.param[i]
+
+    def has(self, kind):
+        return kind in self.kind
+
+    def extend(self, kind, x, y, tex, param):
+        # много объектов сразу из массивов numpy
+        self.kind.frombytes(np.asarray(kind, dtype=np.uint8).tobytes())
+        self.x.frombytes(np.asarray(x, dtype=np.float32).tobytes())
+        self.y.frombytes(np.asarray(y, dtype=np.float32).tobytes())
+        self.tex.frombytes(np.asarray(tex, dtype=np.uint16).tobytes())
+        self.param.frombytes(np.asarray(param, dtype=np.float32).tobytes())
+
+
+def kind_of(name):
+    # запасные правила по имени тайлсета или картинки, если в .tsx нет kind
+    nm = name.lower()
+    if "wall" in nm or "стен" in nm:
+        return WALL
+    if "door" in nm or "двер" in nm:
+        return EXIT
+    if "oxygen" in nm or "кисл" in nm or "oxigen" in nm:
+        return OXY
+    if "enemy" in nm or "враг" in nm:
+        return FOE
+    return 0
+
+
+def read_tsx(path):
+    root = ET.parse(path).getroot()
+    img = root.find("image")
+    params = {}
+    kinds = {}
+    for tile in root.findall("tile"):
+        for prop in tile.iter("property"):
+            if prop.get("name") in ("fill", "speed"):
+                params[int(tile.get("id"))] = float(prop.get("value"))
+            elif prop.get("name") == "kind":
+                kinds[int(tile.get("id"))] = CSV_KINDS.get(prop.get("value"), 0)
+    # вид всего тайлсета: свойство kind, а без него - по имени тайлсета или картинки
+    kind = 0
+    for prop in root.findall("properties/property"):
+        if prop.get("name") == "kind":
+            kind = CSV_KINDS.get(prop.get("value"), 0)
+    if not kind:
+        kind = kind_of(root.get("name", "")) or kind_of(pathlib.PurePath(img.get("source")).name)
+    return {
+        "kind": kind,
+        "kinds": kinds,
+        "tw": int(root.get("tilewidth")),
+        "th": int(root.get("tileheight")),
+        "columns": max(1, int(root.get("columns", 1))),
+        "count": int(root.get("tilecount", 1)),
+        "image": (path.parent / img.get("source")).resolve(),
+        "params": params,
+    }
+
+
+def compile_tmx(path):
+    """разбирает TMX и его .tsx в Level (без arcade и без картинок)"""
+    root = ET.parse(path).getroot()
+    cols = int(root.get("width"))
+    rows = int(root.get("height"))
+    tw = int(root.get("tilewidth"))
+    th = int(root.get("tileheight"))
+    lv = Level(cols, rows, tw, th)
+    lv.name = path.name
+
+    # таблицы по gid: вид, номер картинки, fill или скорость. каждый .tsx
+    # читается один раз, даже если подключён дважды (Oxigen.tsx в levels01.tmx)
+    sets = {}
+    tilesets = []
+    folder = path.parent.resolve()
+    for ts in root.findall("tileset"):
+        first = int(ts.get("firstgid"))
+        src = (path.parent / ts.get("source")).resolve()
+        if src not in sets:
+            info = read_tsx(src)
+            base = len(lv.textures)
+            for local in range(info["count"]):
+                ix = (local % info["columns"]) * info["tw"]
+                iy = (local // info["columns"]) * info["th"]
+                lv.textures.append((rel_path(info["image"], folder), ix, iy, info["tw"], info["th"], 0))
+            sets[src] = (info, base)
+        tilesets.append((first, *sets[src]))
+    top = max((first + info["count"] for first, info, _ in tilesets), default=1)
+    gid_kind = np.zeros(top, dtype=np.uint8)
+    gid_tex = np.zeros(top, dtype=np.uint16)
+    gid_param = np.zeros(top, dtype=np.float32)
+    for first, info, base in tilesets:
+        for local in range(info["count"]):
+            kind = info["kinds"].get(local, info["kind"])
+            gid_kind[first + local] = kind
+            gid_tex[first + local] = base + local
+            gid_param[first + local] = info["params"].get(local, 25.0 if kind == OXY else 0.0)
+    tex_w = np.array([t[3] for t in lv.textures] or [0], dtype=np.float32)
+    tex_h = np.array([t[4] for t in lv.textures] or [0], dtype=np.float32)
+
+    # (картинка, отражение) -> номер отражённой копии в lv.textures
+    flipped = {}
+    blocked = np.zeros((rows, cols), dtype=np.uint8)
+    for layer in root.findall("layer"):
+        data = layer.find("data")
+        if data is None or data.get("encoding") != "csv":
+            continue
+        # весь слой одним проходом numpy: gid -> вид по таблице
+        raw = np.fromstring(data.text, dtype=np.int64, sep=",")[:cols * rows]
+        gids = raw & GID_MASK
+        gids[gids >= top] = 0
+        kinds = gid_kind[gids]
+        i = np.flatnonzero(kinds)
+        c = i % cols
+        r = i // cols
+        tex = gid_tex[gids[i]]
+        flip = (raw[i] >> 29).astype(np.uint8)
+        # отражение по диагонали меняет местами ширину и высоту
+        diag = (flip & FLIP_D).astype(bool)
+        w = np.where(diag, tex_h[tex], tex_w[tex])
+        h = np.where(diag, tex_w[tex], tex_h[tex])
+        # как arcade.load_tilemap: тайл прижат к левому нижнему углу клетки
+        x = c * tw + w / 2
+        y = (rows - r - 1) * th + h / 2
+        j = np.flatnonzero(flip)
+        if len(j):
+            # отражённые тайлы (повёрнутые стены в levels03.tmx) - своя картинка
+            pairs, inv = np.unique(tex[j].astype(np.int64) * 8 + flip[j], return_inverse=True)
+            idx = []
+            for p in pairs.tolist():
+                key = (p >> 3, p & 7)
+                if key not in flipped:
+                    flipped[key] = len(lv.textures)
+                    lv.textures.append(lv.textures[key[0]][:5] + (key[1],))
+                idx.append(flipped[key])
+            tex = tex.copy()
+            tex[j] = np.array(idx, dtype=np.uint16)[inv]
+        lv.extend(kinds[i], x, y, tex, gid_param[gids[i]])
+        wall = kinds[i] == WALL
+        blocked[rows - r[wall] - 1, c[wall]] = 1
+
+    lv.blocked = bytearray(blocked.tobytes())
+    lv.rects = merge_cells(lv.blocked, cols, rows)
+    return lv
+
+
+def compile_csv(path):
+    """все уровни из levels.csv за один проход: {номер: Level}
+
+    стены в csv - прямоугольники x, y (центр), w, h в пикселях. они сразу идут в
+    физику, а рисуются тоже прямоугольниками (в Level нет тайлов стен).
+    """
+    # картинки двери, баллона и врага - те же, что в тайлсетах карт
+    door = read_tsx(path.parent / "Двери.tsx")
+    oxy = read_tsx(path.parent / "Oxigen.tsx")
+    foe = read_tsx(path.parent / "Враг.tsx")
+    textures = [
+        (str(door["image"]), 0, 0, door["tw"], door["th"], 0),
+        (str(oxy["image"]), 0, 0, oxy["tw"], oxy["th"], 0),
+        (str(foe["image"]), 0, 0, foe["tw"], foe["th"], 0),
+    ]
+    tex_of = {EXIT: 0, OXY: 1, FOE: 2}
+
+    t = CSV_TILE
+    rows_by_level = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if not row["level"]:
+                continue
+            rows_by_level.setdefault(int(row["level"]), []).append(row)
+
+    out = {}
+    for n, rows in rows_by_level.items():
+        walls = []
+        for row in rows:
+            if row["kind"] == "wall":
+                x, y, w, h = (float(row[k]) for k in ("x", "y", "w", "h"))
+                # в клетки с округлением наружу
+                c0 = math.floor((x - w / 2) / t)
+                r0 = math.floor((y - h / 2) / t)
+                c1 = math.ceil((x + w / 2) / t)
+                r1 = math.ceil((y + h / 2) / t)
+                walls.append((c0, r0, c1 - c0, r1 - r0))
+        cols = max((c + w for c, _, w, _ in walls), default=1)
+        rows_n = max((r + h for _, r, _, h in walls), default=1)
+
+        lv = Level(cols, rows_n, t, t)
+        lv.name = f"{path.name} #{n}"
+        lv.textures = textures
+        for c, r, w, h in walls:
+            for rr in range(max(0, r), r + h):
+                for cc in range(max(0, c), c + w):
+                    lv.blocked[rr * cols + cc] = 1
+        lv.rects = walls
+
+        for row in rows:
+            kind = row["kind"]
+            x = float(row["x"])
+            y = float(row["y"])
+            if kind == "start":
+                lv.start = (x, y)
+            elif kind in CSV_KINDS and kind != "wall":
+                k = CSV_KINDS[kind]
+                lv.add(k, x, y, tex_of[k], float(row["param"] or 0))
+        out[n] = lv
+    return out
+
+
+def rel_path(p, folder):
+    # в кэш путь идёт от папки карты: папку с игрой можно переносить
+    try:
+        return os.path.relpath(p, folder)
+    except ValueError:
+        # другой диск в Windows
+        return str(p)
+
+
+def source_key(path):
+    # хэш самой карты и всех её .tsx: поменялся любой файл - кэш не подходит
+    h = hashlib.sha1(str(FORMAT).encode())
+    data = path.read_bytes()
+    h.update(data)
+    for src in re.findall(rb'source="([^"]+\.tsx)"', data):
+        h.update((path.parent / src.decode()).read_bytes())
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=8)
+def _load(path, key, cache_dir):
+    lv = _read_or_compile(path, key, cache_dir)
+    # пути картинок в кэше - от папки карты, а спрайтам нужны полные
+    folder = path.parent.resolve()
+    lv.textures = [(str((folder / fn).resolve()), *rest) for fn, *rest in lv.textures]
+    return lv
+
+
+def _read_or_compile(path, key, cache_dir):
+    blob = cache_dir / (path.stem + ".bin") if cache_dir else None
+    if blob and blob.exists():
+        try:
+            with open(blob, "rb") as f:
+                saved_key, lv = pickle.load(f)
+            if saved_key == key:
+                return lv
+        except Exception:
+            pass
+
+    lv = compile_tmx(path)
+    lv.key = key
+    if blob:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # через свой временный файл: уровень может грузиться и из фонового потока
+            with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+                pickle.dump((key, lv), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, blob)
+        except OSError as e:
+            print(f"Не удалось сохранить кэш уровня: {e}")
+    return lv
+
+
+@functools.lru_cache(maxsize=2)
+def _load_csv(path, key):
+    levels = compile_csv(path)
+    for lv in levels.values():
+        lv.key = key
+    return levels
+
+
+def load_csv_level(path, n):
+    """Level номер n из levels.csv; файл разбирается один раз, пока он не изменится"""
+    levels = _load_csv(path, source_key(path))
+    if n not in levels:
+        raise KeyError(f"в {path.name} нет уровня {n}")
+    return levels[n]
+
+
+def load_level(path, cache_dir=None):
+    """Level для карты: из памяти, из data/cache или свежим разбором TMX
+
+    результат общий для всех вызовов - менять его нельзя.
+    """
+    return _load(path, source_key(path), cache_dir)
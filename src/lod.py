@@ -0,0 +1,48 @@
+"""уровни детализации врагов: дальние шагают реже и не анимируются
+
+враг ближе LOD_NEAR px к игроку (по любой оси - примерно экран с запасом)
+шагает каждый шаг, до LOD_FAR - раз в LOD_MID шагов, дальше - раз в LOD_SLOW.
+пропущенное время копится и уходит в следующий шаг врага целиком, так что
+скорость та же, только шаги крупнее. сдвиг по номеру врага разносит редкие
+шаги по разным кадрам, чтобы не было пиков.
+
+уровни считаются numpy по всем врагам сразу, а питоновская работа (шаг,
+проверки стен, смена текстуры) идёт только по тем, кому пора.
+"""
+
+import numpy as np
+
+LOD_NEAR = 640
+LOD_FAR = 1600
+LOD_MID = 2
+LOD_SLOW = 8
+
+
+class FoeLod:
+    """кто из врагов шагает сейчас и с каким dt
+
+    x, y - позиции врагов; FoeBatch отдаёт свои массивы, а для спрайтов
+    World сам пишет сюда новые позиции шагнувших.
+    """
+
+    def __init__(self, foes):
+        self.x = np.array([f.center_x for f in foes], dtype=np.float64)
+        self.y = np.array([f.center_y for f in foes], dtype=np.float64)
+        self.phase = np.arange(len(self.x))
+        # время, которое враг ещё не прошёл
+        self.pending = np.zeros(len(self.x))
+        # ближние: их и анимируем
+        self.awake = np.ones(len(self.x), dtype=bool)
+
+    def due(self, tick, px, py, dt, x=None, y=None):
+        """номера врагов, которым пора шагать, и dt для каждого"""
+        x = self.x if x is None else x
+        y = self.y if y is None else y
+        d = np.maximum(np.abs(x - px), np.abs(y - py))
+        self.awake = d < LOD_NEAR
+        rate = np.where(self.awake, 1, np.where(d < LOD_FAR, LOD_MID, LOD_SLOW))
+        self.pending += dt
+        idx = np.flatnonzero((tick + self.phase) % rate == 0)
+        steps = self.pending[idx]
+        self.pending[idx] = 0.0
+        return idx, steps
@@ -0,0 +1,102 @@
+"""голоса для звуков: постоянный набор плееров вместо нового на каждый звук
+
+у каждого звука свой набор из VOICES[имя] плееров pyglet, они создаются один
+раз в warm(), когда звук догрузился. звук играет на свободном голосе, а если все
+заняты - на самом старом: тот обрывается и начинает новый звук. так за
+кадр с тремя баллонами звучат не больше трёх щелчков, и число плееров за
+долгую игру не растёт.
+
+музыка играет одним своим плеером из потокового источника (не лежит в
+памяти целиком); stop_music() ставит его на паузу, а не удаляет.
+"""
+
+import itertools
+
+# arcade настраивает pyglet (без скрытого окна), поэтому он раньше pyglet.media
+import arcade  # noqa: F401
+import pyglet.media as media
+
+from assets import STREAMED
+
+# голосов на звук; остальные звуки - DEFAULT_VOICES
+VOICES = {"pick": 3, "dead": 1, "start": 1}
+DEFAULT_VOICES = 2
+
+
+class Mixer:
+    def __init__(self, sounds, voices=VOICES):
+        # SoundBank: звуки грузятся в фоне, голоса появляются, когда звук готов
+        self.sounds = sounds
+        self.caps = voices
+        # имя -> [[плеер, номер запуска], ...]
+        self.voices = {}
+        self.music_player = None
+        self.music_name = None
+        # номера запусков: у кого меньше - тот старше
+        self.order = itertools.count()
+        self.warmed = False
+
+    def warm(self):
+        """голоса для звуков, которые уже догрузились; окно зовёт, пока не готово всё"""
+        for name in self.sounds.jobs:
+            if name not in STREAMED and self.sounds.get(name):
+                self.pool(name)
+        self.warmed = self.sounds.ready()
+
+    def pool(self, name):
+        pool = self.voices.get(name)
+        if pool is None:
+            pool = self.voices[name] = [[media.Player(), -1] for _ in range(self.caps.get(name, DEFAULT_VOICES))]
+        return pool
+
+    def play(self, name, vol=0.6):
+        """играет звук name на свободном или самом старом голосе; плеер или None"""
+        snd = self.sounds.get(name)
+        if not snd:
+            return None
+        pool = self.pool(name)
+        voice = next((v for v in pool if v[0].source is None), None) or min(pool, key=lambda v: v[1])
+        p = voice[0]
+        voice[1] = next(self.order)
+        try:
+            p.volume = vol
+            busy = p.source is not None
+            p.queue(snd.source)
+            if busy:
+                # голос ещё звучит: сразу на новый звук, плеер драйвера тот же
+                p.next_source()
+            p.play()
+        except Exception:
+            return None
+        return p
+
+    def start_music(self, name="music", vol=0.25):
+        """включает музыку по кругу; None, если она ещё не загрузилась"""
+        snd = self.sounds.get(name)
+        if not snd:
+            return None
+        try:
+            if self.music_player is None or self.music_name != name:
+                self.stop_music()
+                p = media.Player()
+                p.loop = True
+                p.queue(snd.source)
+                self.music_player = p
+                self.music_name = name
+            p = self.music_player
+            if not p.playing:
+                # как раньше: после остановки музыка начинается сначала
+                p.seek(0.0)
+            p.volume = vol
+            p.play()
+        except Exception:
+            return None
+        return self.music_player
+
+    def stop_music(self):
+        if self.music_player:
+            self.music_player.pause()
+
+    def players(self):
+        # сколько плееров держит микшер - для проверки, что их не становится больше
+        return sum(len(pool) for pool in self.voices.values()) + (self.music_player is not None)
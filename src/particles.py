@@ -0,0 +1,116 @@
+"""частицы вспышек одним пулом на всю игру
+
+раньше каждая вспышка создавала свою текстуру и свой arcade.Emitter, а при
+касании врага это происходит каждый кадр. здесь все частицы живут в массивах
+numpy фиксированного размера, спрайты созданы заранее и рисуются одним
+SpriteList. когда места нет, новая вспышка занимает слоты самых старых частиц.
+"""
+
+import random
+
+import arcade
+import numpy as np
+
+# больше частиц одновременно не бывает
+CAPACITY = 512
+
+# вспышка как раньше у EmitterIntervalWithTime(0.02, 0.15): 7 частиц через 0.02 с
+BURST = 7
+BURST_GAP = 0.02
+
+SIZE = 6
+ALPHA = 220
+# разлёт за кадр при 60 fps и время жизни, секунды
+SPREAD = 1.5
+LIFE_MIN = 0.2
+LIFE_MAX = 0.5
+
+
+class ParticlePool:
+    def __init__(self, capacity=CAPACITY, colors=(), rng=None):
+        self.capacity = capacity
+        self.rng = rng or random.Random()
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        # возраст меньше нуля - частица ещё ждёт своей очереди во вспышке
+        self.age = np.zeros(capacity)
+        # 0 - слот свободен
+        self.life = np.zeros(capacity)
+        # какие спрайты сейчас видны
+        self.shown = np.zeros(capacity, dtype=bool)
+        # следующий слот для записи; по кругу, поэтому вытесняются самые старые
+        self.head = 0
+
+        self.textures = {}
+        for col in colors:
+            self.texture(col)
+
+        self.sprites = arcade.SpriteList(capacity=capacity)
+        blank = self.texture(arcade.color.WHITE)
+        for _ in range(capacity):
+            s = arcade.Sprite(texture=blank, hit_box_algorithm=None)
+            s.alpha = 0
+            self.sprites.append(s)
+
+    def texture(self, col):
+        tex = self.textures.get(col)
+        if tex is None:
+            tex = self.textures[col] = arcade.make_soft_circle_texture(SIZE, col, 96, 255)
+        return tex
+
+    def burst(self, pos, col, n=BURST):
+        tex = self.texture(col)
+        rnd = self.rng
+        for k in range(n):
+            i = self.head
+            self.head = (i + 1) % self.capacity
+            self.x[i], self.y[i] = pos
+            self.vx[i] = rnd.uniform(-SPREAD, SPREAD)
+            self.vy[i] = rnd.uniform(-SPREAD, SPREAD)
+            self.age[i] = -k * BURST_GAP
+            self.life[i] = rnd.uniform(LIFE_MIN, LIFE_MAX)
+            s = self.sprites[i]
+            if s.texture is not tex:
+                s.texture = tex
+
+    def update(self, dt):
+        if not self.shown.any() and not self.life.any():
+            return
+        live = self.life > 0
+        self.age[live] += dt
+        moving = live & (self.age > 0)
+        # скорость задана на кадр при 60 fps
+        self.x[moving] += self.vx[moving] * dt * 60
+        self.y[moving] += self.vy[moving] * dt * 60
+        self.life[live & (self.age >= self.life)] = 0
+
+        vis = (self.life > 0) & (self.age >= 0)
+        # трогаем только видимые и только что погасшие спрайты
+        sprites = self.sprites
+        idx = np.flatnonzero(vis | self.shown)
+        for i, on, was, x, y in zip(idx.tolist(), vis[idx].tolist(), self.shown[idx].tolist(),
+                                    self.x[idx].tolist(), self.y[idx].tolist()):
+            s = sprites[i]
+            if on:
+                s.position = (x, y)
+                if not was:
+                    s.alpha = ALPHA
+            else:
+                s.alpha = 0
+        self.shown = vis
+
+    def clear(self):
+        self.life[:] = 0
+        for i in np.flatnonzero(self.shown):
+            self.sprites[i].alpha = 0
+        self.shown[:] = False
+
+    def draw(self):
+        if self.shown.any():
+            self.sprites.draw()
+
+    def alive(self):
+        return int(np.count_nonzero(self.shown))
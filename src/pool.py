@@ -0,0 +1,129 @@
+"""спрайты и SpriteList, которые переживают перезапуск уровня
+
+каждый новый SpriteList заводит свои буферы (с окном - и на видеокарте), а
+SpriteList.clear() выбрасывает старые и заводит новые. поэтому списки уровня
+живут всю игру: empty() убирает из них спрайты, но оставляет массивы и буферы
+той же ёмкости, и следующий уровень пишется поверх. спрайты тоже не
+выбрасываются: SpritePool раздаёт их при сборке уровня и забирает обратно,
+когда уровень уходит.
+
+empty() лезет во внутренности SpriteList, поэтому arcade закреплён на 2.6.17.
+"""
+
+import arcade
+
+from levels import FLIP_D, FLIP_H, FLIP_V
+
+# свободные спрайты вида, который столько release() подряд не брали, выбрасываются
+KEEP_IDLE = 8
+
+
+def empty(sl):
+    """убирает все спрайты из sl, не трогая его буферы (в отличие от clear())"""
+    for s in sl.sprite_list:
+        s.sprite_lists.remove(sl)
+    sl.sprite_list = []
+    sl.sprite_slot = {}
+    # слоты буферов снова с нуля: новые спрайты запишутся поверх старых данных,
+    # а рисуется только _sprite_index_slots первых
+    sl._sprite_buffer_slots = 0
+    sl._sprite_index_slots = 0
+    sl._sprite_buffer_free_slots.clear()
+    sl._sprite_index_changed = True
+    # до первого рисования (и без окна) спрайты ждут тут
+    if sl._deferred_sprites:
+        sl._deferred_sprites.clear()
+    if sl.spatial_hash:
+        sl.spatial_hash.contents.clear()
+        sl.spatial_hash.buckets_for_sprite.clear()
+
+
+class SpritePool:
+    """спрайты одного набора списков уровня (LevelSprites)
+
+    get() берёт свободный спрайт нужного вида или делает новый, release()
+    возвращает все выданные. виды разные, потому что у них разный хитбокс:
+    "tile" - тайл с хитбоксом текстуры, "foe" - враг, "solid" - прямоугольник
+    стены для физики (у него вид вместе с размером и цветом).
+    """
+
+    def __init__(self):
+        # вид -> свободные спрайты
+        self.free = {}
+        # (вид, спрайт) в порядке выдачи
+        self.used = []
+        # вид -> сколько release() подряд его не брали
+        self.idle = {}
+        # сколько спрайтов создано за всё время - для bench_reset.py
+        self.made = 0
+
+    def get(self, kind, make):
+        free = self.free.get(kind)
+        if free:
+            s = free.pop()
+        else:
+            s = make()
+            self.made += 1
+        self.used.append((kind, s))
+        return s
+
+    def release(self):
+        """все выданные спрайты снова свободны
+
+        набор собирает то один уровень, то другой (текущий и следующий), поэтому
+        лишние спрайты вида остаются про запас, а вид целиком выбрасывается,
+        только если его не брали KEEP_IDLE раз подряд (стены редкого размера).
+        выданные кладутся наверх в обратном порядке: на том же уровне спрайт
+        получит ту же роль и текстуру.
+        """
+        if not self.used:
+            # набор уже пустой (recycle() дважды подряд)
+            return
+        free = self.free
+        taken = set()
+        for kind, s in reversed(self.used):
+            if s.sprite_lists:
+                s.remove_from_sprite_lists()
+            s.properties.clear()
+            free.setdefault(kind, []).append(s)
+            taken.add(kind)
+        self.used = []
+        for kind in list(free):
+            n = 0 if kind in taken else self.idle.get(kind, 0) + 1
+            if n > KEEP_IDLE:
+                del free[kind]
+                del self.idle[kind]
+            else:
+                self.idle[kind] = n
+
+    def tile(self, tex, x, y):
+        # как arcade.Sprite(fn, image_x=...): хитбокс сразу из текстуры; tex - из
+        # Level.textures. arcade кэширует текстуры по файлу, прямоугольнику и
+        # отражению, так что это дёшево
+        s = self.get("tile", arcade.Sprite)
+        fn, ix, iy, w, h, flip = tex
+        t = arcade.load_texture(fn, x=ix, y=iy, width=w, height=h,
+                                flipped_horizontally=bool(flip & FLIP_H),
+                                flipped_vertically=bool(flip & FLIP_V),
+                                flipped_diagonally=bool(flip & FLIP_D))
+        s.texture = t
+        s.set_hit_box(t.hit_box_points)
+        s.center_x = x
+        s.center_y = y
+        return s
+
+    def foe(self, tex, x, y):
+        # как arcade.Sprite() с текстурой: хитбокс считается при первой проверке
+        s = self.get("foe", arcade.Sprite)
+        s.texture = tex
+        s.set_hit_box(None)
+        s.center_x = x
+        s.center_y = y
+        return s
+
+    def solid(self, w, h, color, x, y):
+        # текстура и хитбокс зависят только от размера и цвета - они в виде
+        s = self.get(("solid", w, h, color), lambda: arcade.SpriteSolidColor(w, h, color))
+        s.center_x = x
+        s.center_y = y
+        return s
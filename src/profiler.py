@@ -0,0 +1,116 @@
+"""замер времени кадра по этапам: on_update, World.step и группы on_draw
+
+этапы отмечаются через lap(имя): время с прошлой отметки прибавляется к этапу.
+последние FRAMES кадров лежат в кольцевом буфере numpy, по нему считаются
+перцентили для оверлея (F3 в игре). если задан trace, каждый кадр ещё
+пишется строкой JSON в файл; запись идёт через буфер, а не по строке на диск.
+
+разобрать готовый trace: python profiler.py trace.jsonl
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+
+# сколько последних кадров держим для перцентилей
+FRAMES = 600
+# буфер файла trace, байт
+TRACE_BUFFER = 1 << 16
+PERCENTILES = (50, 95, 99)
+
+# этапы кадра в порядке выполнения; "frame" - всё время от кадра до кадра
+UPDATE_STAGES = ("player", "physics", "foes", "collisions", "preload", "events", "particles", "animation")
+DRAW_STAGES = ("clear", "camera", "static", "items", "enemies", "hero", "fx", "ui", "overlay")
+STAGES = UPDATE_STAGES + DRAW_STAGES + ("frame",)
+
+
+class NullProfiler:
+    """профайлер, который ничего не делает; у World без окна стоит он"""
+
+    def begin(self):
+        pass
+
+    def lap(self, name):
+        pass
+
+
+class FrameProfiler:
+    def __init__(self, stages=STAGES, frames=FRAMES, trace=None):
+        self.stages = tuple(stages)
+        self.index = {name: i for i, name in enumerate(self.stages)}
+        self.times = np.zeros((frames, len(self.stages)))
+        # время текущего кадра, секунды по этапам
+        self.cur = [0.0] * len(self.stages)
+        # сколько кадров записано всего; строка в буфере - frame % frames
+        self.frame = 0
+        self.t = time.perf_counter()
+        self.t_frame = self.t
+        self.trace = None
+        if trace:
+            self.trace = open(trace, "w", encoding="utf-8", buffering=TRACE_BUFFER)
+
+    def begin(self):
+        # начало группы этапов: то, что было до неё, никуда не идёт
+        self.t = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.cur[self.index[name]] += now - self.t
+        self.t = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        cur = self.cur
+        cur[self.index["frame"]] = now - self.t_frame
+        self.t_frame = now
+        self.times[self.frame % len(self.times)] = cur
+        if self.trace:
+            rec = {"frame": self.frame}
+            for name, t in zip(self.stages, cur):
+                rec[name] = round(t * 1000, 4)
+            self.trace.write(json.dumps(rec) + "\n")
+        self.frame += 1
+        self.cur = [0.0] * len(self.stages)
+        self.t = time.perf_counter()
+
+    def percentiles(self, q=PERCENTILES):
+        """{этап: [мс для каждого q]} по последним кадрам"""
+        n = min(self.frame, len(self.times))
+        if not n:
+            return {name: [0.0] * len(q) for name in self.stages}
+        ms = np.percentile(self.times[:n], q, axis=0) * 1000
+        return {name: ms[:, i].tolist() for i, name in enumerate(self.stages)}
+
+    def close(self):
+        if self.trace:
+            self.trace.close()
+            self.trace = None
+
+
+def read_trace(path):
+    # все кадры trace: {этап: массив мс}
+    with open(path, encoding="utf-8") as f:
+        recs = [json.loads(line) for line in f if line.strip()]
+    names = [k for k in recs[0] if k != "frame"] if recs else []
+    return {name: np.array([r.get(name, 0.0) for r in recs]) for name in names}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("нужен файл: python profiler.py trace.jsonl")
+        return
+    stages = read_trace(sys.argv[1])
+    n = len(next(iter(stages.values()), ()))
+    print(f"кадров: {n}")
+    print(f"{'этап':>12} " + " ".join(f"{'p' + str(q) + ', мс':>10}" for q in PERCENTILES) + f" {'макс, мс':>10}")
+    for name, ms in stages.items():
+        if not len(ms):
+            continue
+        ps = np.percentile(ms, PERCENTILES)
+        print(f"{name:>12} " + " ".join(f"{p:>10.3f}" for p in ps) + f" {ms.max():>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
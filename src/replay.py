@@ -0,0 +1,153 @@
+"""запись игры и её повтор шаг в шаг
+
+пишутся не кадры, а только изменения: на каком шаге World поменялись зажатые
+кнопки и когда запускался уровень, плюс seed для частиц. World при одинаковом
+dt считает одинаково, поэтому при записи и повторе шаг всегда STEP, и повтор
+совпадает с игрой до бита - это сверяется по состоянию в конце записи.
+без окна повтор идёт так быстро, как считает процессор.
+
+python replay.py запись.json              - повтор без окна, сверка и скорость
+python replay.py запись.json --window [N] - показать в окне, N шагов за кадр
+"""
+
+import json
+import random
+import sys
+import time
+
+from world import STATE_PLAY, STEP, World
+
+# порядок кнопок в маске
+KEYS = ("mv_l", "mv_r", "mv_u", "mv_d")
+VERSION = 2
+
+
+def key_mask(w):
+    mask = 0
+    for i, name in enumerate(KEYS):
+        if getattr(w, name):
+            mask |= 1 << i
+    return mask
+
+
+def set_keys(w, mask):
+    for i, name in enumerate(KEYS):
+        setattr(w, name, bool(mask >> i & 1))
+
+
+def snapshot(w):
+    # по этому сверяем повтор с записью; float проходит через json без потерь
+    x, y = w.p.position if w.p else (None, None)
+    return {"tick": w.tick, "state": w.state, "lvl": w.lvl, "oxy": w.oxy, "t_alive": w.t_alive, "x": x, "y": y}
+
+
+class Recorder:
+    """пишет то, что нужно для повтора; World зовёт on_start и on_step сам"""
+
+    def __init__(self, seed=None):
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        # [шаг, "keys", маска] и [шаг, "start", уровень, последний уровень]
+        self.events = []
+        self.mask = None
+
+    def on_start(self, w):
+        self.events.append([w.tick, "start", w.lvl, w.lvl_max])
+
+    def on_step(self, w):
+        mask = key_mask(w)
+        if mask != self.mask:
+            self.mask = mask
+            self.events.append([w.tick, "keys", mask])
+
+    def data(self, w):
+        return {
+            "version": VERSION,
+            "seed": self.seed,
+            "source": w.level_source,
+            "step": STEP,
+            "events": self.events,
+            "end": snapshot(w),
+        }
+
+    def save(self, path, w):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.data(w), f, separators=(",", ":"))
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        rec = json.load(f)
+    if rec.get("version") != VERSION:
+        raise ValueError(f"запись версии {rec.get('version')}, нужна {VERSION}")
+    return rec
+
+
+class Player:
+    """выдаёт World записанные нажатия; apply() - перед каждым шагом"""
+
+    def __init__(self, rec):
+        self.events = rec["events"]
+        self.end_tick = rec["end"]["tick"]
+        self.i = 0
+
+    def apply(self, w):
+        events = self.events
+        while self.i < len(events) and events[self.i][0] <= w.tick:
+            ev = events[self.i]
+            self.i += 1
+            if ev[1] == "keys":
+                set_keys(w, ev[2])
+            elif ev[1] == "start":
+                w.lvl_max = ev[3]
+                w.start(ev[2])
+
+    def done(self, w):
+        # без игры шаги не идут, значит дальше в записи ничего не случится
+        return w.tick >= self.end_tick or w.state != STATE_PLAY
+
+
+def replay(rec, w=None):
+    """повтор без окна; возвращает World в конце записи"""
+    if w is None:
+        w = World(level_source=rec["source"], preload=False, verbose=False)
+    player = Player(rec)
+    while True:
+        player.apply(w)
+        if player.done(w):
+            break
+        w.step(rec["step"])
+    return w
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("нужен файл: python replay.py запись.json [--window [N]]")
+        return
+    rec = load(sys.argv[1])
+    if "--window" in sys.argv[2:]:
+        import arcade
+
+        from main import Game
+
+        args = sys.argv[sys.argv.index("--window") + 1:]
+        g = Game()
+        g.start_replay(rec, int(args[0]) if args else 1)
+        arcade.run()
+        return
+
+    t0 = time.perf_counter()
+    w = replay(rec)
+    t = time.perf_counter() - t0
+    end = snapshot(w)
+    sim = w.tick * rec["step"]
+    print(f"шагов {w.tick}, игра {sim:.1f} с, повтор {t:.2f} с, быстрее в {sim / t:.0f} раз")
+    diff = [k for k in end if end[k] != rec["end"][k]]
+    if diff:
+        for k in diff:
+            print(f"  {k}: запись {rec['end'][k]!r}, повтор {end[k]!r}")
+        sys.exit(1)
+    print("совпадает с записью")
+
+
+if __name__ == "__main__":
+    main()
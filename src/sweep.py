@@ -0,0 +1,278 @@
+"""перебор баланса: прогоны всех уровней ботом на всех ядрах, итог в CSV
+
+для каждого набора чисел из GRID бот RUNS раз проходит каждый уровень отдельно
+(World без окна, шаг STEP). прогоны раздаются ProcessPoolExecutor кусками по
+CHUNK, у каждого процесса свой World. в отчёте на строку набора: доля
+прогонов, прошедших все уровни, доля пройденных уровней и по каждому уровню -
+доля выживших и среднее время до выхода.
+
+python sweep.py [отчёт.csv] [прогонов на набор]
+"""
+
+import csv
+import heapq
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from flow import NEIGHBOURS
+from world import LOW_OXY_THRESHOLD, STATE_CLEAR, World
+
+# что перебираем: имя поля World -> значения
+GRID = {
+    "oxy_drain": (4, 6, 8),
+    "hit_loss": (12, 18, 24),
+    "enemy_speed": (90, 120, 150),
+    "oxy_level_step": (5, 10, 15),
+}
+RUNS = 125
+LEVELS = (1, 2, 3, 4, 5)
+# дольше уровень не идёт: кислород кончится раньше, если не собирать баллоны
+LEVEL_LIMIT = 120
+# прогонов в одной посылке процессу
+CHUNK = 16
+OUT = "sweep.csv"
+
+# клетки ближе BOT_FEAR px к врагу дороже для бота, у самого врага - на BOT_DANGER шагов
+BOT_FEAR = 128
+BOT_DANGER = 40
+
+
+def fits(lv, x, y, hw, hh):
+    # прямоугольник игрока с центром (x, y) не задевает стен
+    c0 = int((x - hw) // lv.tile_w)
+    c1 = int((x + hw) // lv.tile_w)
+    r0 = int((y - hh) // lv.tile_h)
+    r1 = int((y + hh) // lv.tile_h)
+    if c0 < 0 or r0 < 0 or c1 >= lv.cols or r1 >= lv.rows:
+        return False
+    for r in range(r0, r1 + 1):
+        row = r * lv.cols
+        if any(lv.blocked[row + c0:row + c1 + 1]):
+            return False
+    return True
+
+
+# сдвиги от центра клетки в долях клетки, где бот пробует поставить игрока
+SPOTS = ((0, 0), (0, 0.5), (0, -0.5), (0.5, 0), (-0.5, 0), (0.5, 0.5), (-0.5, 0.5), (0.5, -0.5), (-0.5, -0.5))
+
+
+class GreedyBot:
+    """жадный игрок: идёт по самому дешёвому пути к цели и обходит врагов
+
+    путь ищется Дейкстрой по клеткам, куда игрок помещается целиком (он почти
+    в две клетки высотой); клетки рядом с врагами дороже. цель - выход, а
+    когда кислорода мало - ближайший баллон. rng задаёт реакцию (план и кнопки
+    меняются не каждый шаг) и редкие случайные шаги, так что прогоны с разным
+    seed расходятся.
+    """
+
+    def __init__(self, rng, low=LOW_OXY_THRESHOLD * 1.6, react=(1, 6), wander=0.02, fear=BOT_FEAR):
+        self.rng = rng
+        self.low = low
+        self.react = react
+        self.wander = wander
+        self.fear = fear
+        self.lv = None
+        self.spot = None
+        self.wait = 0
+
+    def start_level(self, w):
+        # для каждой клетки - точка в ней, где игрок помещается, или None.
+        # коридоры ровно в две клетки, так что часто это край клетки, а не центр
+        lv = self.lv = w.lv
+        hw = w.p.width / 2 - 1
+        hh = w.p.height / 2 - 1
+        tw = lv.tile_w
+        th = lv.tile_h
+        self.spot = []
+        for i in range(lv.cols * lv.rows):
+            x = (i % lv.cols) * tw + tw / 2
+            y = (i // lv.cols) * th + th / 2
+            for ox, oy in SPOTS:
+                if fits(lv, x + ox * tw, y + oy * th, hw, hh):
+                    self.spot.append((x + ox * tw, y + oy * th))
+                    break
+            else:
+                self.spot.append(None)
+
+    def goal(self, w):
+        px, py = w.p.position
+        if w.oxy < self.low and len(w.oxy_pick):
+            b = min(w.oxy_pick, key=lambda s: abs(s.center_x - px) + abs(s.center_y - py))
+            return b.center_x, b.center_y
+        if len(w.exits):
+            e = w.exits[0]
+            return e.center_x, e.center_y
+        return px, py
+
+    def danger(self, w):
+        # добавка к цене клетки от врагов ближе fear
+        lv = self.lv
+        tw = lv.tile_w
+        reach = int(self.fear // tw) + 1
+        cost = {}
+        for f in w.foes:
+            fc = int(f.center_x // tw)
+            fr = int(f.center_y // lv.tile_h)
+            for r in range(max(0, fr - reach), min(lv.rows, fr + reach + 1)):
+                for c in range(max(0, fc - reach), min(lv.cols, fc + reach + 1)):
+                    d = math.hypot(c * tw + tw / 2 - f.center_x, r * tw + tw / 2 - f.center_y)
+                    if d < self.fear:
+                        j = r * lv.cols + c
+                        cost[j] = cost.get(j, 0) + (1 - d / self.fear) * BOT_DANGER
+        return cost
+
+    def path_step(self, w, gx, gy):
+        """точка, куда идти сейчас: центр следующей клетки пути или сама цель"""
+        lv = self.lv
+        cols = lv.cols
+        px, py = w.p.position
+        here = int(py // lv.tile_h) * cols + int(px // lv.tile_w)
+        gc = int(gx // lv.tile_w)
+        gr = int(gy // lv.tile_h)
+        danger = self.danger(w)
+        spot = self.spot
+
+        dist = {here: 0.0}
+        prev = {}
+        heap = [(0.0, here)]
+        end = -1
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d > dist[i]:
+                continue
+            c = i % cols
+            r = i // cols
+            if abs(c - gc) + abs(r - gr) <= 1:
+                end = i
+                break
+            for dc, dr in NEIGHBOURS:
+                nc = c + dc
+                nr = r + dr
+                if 0 <= nc < cols and 0 <= nr < lv.rows:
+                    j = nr * cols + nc
+                    if spot[j] is None:
+                        continue
+                    nd = d + 1 + danger.get(j, 0)
+                    if nd < dist.get(j, math.inf):
+                        dist[j] = nd
+                        prev[j] = i
+                        heapq.heappush(heap, (nd, j))
+        if end < 0 or end == here:
+            return gx, gy
+        path = [end]
+        while path[-1] in prev:
+            path.append(prev[path[-1]])
+        # у соседних клеток точка бывает одна и та же - берём первую, где она дальше
+        for j in reversed(path):
+            x, y = spot[j]
+            if abs(x - px) + abs(y - py) > lv.tile_w / 2:
+                return x, y
+        return gx, gy
+
+    def __call__(self, w):
+        if w.lv is not self.lv:
+            self.start_level(w)
+        if self.wait > 0:
+            self.wait -= 1
+            return
+        self.wait = self.rng.randint(*self.react) - 1
+
+        if self.rng.random() < self.wander:
+            w.mv_l, w.mv_r, w.mv_u, w.mv_d = (self.rng.random() < 0.3 for _ in range(4))
+            return
+        tx, ty = self.path_step(w, *self.goal(w))
+        px, py = w.p.position
+        dead = 2
+        w.mv_l = tx - px < -dead
+        w.mv_r = tx - px > dead
+        w.mv_u = ty - py > dead
+        w.mv_d = ty - py < -dead
+
+
+_world = None
+
+
+def _init():
+    global _world
+    _world = World(preload=False, verbose=False)
+
+
+def run_one(task):
+    """один прогон всех уровней: [(прошёл, секунд до выхода или гибели), ...]"""
+    params, seed = task
+    w = _world
+    for name, value in params.items():
+        setattr(w, name, value)
+    bot = GreedyBot(random.Random(seed))
+    out = []
+    for lvl in LEVELS:
+        # уровень заканчивается на выходе, а не грузит следующий
+        w.lvl_max = lvl
+        w.start(lvl)
+        w.mv_l = w.mv_r = w.mv_u = w.mv_d = False
+        w.run(LEVEL_LIMIT, bot=bot)
+        out.append((w.state == STATE_CLEAR, w.t_alive))
+    return out
+
+
+def tasks(grid, runs):
+    names = list(grid)
+    for values in itertools.product(*grid.values()):
+        params = dict(zip(names, values))
+        for seed in range(runs):
+            yield params, seed
+
+
+def summary(params, results):
+    row = dict(params)
+    row["runs"] = len(results)
+    cleared = [all(ok for ok, _ in r) for r in results]
+    row["clear_rate"] = round(sum(cleared) / len(results), 4)
+    # доля пройденных уровней по всем прогонам
+    row["survive"] = round(sum(ok for r in results for ok, _ in r) / (len(results) * len(LEVELS)), 4)
+    for i, lvl in enumerate(LEVELS):
+        times = [r[i][1] for r in results if r[i][0]]
+        row[f"survive_{lvl}"] = round(len(times) / len(results), 4)
+        row[f"time_{lvl}"] = round(sum(times) / len(times), 2) if times else ""
+    return row
+
+
+def sweep(grid=GRID, runs=RUNS, out=OUT, workers=None):
+    workers = workers or os.cpu_count()
+    todo = list(tasks(grid, runs))
+    t0 = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init) as pool:
+        results = pool.map(run_one, todo, chunksize=CHUNK)
+        for params, group in itertools.groupby(zip(todo, results), key=lambda pr: pr[0][0]):
+            rows.append(summary(params, [r for _, r in group]))
+            done = len(rows) * runs
+            print(f"\r{done}/{len(todo)} прогонов, {time.perf_counter() - t0:.0f} с", end="", flush=True)
+    print()
+
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows, time.perf_counter() - t0
+
+
+def main():
+    out = sys.argv[1] if len(sys.argv) > 1 else OUT
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+    combos = math.prod(len(v) for v in GRID.values())
+    print(f"{combos} наборов по {runs} прогонов на {os.cpu_count()} процессах")
+    rows, t = sweep(runs=runs, out=out)
+    best = max(rows, key=lambda r: (r["clear_rate"], r["survive"]))
+    print(f"готово за {t:.0f} с, отчёт в {out}")
+    print("чаще всего проходят: " + ", ".join(f"{k}={best[k]}" for k in GRID) + f" ({best['survive']:.0%} уровней)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""шаги World одной длины при любой частоте кадров
+
+кадры приходят с разным dt (30, 60, 144 Гц, медленный кадр), а World всегда
+шагает на STEP: FixedStep копит время кадров и говорит, сколько целых шагов
+сделать. если кадр был очень долгим (окно таскали, диск задумался), шагов за
+кадр не больше MAX_CATCHUP, а лишнее время выбрасывается: игра на миг
+отстаёт от часов, но враги не проскакивают сквозь стены одним большим шагом
+и догонялка не растёт от кадра к кадру.
+
+между шагами игрок и враги рисуются там, где были бы сейчас: Interp помнит
+их позиции перед последним шагом кадра, а on_draw ставит спрайты на долю
+alpha пути от старых позиций к новым и после рисования возвращает на место.
+сам World этих сдвигов не видит.
+"""
+
+import numpy as np
+
+from world import STEP
+
+# больше стольких шагов за кадр не догоняем: при STEP = 1/60 это 0.13 с,
+# обычные подвисания догоняются целиком
+MAX_CATCHUP = 8
+
+
+class FixedStep:
+    """накопитель времени кадров для шагов длиной step"""
+
+    def __init__(self, step=STEP, max_steps=MAX_CATCHUP):
+        self.step = step
+        self.max_steps = max_steps
+        # время кадров, которое ещё не ушло в шаги
+        self.acc = 0.0
+        # сколько времени выброшено из-за MAX_CATCHUP - для bench_timestep.py
+        self.dropped = 0.0
+
+    def advance(self, dt):
+        """сколько шагов World сделать за кадр длиной dt"""
+        self.acc += dt
+        n = 0
+        while self.acc >= self.step and n < self.max_steps:
+            self.acc -= self.step
+            n += 1
+        if self.acc >= self.step:
+            # не догнали: целые шаги выбрасываем, дробный остаток оставляем
+            drop = self.acc - self.acc % self.step
+            self.acc -= drop
+            self.dropped += drop
+        return n
+
+    def alpha(self, extra=0.0):
+        """доля пути от прошлого шага к текущему, 0..1; extra - время после advance()"""
+        return min(1.0, (self.acc + extra) / self.step)
+
+    def reset(self):
+        self.acc = 0.0
+
+
+def foe_xy(w):
+    # позиции врагов массивами: у пачки свои, иначе - копия у FoeLod
+    if w.foe_batch:
+        return w.foe_batch.x, w.foe_batch.y
+    if w.lod:
+        return w.lod.x, w.lod.y
+    return None, None
+
+
+class Interp:
+    """позиции игрока и врагов до последнего шага; рисуем между ними и текущими"""
+
+    def __init__(self):
+        self.p = None
+        self.x0 = None
+        self.y0 = None
+        # (спрайт, настоящая позиция) на время рисования
+        self.moved = []
+
+    def clear(self):
+        # новый уровень: прошлых позиций нет, рисуем как есть
+        self.p = None
+        self.x0 = None
+        self.y0 = None
+
+    def save(self, w):
+        """зовётся перед шагом World"""
+        self.p = w.p.position if w.p else None
+        x, y = foe_xy(w)
+        if x is None:
+            self.x0 = self.y0 = None
+            return
+        if self.x0 is None or len(self.x0) != len(x):
+            self.x0 = x.copy()
+            self.y0 = y.copy()
+        else:
+            self.x0[:] = x
+            self.y0[:] = y
+
+    def apply(self, w, alpha):
+        """ставит шагнувших на alpha пути от прошлой позиции; restore() вернёт"""
+        moved = self.moved
+        p = w.p
+        if p and self.p is not None and p.position != self.p:
+            (x0, y0), (x1, y1) = self.p, p.position
+            moved.append((p, p.position))
+            p.position = (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
+
+        x, y = foe_xy(w)
+        if x is None or self.x0 is None or len(x) != len(self.x0):
+            return
+        # двигались только те, кому LOD дал шаг, их и сдвигаем
+        idx = np.flatnonzero((x != self.x0) | (y != self.y0))
+        if not len(idx):
+            return
+        ix = self.x0[idx] + (x[idx] - self.x0[idx]) * alpha
+        iy = self.y0[idx] + (y[idx] - self.y0[idx]) * alpha
+        foes = w.foes
+        for i, fx, fy in zip(idx.tolist(), ix.tolist(), iy.tolist()):
+            s = foes[i]
+            moved.append((s, s.position))
+            s.position = (fx, fy)
+
+    def restore(self):
+        for s, pos in self.moved:
+            s.position = pos
+        self.moved.clear()
@@ -0,0 +1,352 @@
+"""много копий одного уровня в массивах numpy, для обучения ботов
+
+VecEnv делает то же, что World.step, только сразу для N независимых игр:
+ход игрока по update_player_vel, погоня врагов как в update_foes (поле путей,
+шаг с подгонкой к цели, раздельные проверки стен и скольжение) и правила
+кислорода из step/handle_collisions. спрайтов и окон нет: всё состояние - в
+массивах (N,) и (N, врагов), шаг всех игр - один вызов.
+
+отличия от World: хитбоксы - прямоугольники по крайним точкам хитбоксов
+arcade (первого кадра), а стена игрока останавливает вплотную, а не
+подбором arcade.PhysicsEngineSimple. для обучения этого хватает, а для
+точных проверок есть World и replay.py.
+"""
+
+import math
+from collections import OrderedDict
+
+import arcade
+import numpy as np
+
+from flow import FlowField
+from foe_batch import SNAP
+from levels import EXIT, FOE, OXY
+from world import (
+    ASSETS, ENEMY_SPEED, LEVEL_SOURCE, MAX_OXY, OXY_DRAIN_PER_SEC, OXY_FLOOR, OXY_HIT_LOSS, OXY_LEVEL_STEP,
+    PLAYER_SPEED, STEP, level_data, start_oxy,
+)
+
+# действия: стоять и 8 направлений (как зажатые WASD)
+ACTIONS = np.array([(0, 0), (-1, 0), (1, 0), (0, 1), (0, -1), (-1, 1), (1, 1), (-1, -1), (1, -1)], dtype=np.float64)
+# сколько ближайших врагов видно в наблюдении
+NEAR_FOES = 4
+# x, y, кислород, выход, ближайший баллон, ближайшие враги (по dx, dy)
+OBS_SIZE = 3 + 2 + 2 + 2 * NEAR_FOES
+
+REWARD_EXIT = 1.0
+REWARD_DEAD = -1.0
+REWARD_PICK = 0.1
+# дольше этого эпизод обрывается, секунд игры
+EPISODE_LIMIT = 120
+# память под строки таблицы путей одного уровня, см. NextTable
+NEXT_CACHE_MB = 64
+# столько таблиц последних уровней держится для новых VecEnv; живая VecEnv
+# держит свою сама, так что выброшенная из кэша ей не мешает
+TABLES_KEEP = 2
+
+_tables = OrderedDict()
+
+
+def box(path):
+    # крайние точки хитбокса текстуры: x0, y0, x1, y1 от центра
+    pts = np.array(arcade.load_texture(path).hit_box_points)
+    return (*pts.min(axis=0), *pts.max(axis=0))
+
+
+class NextTable:
+    """next[цель][клетка] - следующая клетка пути к цели, -1 если пути нет
+
+    то же поле путей, что у FlowField, только для многих целей: у каждой игры
+    свой игрок, и пересчитывать поле на каждую нельзя. полная таблица клетки x
+    клетки на больших картах не влезет в память (150x100 - почти гигабайт),
+    поэтому строка считается при первом запросе своей цели, а строк держится
+    не больше NEXT_CACHE_MB; давно не нужные выбрасываются.
+    """
+
+    def __init__(self, lv, cache_mb=NEXT_CACHE_MB):
+        n = lv.cols * lv.rows
+        self.cols = lv.cols
+        self.tile = lv.tile_w
+        self.blocked = lv.blocked
+        self.flow = FlowField(lv.cols, lv.rows, lv.tile_w, lv.blocked)
+        # маленькая карта помещается целиком
+        self.max_rows = max(1, cache_mb * 2 ** 20 // (4 * n))
+        self.rows = OrderedDict()
+        # цель в стене: пути нет ниоткуда
+        self.no_path = np.full(n, -1, dtype=np.int32)
+
+    def row(self, g):
+        if self.blocked[g]:
+            return self.no_path
+        r = self.rows.get(g)
+        if r is not None:
+            self.rows.move_to_end(g)
+            return r
+        t = self.tile
+        self.flow.update((g % self.cols) * t + t / 2, (g // self.cols) * t + t / 2)
+        r = self.rows[g] = np.array(self.flow.next, dtype=np.int32)
+        if len(self.rows) > self.max_rows:
+            self.rows.popitem(last=False)
+        return r
+
+    def lookup(self, goal, here):
+        """next для всех игр: goal (N,) - клетка игрока, here (N, врагов) - клетки врагов
+
+        клетки вне карты (-1) дают -1. строки берутся по разу на разную цель.
+        """
+        out = np.full(here.shape, -1, dtype=np.int32)
+        for g in np.unique(goal[goal >= 0]).tolist():
+            m = goal == g
+            h = here[m]
+            out[m] = np.where(h >= 0, self.row(g)[np.maximum(h, 0)], -1)
+        return out
+
+
+def next_table(lv):
+    """общая NextTable уровня: строки, посчитанные одной VecEnv, нужны и другим"""
+    key = (lv.key, lv.name)
+    table = _tables.get(key)
+    if table is not None:
+        _tables.move_to_end(key)
+        return table
+    table = _tables[key] = NextTable(lv)
+    while len(_tables) > TABLES_KEEP:
+        _tables.popitem(last=False)
+    return table
+
+
+class VecEnv:
+    """n игр на уровне lvl; step(actions) -> (obs, reward, done)
+
+    закончившиеся игры (выход, кислород, EPISODE_LIMIT) сразу начинаются
+    заново, как в векторных средах gym; obs для них - уже после сброса.
+    """
+
+    def __init__(self, n, lvl=1, level_source=LEVEL_SOURCE, dt=STEP, oxy_drain=OXY_DRAIN_PER_SEC,
+                 hit_loss=OXY_HIT_LOSS, enemy_speed=ENEMY_SPEED, oxy_level_step=OXY_LEVEL_STEP,
+                 oxy_floor=OXY_FLOOR):
+        lv = self.lv = level_data(level_source, lvl)
+        self.n = n
+        self.dt = dt
+        self.oxy_drain = oxy_drain
+        self.hit_loss = hit_loss
+        self.oxy_start = start_oxy(lvl, oxy_level_step, oxy_floor)
+        self.max_steps = int(EPISODE_LIMIT / dt)
+        self.tile = lv.tile_w
+        self.cols = lv.cols
+        self.rows = lv.rows
+        self.size = np.array([lv.cols * lv.tile_w, lv.rows * lv.tile_h], dtype=np.float64)
+
+        # сетка стен с рамкой в одну пустую клетку, как в FoeBatch
+        grid = np.frombuffer(bytes(lv.blocked), dtype=np.uint8).reshape(lv.rows, lv.cols)
+        self.blocked = np.pad(grid, 1).astype(bool)
+        self.next = next_table(lv)
+        t = self.tile
+        cells = np.arange(lv.cols * lv.rows)
+        self.cell_x = (cells % lv.cols) * t + t / 2
+        self.cell_y = (cells // lv.cols) * t + t / 2
+
+        self.p_box = box(ASSETS / "models" / "player1.png")
+        self.f_box = box(ASSETS / "models" / "enemy1.png")
+        self.start = self.free_spot(*lv.start)
+
+        foes = list(lv.items(FOE))
+        self.foe_x0 = np.array([x for x, _, _, _ in foes], dtype=np.float64)
+        self.foe_y0 = np.array([y for _, y, _, _ in foes], dtype=np.float64)
+        self.foe_speed = np.array([s or enemy_speed for _, _, _, s in foes], dtype=np.float64)
+
+        # баллоны и выходы - прямоугольники тайлов
+        picks = list(lv.items(OXY))
+        self.pick_x = np.array([x for x, _, _, _ in picks], dtype=np.float64)
+        self.pick_y = np.array([y for _, y, _, _ in picks], dtype=np.float64)
+        self.pick_fill = np.array([f for _, _, _, f in picks], dtype=np.float64)
+        self.pick_half = np.array([(tex[3] / 2, tex[4] / 2) for _, _, tex, _ in picks]).reshape(-1, 2)
+        exits = list(lv.items(EXIT))
+        self.exit_x = np.array([x for x, _, _, _ in exits], dtype=np.float64)
+        self.exit_y = np.array([y for _, y, _, _ in exits], dtype=np.float64)
+        self.exit_half = np.array([(tex[3] / 2, tex[4] / 2) for _, _, tex, _ in exits]).reshape(-1, 2)
+
+        # состояние всех игр
+        self.px = np.zeros(n)
+        self.py = np.zeros(n)
+        self.oxy = np.zeros(n)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.fx = np.zeros((n, len(foes)))
+        self.fy = np.zeros((n, len(foes)))
+        self.picked = np.zeros((n, len(picks)), dtype=bool)
+        self.reset()
+
+    # сброс
+
+    def reset(self, mask=None):
+        """начинает заново игры из mask (все, если None); возвращает obs"""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.px[mask], self.py[mask] = self.start
+        self.oxy[mask] = self.oxy_start
+        self.steps[mask] = 0
+        self.fx[mask] = self.foe_x0
+        self.fy[mask] = self.foe_y0
+        self.picked[mask] = False
+        return self.observe()
+
+    # стены
+
+    def hits_wall(self, x, y, b):
+        """задевает ли прямоугольник b с центром (x, y) стену; касание краем не в счёт"""
+        t = self.tile
+        rows, cols = self.blocked.shape
+        # клетки в сетке с рамкой, поэтому +1
+        c0 = np.clip(np.floor((x + b[0]) / t).astype(np.int64) + 1, 0, cols - 1)
+        c1 = np.clip(np.ceil((x + b[2]) / t).astype(np.int64), 0, cols - 1)
+        r0 = np.clip(np.floor((y + b[1]) / t).astype(np.int64) + 1, 0, rows - 1)
+        r1 = np.clip(np.ceil((y + b[3]) / t).astype(np.int64), 0, rows - 1)
+        hit = np.zeros(np.shape(x), dtype=bool)
+        span_c = math.ceil((b[2] - b[0]) / t) + 1
+        span_r = math.ceil((b[3] - b[1]) / t) + 1
+        for dr in range(span_r):
+            r = np.minimum(r0 + dr, r1)
+            for dc in range(span_c):
+                hit |= self.blocked[r, np.minimum(c0 + dc, c1)]
+        return hit
+
+    def free_spot(self, x, y):
+        # старт на картах задевает стену; arcade выталкивает игрока так же (_circular_check)
+        hit = self.hits_wall(np.array([x]), np.array([y]), self.p_box)[0]
+        vary = 1
+        while hit:
+            for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+                if not self.hits_wall(np.array([x + dx * vary]), np.array([y + dy * vary]), self.p_box)[0]:
+                    return x + dx * vary, y + dy * vary
+            vary *= 2
+        return x, y
+
+    def move_player(self, vx, vy):
+        # как PhysicsEngineSimple: сначала по y, потом по x; в стену - встаём вплотную
+        t = self.tile
+        b = self.p_box
+        ny = self.py + vy
+        hit = (vy != 0) & self.hits_wall(self.px, ny, b)
+        up = np.floor((ny + b[3]) / t) * t - b[3]
+        down = (np.floor((ny + b[1]) / t) + 1) * t - b[1]
+        ny = np.where(hit, np.where(vy > 0, np.clip(up, self.py, ny), np.clip(down, ny, self.py)), ny)
+        self.py = ny
+
+        nx = self.px + vx
+        hit = (vx != 0) & self.hits_wall(nx, self.py, b)
+        right = np.floor((nx + b[2]) / t) * t - b[2]
+        left = (np.floor((nx + b[0]) / t) + 1) * t - b[0]
+        nx = np.where(hit, np.where(vx > 0, np.clip(right, self.px, nx), np.clip(left, nx, self.px)), nx)
+        self.px = nx
+
+    def move_foes(self):
+        # World.update_foes: к следующей клетке пути, рядом с игроком - прямо к нему
+        px = self.px[:, None]
+        py = self.py[:, None]
+        goal = self.cell(self.px, self.py)
+        here = self.cell(self.fx, self.fy)
+        nxt = self.next.lookup(goal, here)
+        goal = goal[:, None]
+        use = (here >= 0) & (goal >= 0) & (here != goal) & (nxt >= 0)
+        tx = np.where(use, self.cell_x[nxt], px)
+        ty = np.where(use, self.cell_y[nxt], py)
+
+        dx = tx - self.fx
+        dy = ty - self.fy
+        dist = np.hypot(dx, dy)
+        moving = dist > 0
+        step = self.foe_speed * self.dt
+        k = np.where(dist > step, step / np.where(moving, dist, 1), 1.0)
+        sx = dx * k
+        sy = dy * k
+
+        nx = self.fx + sx
+        nx = np.where(np.abs(tx - nx) < SNAP, tx, nx)
+        hit_x = moving & self.hits_wall(nx, self.fy, self.f_box)
+        self.fx = np.where(moving & ~hit_x, nx, self.fx)
+        sy = np.where(hit_x, np.clip(dy, -step, step), sy)
+
+        ny = self.fy + sy
+        ny = np.where(np.abs(ty - ny) < SNAP, ty, ny)
+        hit_y = moving & self.hits_wall(self.fx, ny, self.f_box)
+        self.fy = np.where(moving & ~hit_y, ny, self.fy)
+
+    def cell(self, x, y):
+        c = np.floor(x / self.tile).astype(np.int64)
+        r = np.floor(y / self.tile).astype(np.int64)
+        inside = (c >= 0) & (c < self.cols) & (r >= 0) & (r < self.rows)
+        return np.where(inside, r * self.cols + c, -1)
+
+    # касания
+
+    def touching(self, x, y, hx, hy):
+        # прямоугольник игрока против прямоугольников (x, y) с половинами (hx, hy)
+        b = self.p_box
+        px = self.px[:, None]
+        py = self.py[:, None]
+        return (px + b[2] > x - hx) & (px + b[0] < x + hx) & (py + b[3] > y - hy) & (py + b[1] < y + hy)
+
+    def foe_hit(self):
+        p = self.p_box
+        f = self.f_box
+        px = self.px[:, None]
+        py = self.py[:, None]
+        return ((px + p[2] > self.fx + f[0]) & (px + p[0] < self.fx + f[2])
+                & (py + p[3] > self.fy + f[1]) & (py + p[1] < self.fy + f[3])).any(axis=1)
+
+    # шаг
+
+    def step(self, actions):
+        """actions - номера из ACTIONS, по одному на игру"""
+        d = ACTIONS[np.asarray(actions)]
+        diag = (d[:, 0] != 0) & (d[:, 1] != 0)
+        speed = np.where(diag, PLAYER_SPEED / math.sqrt(2), PLAYER_SPEED)
+        reward = np.zeros(self.n)
+
+        self.steps += 1
+        self.oxy -= self.oxy_drain * self.dt
+        self.move_player(d[:, 0] * speed, d[:, 1] * speed)
+        self.move_foes()
+
+        self.oxy -= np.where(self.foe_hit(), self.hit_loss, 0.0)
+        if len(self.pick_x):
+            got = ~self.picked & self.touching(self.pick_x, self.pick_y, self.pick_half[:, 0], self.pick_half[:, 1])
+            self.oxy = np.minimum(MAX_OXY, self.oxy + (got * self.pick_fill).sum(axis=1))
+            self.picked |= got
+            reward += REWARD_PICK * got.sum(axis=1)
+        won = np.zeros(self.n, dtype=bool)
+        if len(self.exit_x):
+            won = self.touching(self.exit_x, self.exit_y, self.exit_half[:, 0], self.exit_half[:, 1]).any(axis=1)
+        dead = ~won & (self.oxy <= 0)
+        reward += np.where(won, REWARD_EXIT, 0.0) + np.where(dead, REWARD_DEAD, 0.0)
+        done = won | dead | (self.steps >= self.max_steps)
+        if done.any():
+            self.reset(done)
+        return self.observe(), reward, done
+
+    def observe(self):
+        w, h = self.size
+        obs = np.zeros((self.n, OBS_SIZE), dtype=np.float32)
+        obs[:, 0] = self.px / w
+        obs[:, 1] = self.py / h
+        obs[:, 2] = self.oxy / MAX_OXY
+        if len(self.exit_x):
+            obs[:, 3] = (self.exit_x[0] - self.px) / w
+            obs[:, 4] = (self.exit_y[0] - self.py) / h
+        if len(self.pick_x):
+            dx = self.pick_x - self.px[:, None]
+            dy = self.pick_y - self.py[:, None]
+            d = np.where(self.picked, np.inf, np.abs(dx) + np.abs(dy))
+            i = d.argmin(axis=1)
+            left = np.isfinite(d[np.arange(self.n), i])
+            obs[:, 5] = np.where(left, dx[np.arange(self.n), i] / w, 0)
+            obs[:, 6] = np.where(left, dy[np.arange(self.n), i] / h, 0)
+        k = min(NEAR_FOES, self.fx.shape[1])
+        if k:
+            dx = self.fx - self.px[:, None]
+            dy = self.fy - self.py[:, None]
+            near = np.argsort(np.abs(dx) + np.abs(dy), axis=1)[:, :k]
+            rows = np.arange(self.n)[:, None]
+            obs[:, 7:7 + 2 * k:2] = dx[rows, near] / w
+            obs[:, 8:8 + 2 * k:2] = dy[rows, near] / h
+        return obs
@@ -0,0 +1,612 @@
+"""логика игры без окна: уровень, игрок, враги, кислород
+
+World шагает с любым dt и не знает про экран, звук и частицы. всё, что должно
+быть видно или слышно, он складывает в events, а окно (GameBase) их разбирает.
+так уровни можно гонять без дисплея и быстрее реального времени.
+"""
+
+import math
+import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import arcade
+import numpy as np
+
+from bake import bake_layer, can_bake, is_baked, layer_name, level_image
+from chunks import CHUNK_TILES, LevelChunks
+from colliders import rect_sprites
+from flow import FlowField
+from foe_batch import FoeBatch
+from levels import EXIT, FOE, OXY, WALL, load_csv_level, load_level
+from lod import FoeLod
+from pool import SpritePool, empty
+from profiler import NullProfiler
+
+# пути к файлам игры
+DATA = pathlib.Path(__file__).resolve().parent.parent / "data"
+ASSETS = pathlib.Path(__file__).resolve().parent.parent / "assets"
+# разобранные карты, см. levels.py
+LEVEL_CACHE = DATA / "cache"
+# откуда брать уровни: "tmx" (levelsNN.tmx) или "csv" (data/levels.csv)
+LEVEL_SOURCE = "tmx"
+
+# основные числа для баланса
+PLAYER_SPEED = 5
+ENEMY_SPEED = 120
+OXY_DRAIN_PER_SEC = 6
+OXY_HIT_LOSS = 18
+LOW_OXY_THRESHOLD = 25
+MAX_OXY = 100
+# стартовый кислород: на каждом уровне на OXY_LEVEL_STEP меньше, но не ниже OXY_FLOOR
+OXY_LEVEL_STEP = 10
+OXY_FLOOR = 40
+
+# шаг симуляции без окна
+STEP = 1 / 60
+# кадр анимации игрока и врагов, секунды
+ANIM_FRAME = 0.2
+
+# с такого числа врагов они считаются пачкой в numpy (FoeBatch)
+FOE_BATCH_MIN = 200
+
+# цвет стен у уровней из csv, там стены - прямоугольники без тайлов
+WALL_COLOR = arcade.color.DARK_SLATE_GRAY
+
+# размер ячейки сетки для стен и предметов (2x2 тайла)
+HASH_CELL = 64
+
+# сколько секунд за кадр можно тратить на сборку следующего уровня
+PRELOAD_BUDGET = 0.002
+# сколько спрайтов собирать между проверками бюджета
+BUILD_CHUNK = 32
+
+# состояния игры
+STATE_MENU = "menu"
+STATE_PLAY = "play"
+STATE_OVER = "over"
+STATE_CLEAR = "clear"
+
+# цвета вспышек
+HIT_COLOR = arcade.color.BARN_RED
+PICK_COLOR = arcade.color.SPRING_GREEN
+
+
+def level_data(source, n):
+    # Level номер n; можно звать из фонового потока, arcade тут не нужен
+    if source == "csv":
+        return load_csv_level(DATA / "levels.csv", n)
+    return load_level(DATA / f"levels{n:02d}.tmx", LEVEL_CACHE)
+
+
+def start_oxy(lvl, level_step=OXY_LEVEL_STEP, floor=OXY_FLOOR):
+    # кислород на старте уровня lvl; общий для World, VecEnv и analyze.py
+    return max(floor, MAX_OXY - (lvl - 1) * level_step)
+
+
+def prepare_level(source, n):
+    # работа фонового потока: разбор уровня и картинка для запечённого слоя
+    lv = level_data(source, n)
+    image = None if is_baked(layer_name(lv)) or not can_bake(lv) else level_image(lv, WALL_COLOR)
+    return lv, image
+
+
+def snap(v, target):
+    # коридоры ровно под размер врага, поэтому у цели встаём точно в неё,
+    # иначе погрешность float цепляет соседнюю стену
+    if abs(target - v) < 0.01:
+        return target
+    return v
+
+
+class LevelSprites:
+    """всё, что reset() собирает из Level; готовится заранее и забирается целиком
+
+    у World два таких набора: текущий уровень и запасной, в который собирается
+    следующий. списки и спрайты набора переживают смену уровня, см. recycle().
+    """
+
+    def __init__(self, lv=None):
+        self.lv = lv
+        # спрайты этого набора, см. pool.py
+        self.pool = SpritePool()
+        # стены, кислород и выход не двигаются, поэтому проверки идут через сетку,
+        # а не перебором всех тайлов
+        self.walls = arcade.SpriteList()
+        self.phys_walls = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+        self.foes = arcade.SpriteList()
+        self.oxy_pick = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+        self.exits = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=HASH_CELL)
+        self.static_layer = None
+        # те же спрайты кусками для рисования, см. chunks.py
+        self.chunks = None
+        self.flow = None
+        self.foe_batch = None
+        self.lod = None
+        # картинка неподвижного слоя, если её уже склеили в фоне
+        self.image = None
+        # куски прошлого уровня: build_level() возьмёт их списки снова
+        self.old_chunks = None
+
+    def recycle(self, lv=None):
+        """готовит набор под уровень lv: списки пустеют, спрайты уходят в pool
+
+        сами SpriteList (и их буферы на видеокарте) остаются прежними.
+        """
+        for sl in (self.walls, self.phys_walls, self.foes, self.oxy_pick, self.exits):
+            empty(sl)
+        if self.chunks:
+            self.chunks.empty()
+            self.old_chunks = self.chunks
+        # подобранные баллоны уже ни в каком списке, но пул помнит и их
+        self.pool.release()
+        self.lv = lv
+        self.static_layer = None
+        self.chunks = None
+        self.flow = None
+        self.foe_batch = None
+        self.lod = None
+        self.image = None
+
+
+# поля LevelSprites, которые reset() переносит в игру
+LEVEL_ATTRS = ("walls", "phys_walls", "foes", "oxy_pick", "exits", "static_layer", "chunks", "flow", "foe_batch", "lod")
+
+
+class World:
+    """состояние одной игры и шаг симуляции
+
+    события для окна копятся в events в виде кортежей:
+    ("level",) - уровень запущен, ("sound", имя, громкость), ("music", вкл),
+    ("fx", позиция, цвет). step() очищает список в начале шага.
+    """
+
+    def __init__(self, level_source=LEVEL_SOURCE, preload=True, verbose=True):
+        # текущее состояние игры
+        self.state = STATE_MENU
+        self.lvl = 1
+        self.lvl_max = 5
+        self.level_source = level_source
+        self.oxy = MAX_OXY
+        self.t_alive = 0.0
+        self.verbose = verbose
+        self.events = []
+        # баланс; sweep.py подбирает его у своих World, игра берёт константы
+        self.oxy_drain = OXY_DRAIN_PER_SEC
+        self.hit_loss = OXY_HIT_LOSS
+        self.enemy_speed = ENEMY_SPEED
+        self.oxy_level_step = OXY_LEVEL_STEP
+        self.oxy_floor = OXY_FLOOR
+
+        # замер этапов шага, окно ставит сюда свой FrameProfiler
+        self.prof = NullProfiler()
+        # сколько шагов игры сделано и кто их записывает (см. replay.py)
+        self.tick = 0
+        self.rec = None
+
+        # игрок и физика
+        self.p = None
+        self.phys = None
+        self.dead_played = False
+        self.anim_timer = 0.0
+        # кадр анимации, который сейчас стоит у врагов
+        self.anim_fr = 0
+
+        # какие кнопки зажаты
+        self.mv_l = False
+        self.mv_r = False
+        self.mv_u = False
+        self.mv_d = False
+
+        # спрайты уровня (см. LevelSprites): текущий набор и запасной, в
+        # который собирается следующий уровень; после смены они меняются местами
+        self.lv = None
+        self.ls = None
+        self.spare = LevelSprites()
+        self.take_level(LevelSprites())
+
+        # следующий уровень грузится в фоне, пока играем текущий
+        self.preload_on = preload
+        # сборка спрайтов на PRELOAD_BUDGET в каждом step(); окно выключает это
+        # и зовёт pump_preload() само раз за кадр - кадр может сделать несколько шагов
+        self.pump_each_step = True
+        self.loader = ThreadPoolExecutor(max_workers=1)
+        self.preload_key = None
+        self.preload_data = None
+        self.preload_steps = None
+        self.preload = None
+
+        # по текстурам считаются хитбоксы, поэтому они нужны и без окна
+        self.player_tex = [
+            arcade.load_texture(ASSETS / "models" / "player1.png"),
+            arcade.load_texture(ASSETS / "models" / "player2.png"),
+        ]
+        self.enemy_tex = [
+            arcade.load_texture(ASSETS / "models" / "enemy1.png"),
+            arcade.load_texture(ASSETS / "models" / "enemy2.png"),
+        ]
+
+        # спрайт игрока и его физика одни на всю игру, reset() ставит их на старт
+        self.hero = arcade.Sprite()
+        self.hero_phys = arcade.PhysicsEngineSimple(self.hero, [])
+
+    def say(self, msg):
+        if self.verbose:
+            print(msg)
+
+    def start(self, lvl=1):
+        self.lvl = lvl
+        if self.rec:
+            self.rec.on_start(self)
+        self.reset()
+
+    def play(self, lv):
+        """запускает готовый Level мимо data/: сгенерированные карты, замеры
+
+        запись игры такой уровень не повторит, поэтому rec тут не зовётся.
+        """
+        self.reset(lv)
+
+    def run(self, seconds, dt=STEP, bot=None):
+        """шагает, пока идёт игра, но не дольше seconds игрового времени
+
+        bot(world) зовётся перед каждым шагом и может нажимать кнопки (mv_*).
+        возвращает число сделанных шагов.
+        """
+        n = 0
+        while self.state == STATE_PLAY and n * dt < seconds:
+            if bot:
+                bot(self)
+            self.step(dt)
+            n += 1
+        return n
+
+    # запуск уровня
+
+    def reset(self, lv=None):
+        self.oxy = self.start_oxy(self.lvl)
+        self.t_alive = 0.0
+        self.anim_timer = 0.0
+        # кадр анимации, который сейчас стоит у врагов
+        self.anim_fr = 0
+
+        self.p = None
+        self.phys = None
+        self.dead_played = False
+        self.events.append(("music", False))
+
+        if lv is not None:
+            map_name = lv.name
+        elif self.level_source == "csv":
+            map_name = f"levels.csv #{self.lvl}"
+        else:
+            map_name = f"levels{self.lvl:02d}.tmx"
+        self.say(f"Загружаю карту: {map_name}")
+
+        try:
+            t0 = time.perf_counter()
+            ls = None if lv is not None else self.take_preload((self.level_source, self.lvl))
+            if ls is None:
+                # собираем в запасной набор; если там готовился другой уровень - бросаем его
+                self.drop_preload()
+                ls = self.spare
+                ls.recycle(lv if lv is not None else level_data(self.level_source, self.lvl))
+                for _ in self.build_level(ls):
+                    pass
+        except Exception as e:
+            print(f"Ошибка карты: {e}")
+            self.spare.recycle()
+            self.take_level(self.spare)
+            self.state = STATE_CLEAR
+            return
+        self.take_level(ls)
+        self.say(f"Стены: {len(self.lv.rects)} прямоугольников, "
+                 f"уровень готов за {(time.perf_counter() - t0) * 1000:.1f} мс")
+        if not self.lv.has(EXIT):
+            self.say(f"На карте {map_name} нет выхода")
+
+        # тот же спрайт игрока, но в том виде, в каком его дал бы arcade.Sprite()
+        p = self.hero
+        p.texture = self.player_tex[0]
+        p.set_hit_box(None)
+        p.change_x = 0
+        p.change_y = 0
+        p.center_x, p.center_y = self.lv.start
+        self.p = p
+
+        # стены у физики - списки текущего набора, а они меняются вместе с ним
+        self.hero_phys.walls = [self.phys_walls]
+        self.phys = self.hero_phys
+
+        self.events.append(("level",))
+        self.events.append(("sound", "start", 0.5))
+        self.events.append(("music", True))
+
+        self.state = STATE_PLAY
+        if lv is None and self.preload_on and self.lvl < self.lvl_max:
+            self.start_preload((self.level_source, self.lvl + 1))
+
+    def start_oxy(self, lvl):
+        return start_oxy(lvl, self.oxy_level_step, self.oxy_floor)
+
+    def take_level(self, ls):
+        # ls становится текущим, прошлый текущий набор пустеет и идёт в запас
+        old = self.ls
+        self.ls = ls
+        self.lv = ls.lv
+        for name in LEVEL_ATTRS:
+            setattr(self, name, getattr(ls, name))
+        if old is not None and old is not ls:
+            old.recycle()
+            self.spare = old
+
+    def build_level(self, ls):
+        """собирает спрайты из ls.lv в ls по кусочкам
+
+        это генератор: отдаёт управление каждые BUILD_CHUNK спрайтов, чтобы
+        следующий уровень можно было собирать понемногу между кадрами.
+        тайлы стен только рисуются, а для физики уже склеены в прямоугольники.
+        """
+        lv = ls.lv
+        pool = ls.pool
+        n = 0
+        for x, y, tex, _ in lv.items(WALL):
+            ls.walls.append(pool.tile(tex, x, y))
+            n += 1
+            if n % BUILD_CHUNK == 0:
+                yield
+        for x, y, tex, _ in lv.items(EXIT):
+            ls.exits.append(pool.tile(tex, x, y))
+        for x, y, tex, fill in lv.items(OXY):
+            it = pool.tile(tex, x, y)
+            it.properties["fill"] = fill
+            ls.oxy_pick.append(it)
+        yield
+        for x, y, _, speed in lv.items(FOE):
+            it = pool.foe(self.enemy_tex[0], x, y)
+            it.properties["speed"] = speed or self.enemy_speed
+            ls.foes.append(it)
+            n += 1
+            if n % BUILD_CHUNK == 0:
+                yield
+
+        rect_sprites(lv.rects, lv.tile_w, ls.phys_walls, pool=pool)
+        if not lv.has(WALL):
+            # у уровня нет тайлов стен (csv) - рисуем сами прямоугольники
+            rect_sprites(lv.rects, lv.tile_w, ls.walls, WALL_COLOR, pool)
+        # сетка путей для врагов, пересчитывается в update_foes
+        ls.flow = FlowField(lv.cols, lv.rows, lv.tile_w, lv.blocked)
+        if len(ls.foes) >= FOE_BATCH_MIN:
+            ls.foe_batch = FoeBatch(ls.foes, ls.flow, self.enemy_tex)
+        # дальние враги шагают реже, см. lod.py
+        ls.lod = FoeLod(ls.foes)
+        yield
+
+        ch = ls.old_chunks
+        if ch is None or ch.size != CHUNK_TILES * lv.tile_w:
+            ch = LevelChunks(lv)
+        ls.chunks = ch
+        for name in ("walls", "exits", "oxy_pick", "foes"):
+            getattr(ls.chunks, name).extend(getattr(ls, name))
+        yield
+
+        # стены и выход больше не меняются до смены уровня - печём их один раз
+        if not can_bake(lv):
+            return
+
+        def make_image():
+            return ls.image if ls.image is not None else level_image(lv, WALL_COLOR)
+
+        ls.static_layer = bake_layer(layer_name(lv), lv.cols * lv.tile_w, lv.rows * lv.tile_h, make_image)
+
+    # фоновая загрузка следующего уровня
+
+    def start_preload(self, key):
+        # разбор, стены и картинка слоя - в потоке, спрайты - потом в pump_preload
+        self.preload_key = key
+        self.preload_data = self.loader.submit(prepare_level, *key)
+        self.preload_steps = None
+        self.preload = None
+
+    def pump_preload(self, budget=PRELOAD_BUDGET):
+        if self.preload_data is None or self.preload is not None:
+            return
+        if self.preload_steps is None:
+            if not self.preload_data.done():
+                return
+            try:
+                lv, image = self.preload_data.result()
+            except Exception:
+                # пусть reset() сам загрузит и покажет ошибку
+                self.preload_data = None
+                return
+            # следующий уровень собирается в запасной набор
+            ls = self.spare
+            ls.recycle(lv)
+            ls.image = image
+            self.preload_steps = (ls, self.build_level(ls))
+        ls, steps = self.preload_steps
+        t_end = time.perf_counter() + budget
+        for _ in steps:
+            if time.perf_counter() >= t_end:
+                return
+        self.preload = ls
+
+    def take_preload(self, key):
+        # готовые спрайты нужного уровня; недостроенные достраиваем сразу
+        if self.preload_key != key or self.preload_data is None:
+            return None
+        self.preload_data.result()
+        self.pump_preload(budget=float("inf"))
+        ls = self.preload
+        self.drop_preload()
+        return ls
+
+    def drop_preload(self):
+        self.preload_key = None
+        self.preload_data = None
+        self.preload_steps = None
+        self.preload = None
+
+    def advance_level(self):
+        self.lvl += 1
+        if self.lvl > self.lvl_max:
+            self.state = STATE_CLEAR
+            return
+        self.reset()
+
+    # шаг игры
+
+    def step(self, dt=STEP):
+        self.events.clear()
+        if self.state != STATE_PLAY or not self.p or not self.phys:
+            return
+
+        if self.rec:
+            self.rec.on_step(self)
+        self.tick += 1
+
+        prof = self.prof
+        prof.begin()
+        self.t_alive += dt
+        self.oxy -= self.oxy_drain * dt
+
+        self.update_player_vel()
+        prof.lap("player")
+        self.phys.update()
+        prof.lap("physics")
+        self.update_foes(dt)
+        prof.lap("foes")
+        self.handle_collisions()
+        prof.lap("collisions")
+        if self.pump_each_step:
+            self.pump_preload()
+            prof.lap("preload")
+        self.update_animation(dt)
+        prof.lap("animation")
+
+        if self.oxy <= 0:
+            if not self.dead_played:
+                self.events.append(("sound", "dead", 0.6))
+                self.events.append(("music", False))
+                self.dead_played = True
+            self.state = STATE_OVER
+
+    def update_animation(self, dt):
+        # у кадров разные хитбоксы, поэтому анимация - часть шага, а не окна:
+        # иначе игра без окна (и повтор записи) столкнётся иначе
+        self.anim_timer += dt
+        fr = int(self.anim_timer / ANIM_FRAME) % 2
+
+        if self.p:
+            # если игрок идёт, включаем второй кадр
+            moving = self.p.change_x != 0 or self.p.change_y != 0
+            tex = self.player_tex[fr if moving else 0]
+            if self.p.texture is not tex:
+                self.p.texture = tex
+
+        # текстуры врагов меняем, только когда сменился кадр, и только ближним
+        if fr == self.anim_fr or not self.lod:
+            return
+        self.anim_fr = fr
+        tex = self.enemy_tex[fr]
+        # сеттер текстуры в arcade хитбокс не меняет - ставим его сами
+        pts = tex.hit_box_points
+        foes = self.foes
+        awake = np.flatnonzero(self.lod.awake)
+        for i in awake.tolist():
+            foes[i].texture = tex
+            foes[i].set_hit_box(pts)
+        if self.foe_batch:
+            self.foe_batch.set_frame(awake, fr)
+
+    def update_player_vel(self):
+        if not self.p:
+            return
+        vx = 0
+        vy = 0
+        if self.mv_l:
+            vx -= PLAYER_SPEED
+        if self.mv_r:
+            vx += PLAYER_SPEED
+        if self.mv_u:
+            vy += PLAYER_SPEED
+        if self.mv_d:
+            vy -= PLAYER_SPEED
+        if vx and vy:
+            s = 1 / math.sqrt(2)
+            vx *= s
+            vy *= s
+        self.p.change_x = vx
+        self.p.change_y = vy
+
+    def update_foes(self, dt):
+        if not self.p:
+            return
+        px = self.p.center_x
+        py = self.p.center_y
+        if self.flow:
+            self.flow.update(px, py)
+        lod = self.lod
+        if self.foe_batch:
+            b = self.foe_batch
+            idx, steps = lod.due(self.tick, px, py, dt, b.x, b.y)
+            b.update(px, py, steps, idx)
+            return
+
+        idx, steps = lod.due(self.tick, px, py, dt)
+        foes = self.foes
+        for i, dt in zip(idx.tolist(), steps.tolist()):
+            foe = foes[i]
+            x0 = foe.center_x
+            y0 = foe.center_y
+
+            # идём к следующей клетке пути, а рядом с игроком - прямо к нему
+            tx, ty = px, py
+            if self.flow:
+                tx, ty = self.flow.target(x0, y0, px, py)
+            dx = tx - x0
+            dy = ty - y0
+            dist = math.hypot(dx, dy)
+            if not dist:
+                continue
+            step = foe.properties["speed"] * dt
+            sx = dx
+            sy = dy
+            if dist > step:
+                sx = dx / dist * step
+                sy = dy / dist * step
+
+            foe.center_x = snap(x0 + sx, tx)
+            if arcade.check_for_collision_with_list(foe, self.phys_walls):
+                foe.center_x = x0
+                # по x упёрлись - весь шаг уходит в скольжение по y,
+                # иначе враг бесконечно подползает к краю коридора
+                sy = max(-step, min(step, dy))
+            foe.center_y = snap(y0 + sy, ty)
+            if arcade.check_for_collision_with_list(foe, self.phys_walls):
+                foe.center_y = y0
+            lod.x[i] = foe.center_x
+            lod.y[i] = foe.center_y
+
+    def handle_collisions(self):
+        if not self.p:
+            return
+
+        if self.foe_batch:
+            hit = self.foe_batch.touching(self.p)
+        else:
+            hit = arcade.check_for_collision_with_list(self.p, self.foes)
+        if hit:
+            self.oxy -= self.hit_loss
+            self.events.append(("fx", self.p.position, HIT_COLOR))
+
+        for b in arcade.check_for_collision_with_list(self.p, self.oxy_pick):
+            fill = b.properties.get("fill", 25)
+            self.oxy = min(MAX_OXY, self.oxy + fill)
+            b.remove_from_sprite_lists()
+            self.events.append(("fx", b.position, PICK_COLOR))
+            self.events.append(("sound", "pick", 0.35))
+
+        if arcade.check_for_collision_with_list(self.p, self.exits):
+            self.advance_level()